@@ -0,0 +1,169 @@
+"""whois_archive
+
+Move WHOIS data off the domains and domain_watches rows into a
+content-addressed, compressed archive table.
+
+Revision ID: 8d2e4f6a1b3c
+Revises: 5c8ba15c46e2
+Create Date: 2026-10-16 10:12:40.118204
+
+"""
+import hashlib
+import json
+import zlib
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e4f6a1b3c'
+down_revision = '5c8ba15c46e2'
+branch_labels = None
+depends_on = None
+
+# Tables whose rows carried a whois_data JSON column
+WHOIS_TABLES = ('domains', 'domain_watches')
+
+
+def _tables():
+    return [t for t in WHOIS_TABLES if t in sa.inspect(op.get_bind()).get_table_names()]
+
+
+def _as_datetime(value):
+    """First date of a stored WHOIS field, as a naive datetime, or None."""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _archive_existing(table_name: str, archive: sa.Table, known: set) -> None:
+    """
+    Copy each row's whois_data into the archive as canonical zlib-compressed
+    JSON, filling the columns the application keeps beside the hash
+    (registrar, expiry and registration dates) in the same pass.
+    """
+    bind = op.get_bind()
+    # registered_date only exists on domains; it keeps its value when the
+    # answer has no creation date
+    dates = {'expiration_date': 'expiration_date'}
+    columns = {c['name'] for c in sa.inspect(bind).get_columns(table_name)}
+    if 'registered_date' in columns:
+        dates['registered_date'] = 'creation_date'
+    rows = sa.table(
+        table_name,
+        sa.column('id', sa.Integer),
+        sa.column('whois_data', sa.JSON),
+        sa.column('whois_hash', sa.String),
+        sa.column('registrar', sa.String),
+        *(sa.column(column, sa.DateTime) for column in dates),
+    )
+    now = datetime.utcnow()
+    for row_id, whois_data in bind.execute(sa.select(rows.c.id, rows.c.whois_data).where(rows.c.whois_data.isnot(None))).fetchall():
+        if isinstance(whois_data, str):
+            whois_data = json.loads(whois_data)
+        fields = {k: v for k, v in whois_data.items() if v not in (None, "", [])}
+        content = json.dumps(fields, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+        content_hash = hashlib.sha256(content).hexdigest()
+        if content_hash not in known:
+            bind.execute(archive.insert().values(
+                content_hash=content_hash, codec='zlib', content_type='json', size=len(content),
+                payload=zlib.compress(content, 9), created_at=now, updated_at=now,
+            ))
+            known.add(content_hash)
+        registrar = fields.get('registrar')
+        if isinstance(registrar, list):
+            registrar = registrar[0] if registrar else None
+        values = {
+            'whois_hash': content_hash,
+            'registrar': str(registrar)[:255] if registrar else None,
+        }
+        for column, field in dates.items():
+            value = _as_datetime(fields.get(field))
+            if value is not None:
+                values[column] = value
+        bind.execute(rows.update().where(rows.c.id == row_id).values(**values))
+
+
+def upgrade() -> None:
+    archive = op.create_table('whois_archive',
+    sa.Column('content_hash', sa.String(length=64), nullable=False, comment='SHA-256 of the uncompressed content'),
+    sa.Column('codec', sa.String(length=8), nullable=False, comment="Compression codec: 'zlib' or 'zstd'"),
+    sa.Column('content_type', sa.String(length=8), nullable=False, comment="'text' for a raw response, 'json' for parsed fields"),
+    sa.Column('size', sa.Integer(), nullable=False, comment='Uncompressed size in bytes'),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('content_hash', name=op.f('pk_whois_archive'))
+    )
+
+    # Date columns first, so the archive pass below can fill them
+    op.add_column('domains', sa.Column('expiration_date', sa.DateTime(), nullable=True, comment='Registry expiry date from WHOIS'))
+    op.create_index(op.f('ix_domains_expiration_date'), 'domains', ['expiration_date'], unique=False)
+    if 'domain_watches' in _tables():
+        op.add_column('domain_watches', sa.Column('expiration_date', sa.DateTime(), nullable=True))
+
+    known: set = set()
+    for table_name in _tables():
+        op.add_column(table_name, sa.Column('whois_hash', sa.String(length=64), nullable=True))
+        op.add_column(table_name, sa.Column('registrar', sa.String(length=255), nullable=True))
+        op.create_index(op.f(f'ix_{table_name}_whois_hash'), table_name, ['whois_hash'], unique=False)
+        op.create_foreign_key(
+            op.f(f'fk_{table_name}_whois_hash_whois_archive'), table_name, 'whois_archive',
+            ['whois_hash'], ['content_hash'],
+        )
+        _archive_existing(table_name, archive, known)
+        op.drop_column(table_name, 'whois_data')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    archive = sa.table(
+        'whois_archive',
+        sa.column('content_hash', sa.String),
+        sa.column('codec', sa.String),
+        sa.column('content_type', sa.String),
+        sa.column('payload', sa.LargeBinary),
+    )
+
+    if 'domain_watches' in _tables():
+        op.drop_column('domain_watches', 'expiration_date')
+    op.drop_index(op.f('ix_domains_expiration_date'), table_name='domains')
+    op.drop_column('domains', 'expiration_date')
+
+    for table_name in _tables():
+        op.add_column(table_name, sa.Column('whois_data', sa.JSON(), nullable=True))
+        rows = sa.table(
+            table_name,
+            sa.column('id', sa.Integer),
+            sa.column('whois_data', sa.JSON),
+            sa.column('whois_hash', sa.String),
+        )
+        query = (
+            sa.select(rows.c.id, archive.c.codec, archive.c.content_type, archive.c.payload)
+            .select_from(rows.join(archive, rows.c.whois_hash == archive.c.content_hash))
+        )
+        for row_id, codec, content_type, payload in bind.execute(query).fetchall():
+            if codec != 'zlib':
+                # zstd entries were written by the application; the
+                # zstandard package is needed to restore them
+                import zstandard
+                content = zstandard.ZstdDecompressor().decompress(payload)
+            else:
+                content = zlib.decompress(payload)
+            content = content.decode('utf-8')
+            whois_data = json.loads(content) if content_type == 'json' else {'raw': content}
+            bind.execute(rows.update().where(rows.c.id == row_id).values(whois_data=whois_data))
+
+        op.drop_constraint(op.f(f'fk_{table_name}_whois_hash_whois_archive'), table_name, type_='foreignkey')
+        op.drop_index(op.f(f'ix_{table_name}_whois_hash'), table_name=table_name)
+        op.drop_column(table_name, 'registrar')
+        op.drop_column(table_name, 'whois_hash')
+
+    op.drop_table('whois_archive')
@@ -2,7 +2,7 @@
 from fastapi import APIRouter
 
 from .endpoints import (
-    auth, users, domains, searches, watches, notifications
+    auth, users, domains, searches, watches, notifications, admin
 )
 
 api_router = APIRouter()
@@ -14,3 +14,4 @@ api_router.include_router(domains.router, prefix="/domains", tags=["Domains"])
 api_router.include_router(searches.router, prefix="/searches", tags=["Searches"])
 api_router.include_router(watches.router, prefix="/watches", tags=["Domain Watches"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
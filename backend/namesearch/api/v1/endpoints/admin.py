@@ -1,5 +1,6 @@
 """Admin dashboard endpoints for analytics, logs, and API key management."""
-from typing import Any, List
+from dataclasses import asdict
+from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from .... import crud, models
@@ -7,6 +8,17 @@ from ....core.security import get_current_active_superuser
 from ....db.session import get_db
 from ....schemas.user import UserResponse
 from ....schemas.project import ProjectResponse
+from ....services.cache_warmer import cache_warmer
+from ....services.domain_store import domain_store
+from ....services.lookup_resilience import lookup_guard
+from ....services.outbound_scheduler import outbound_scheduler
+from ....services.search_jobs import search_jobs
+from ....services.search_pipeline import search_pipeline
+from ....services.whois_service import WHOISService
+from ....utils.cache import domain_cache
+from ....utils.cache_invalidation import invalidation_bus
+from ....utils.domain_checker import availability_flight
+from ....utils.revalidation import revalidator
 
 router = APIRouter()
 
@@ -67,3 +79,73 @@ def get_api_keys(
     """
     # TODO: Integrate with API key management
     return [{"key": "demo-key", "owner": "admin@example.com"}]
+
+@router.get("/outbound-queue", response_model=dict)
+def get_outbound_queue(
+    current_user: models.User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Show outbound WHOIS/RDAP budgets and how many lookups are queued per server.
+    """
+    return {
+        "queue_depth": outbound_scheduler.queue_depth(),
+        "servers": outbound_scheduler.stats(),
+    }
+
+@router.get("/lookup-coalescing", response_model=dict)
+def get_lookup_coalescing(
+    current_user: models.User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Show how many concurrent domain lookups were coalesced into a single query.
+    """
+    return {
+        "groups": [availability_flight.stats(), WHOISService.flight.stats()],
+    }
+
+@router.get("/lookup-resilience", response_model=dict)
+def get_lookup_resilience(
+    current_user: models.User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Show circuit breaker state and hedge delay per WHOIS server, with hedging counters.
+    """
+    return lookup_guard.stats()
+
+@router.get("/cache", response_model=dict)
+def get_cache_stats(
+    current_user: models.User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Show size, budget and hit/miss/eviction counters of the domain availability cache,
+    with its stale-while-revalidate and cross-worker invalidation counters.
+    """
+    return {
+        **domain_cache.stats(),
+        "revalidation": revalidator.stats(),
+        "invalidation": invalidation_bus.stats(),
+        "warmup": cache_warmer.stats(),
+        "database": domain_store.stats(),
+    }
+
+@router.post("/cache/warm", response_model=dict)
+def warm_cache(
+    limit: Optional[int] = None,
+    current_user: models.User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Load the most searched stored domains into the availability cache now.
+    """
+    return asdict(cache_warmer.warm(limit=limit))
+
+@router.get("/searches", response_model=dict)
+def get_search_stats(
+    current_user: models.User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Show lookups still running after their search's deadline, and running bulk search jobs.
+    """
+    return {
+        "pipeline": search_pipeline.stats(),
+        "jobs": search_jobs.stats(),
+    }
@@ -1,25 +1,29 @@
 """Domain endpoints with rate limiting and enhanced search."""
-from typing import Any, List, Dict, Tuple, Set
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple, Set
 import asyncio
 import logging
 from datetime import datetime, timedelta
 import re
-import random
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Query, Body, status
-from fastapi.responses import JSONResponse
+from fastapi import (
+    APIRouter, Depends, HTTPException, Request, Query, Body, WebSocket, WebSocketDisconnect, status
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from .... import crud, models
 from ....core import security
+from ....core.config import settings
 from ....core.security import get_current_active_user, get_current_user_optional
-from ....db.session import get_db
+from ....db.session import SessionLocal, get_db
 from ....schemas.domain import (
     DomainPublic, DomainBulkSearchResponse, DomainBase, 
     DomainSearchQuery, DomainSearchResult, DomainCreate, DomainStatus
 )
+from ....models.domain import SearchStatus
 from ....schemas.search import Search
-from ....utils.domain_checker import is_domain_available
 # Temporarily commenting out AI services to avoid dependency conflicts
 # from ....services.ai import analyze_domain_name, analyze_brand_archetype
 
@@ -39,9 +43,13 @@ def analyze_brand_archetype(domain: str, **kwargs):
         "confidence": 0.65,
         "analysis": "This domain suggests exploration and discovery.",
     }
-from ....utils.domain_checker import is_domain_available, get_domain_pricing
+from ....utils.domain_checker import is_domain_available_async, get_domain_pricing
 from ....utils.domain_generator import generate_domain_variations, is_valid_domain
 from ....utils.rate_limiter import standard_limiter, strict_limiter
+from ....services.lookup_resilience import lookup_deadline
+from ....services.search_pipeline import (
+    SearchPlan, format_search_event, plan_search, search_pipeline, summarize
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -72,7 +80,7 @@ async def check_domain_availability(domain_name: str) -> Dict[str, Any]:
             }
         
         # Get domain availability and WHOIS data
-        is_available, whois_data = is_domain_available(domain_name)
+        is_available, whois_data = await is_domain_available_async(domain_name)
         
         # If we have WHOIS data, extract useful information
         whois_info = {}
@@ -87,7 +95,7 @@ async def check_domain_availability(domain_name: str) -> Dict[str, Any]:
             }
         
         # Get pricing information (with caching)
-        pricing = get_domain_pricing(domain_name) if is_available else {}
+        pricing = await asyncio.to_thread(get_domain_pricing, domain_name) if is_available else {}
         
         # Extract base domain (without TLD) for analysis
         base_domain = domain_name.rsplit('.', 1)[0]
@@ -253,8 +261,8 @@ async def check_domain_availability(domain_name: str) -> Dict[str, Any]:
     base_domain = domain_name.split('.')[0]
     
     # Get domain availability and pricing
-    is_available, whois_data = is_domain_available(domain_name)
-    pricing = get_domain_pricing(domain_name) if is_available else {}
+    is_available, whois_data = await is_domain_available_async(domain_name)
+    pricing = await asyncio.to_thread(get_domain_pricing, domain_name) if is_available else {}
     
     # Analyze the domain name (without TLD)
     linguistic_analysis = analyze_domain_name(base_domain)
@@ -283,256 +291,234 @@ async def check_domain_availability(domain_name: str) -> Dict[str, Any]:
     return result
 
 
-@router.post("/search")
-async def search_domains(
-    *,
-    request: Request,
-    db: Session = Depends(get_db),
-    search_in: dict = Body(...),
-) -> Any:
-    # Convert the raw request body to DomainSearchQuery
-    # Log the raw input for debugging
-    logger.info(f"Raw search request data: {search_in}")
-    
-    # Extract query and tlds from the request body
-    query = search_in.get('query', '').strip()
-    tlds = search_in.get('tlds', ['com', 'io', 'ai'])
-    limit = min(int(search_in.get('limit', 20)), 100)  # Ensure limit is within bounds
+# Search filters that narrow the results of a query
+_ADVANCED_FILTERS = frozenset({
+    'keywords', 'only_available', 'only_premium', 'min_length', 'max_length',
+    'allow_numbers', 'allow_hyphens', 'allow_special_chars', 'sort_by', 'sort_order',
+})
+
+
+def _plan_search_request(search_in: Dict[str, Any]) -> Tuple[DomainSearchQuery, SearchPlan]:
+    """
+    Validate a search request body and plan its lookups.
     
-    # Check if this is an advanced search (has filters)
-    has_advanced_filters = any(key in search_in for key in [
-        'keywords', 'only_available', 'only_premium', 'min_length', 'max_length',
-        'allow_numbers', 'allow_hyphens', 'allow_special_chars', 'sort_by', 'sort_order'
-    ])
+    Every search needs a query: advanced filters narrow the results of a
+    query and are rejected on their own.
     
-    # For advanced search, we don't require a query parameter
-    if not query and not has_advanced_filters:
-        logger.warning("Empty domain search query received")
+    Raises:
+        HTTPException: 400 if the query is empty or cannot form domain names
+    """
+    query = str(search_in.get('query') or '').strip()
+    if not query:
+        filters = sorted(k for k in _ADVANCED_FILTERS if k in search_in)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Query must not be empty or provide advanced search filters"
+            detail=(
+                f"Query must not be empty; advanced filters ({', '.join(filters)}) need a query"
+                if filters else "Query must not be empty"
+            )
         )
     
-    # Create a validated search query
     try:
-        search_in = DomainSearchQuery(
-            query=query or "",  # Allow empty query for advanced search
-            tlds=tlds,
-            limit=limit,
-            **{k: v for k, v in search_in.items() 
-               if k in DomainSearchQuery.__annotations__ and k not in ['query', 'tlds', 'limit']}
+        search_query = DomainSearchQuery(
+            query=query,
+            limit=min(int(search_in.get('limit', 20)), 100),
+            **{k: v for k, v in search_in.items()
+               if k in DomainSearchQuery.model_fields and k not in ['query', 'limit']}
         )
-    except Exception as e:
-        logger.error(f"Error creating search query: {str(e)}")
+        plan = plan_search(search_query.query, search_query.tlds, search_query.limit)
+    except (ValueError, TypeError) as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid search parameters: {str(e)}"
         )
-    logger.info(f"SEARCH DEBUG: Received request for query: '{search_in.query}'")
-    # Log the complete request data to help debug
+    return search_query, plan
+
+
+def _search_deadline(search_query: DomainSearchQuery) -> Optional[float]:
+    """Seconds a search waits for lookups, from `deadline_ms` or SEARCH_DEADLINE_MS."""
+    deadline_ms = search_query.deadline_ms or settings.SEARCH_DEADLINE_MS
+    return deadline_ms / 1000 if deadline_ms else None
+
+
+def _record_search(
+    db: Session, plan: SearchPlan, counts: Dict[str, int], started_at: datetime
+) -> None:
+    """
+    Log a finished search; failures are logged and otherwise ignored.
+    
+    Searches that returned pending domains are recorded as PARTIAL.
+    """
     try:
-        body = await request.json()
-        logger.info(f"SEARCH DEBUG: Full request body: {body}")
-    except Exception as e:
-        logger.warning(f"SEARCH DEBUG: Could not parse request body: {e}")
-        pass
-    # Special handling for specific queries that cause issues
-    query_lower = search_in.query.strip().lower()
+        db.add(models.domain.Search(
+            query=plan.name,
+            search_type="bulk",
+            status=SearchStatus.PARTIAL if counts["pending"] else SearchStatus.COMPLETED,
+            results_count=counts["total"],
+            available_count=counts["available"],
+            taken_count=counts["taken"],
+            premium_count=counts["premium"],
+            filters={"tlds": [domain.split(".", 1)[1] for domain in plan.domains]},
+            started_at=started_at,
+            completed_at=datetime.utcnow(),
+        ))
+        db.commit()
+    except SQLAlchemyError as e:
+        logger.warning(f"Failed to log search for '{plan.name}': {str(e)}")
+        db.rollback()
     
-    # Special case for 'dear' query
-    if query_lower == 'dear':
-        return {
-            "results": [
-                {
-                    "domain": "dear.com",
-                    "tld": "com",
-                    "is_available": True,
-                    "status": "available",
-                    "is_premium": False,
-                    "price": None,
-                    "currency": "USD",
-                    "whois_data": None
-                },
-                {
-                    "domain": "dear.io",
-                    "tld": "io",
-                    "is_available": True,
-                    "status": "premium",
-                    "is_premium": True,
-                    "price": 1999.99,
-                    "currency": "USD",
-                    "whois_data": None
-                }
-            ],
-            "total": 2,
-            "available": 2,
-            "taken": 0,
-            "premium": 1
-        }
+    logger.info(
+        f"Search for '{plan.name}' checked {counts['total']} domains "
+        f"({counts['available']} available, {counts['premium']} premium, {counts['pending']} pending)"
+    )
+
+
+@router.post("/search", response_model=DomainBulkSearchResponse)
+async def search_domains(
+    *,
+    db: Session = Depends(get_db),
+    search_in: dict = Body(...),
+) -> Any:
+    """
+    Search a name across TLDs.
     
-    # Special case for 'search' query
-    if query_lower == 'search':
-        return {
-            "results": [
-                {
-                    "domain": "search.com",
-                    "tld": "com",
-                    "is_available": False,
-                    "status": "registered",
-                    "is_premium": False,
-                    "price": None,
-                    "currency": "USD",
-                    "whois_data": None
-                },
-                {
-                    "domain": "search.io",
-                    "tld": "io",
-                    "is_available": True,
-                    "status": "premium",
-                    "is_premium": True,
-                    "price": 2499.99,
-                    "currency": "USD",
-                    "whois_data": None
-                },
-                {
-                    "domain": "search.ai",
-                    "tld": "ai",
-                    "is_available": False,
-                    "status": "registered",
-                    "is_premium": False,
-                    "price": None,
-                    "currency": "USD",
-                    "whois_data": None
-                }
-            ],
-            "total": 3,
-            "available": 1,
-            "taken": 2,
-            "premium": 1
-        }
-    try:
-        logger.info(f"Received search request with query: {search_in.query}, TLDs: {search_in.tlds}, limit: {search_in.limit}")
-        
-        # Input validation - rate limiting is now handled by decorator
-        # Log full request body for debugging
-        logger.info(f"SEARCH DEBUG: Full request body: {dict(request.scope.get('body_dict', {}))}")
-            
-        if not search_in.query:
-            logger.warning("Empty domain search query received")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, 
-                detail="Query must not be empty"
-            )
+    The query is fanned out over the requested TLDs and every domain is
+    checked concurrently through the cache tiers, then DNS and WHOIS, within
+    the request's lookup budget. Available domains are priced in one batch.
+    
+    With `deadline_ms`, the response is sent when the budget runs out:
+    domains not answered by then come back pending, and their lookups go
+    on in the background so the cache has them for the next search.
+    """
+    search_query, plan = _plan_search_request(search_in)
+    
+    started_at = datetime.utcnow()
+    with lookup_deadline(settings.LOOKUP_DEADLINE):
+        response = await search_pipeline.run(
+            plan, include_whois=search_query.include_whois, deadline=_search_deadline(search_query)
+        )
+    
+    _record_search(db, plan, response, started_at)
+    return response
 
-        if not search_in.tlds:
-            logger.warning(f"No TLDs specified for query: {search_in.query}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, 
-                detail="At least one TLD must be specified"
-            )
-            
-        # Process TLDs with default fallback
-        tlds = search_in.tlds or ["com", "io", "ai"] 
-        tlds = [tld.lower().strip(".") for tld in tlds]  # Normalize TLDs
-        
-        # Limit the number of TLDs to prevent abuse
-        max_tlds = 20
-        if len(tlds) > max_tlds:
-            tlds = tlds[:max_tlds]
-            logger.warning(f"Too many TLDs requested, limiting to first {max_tlds}")
-        
-        # Generate mock results
+
+@router.post("/search/stream")
+async def stream_search_domains(
+    *,
+    request: Request,
+    search_in: dict = Body(...),
+    format: Optional[str] = Query(
+        None, pattern="^(sse|ndjson)$",
+        description="'sse' or 'ndjson'; defaults to SSE when the client accepts text/event-stream"
+    ),
+) -> Any:
+    """
+    Search a name across TLDs, streaming each result as its lookup finishes.
+    
+    Takes the same body as `POST /search`. Every `DomainSearchResult` is sent
+    as a 'result' event in completion order, so the first one arrives as soon
+    as the fastest TLD answers; a final 'summary' event carries the counts of
+    the `POST /search` response. Domains pending at `deadline_ms` are sent
+    as pending results just before the summary.
+    """
+    search_query, plan = _plan_search_request(search_in)
+    if format is None:
+        format = "sse" if "text/event-stream" in request.headers.get("accept", "") else "ndjson"
+    sse = format == "sse"
+    
+    async def events() -> AsyncIterator[str]:
+        started_at = datetime.utcnow()
         results = []
-        available_count = 0
-        taken_count = 0
-        premium_count = 0
-        
-        # Generate domains for each TLD
-        for tld in tlds[:search_in.limit]:
-            domain = f"{search_in.query.lower().strip()}.{tld}"
-            is_available = random.choice([True, False])
-            is_premium = False
-            price = None
+        with lookup_deadline(settings.LOOKUP_DEADLINE):
+            async for result in search_pipeline.stream(
+                plan, include_whois=search_query.include_whois, deadline=_search_deadline(search_query)
+            ):
+                results.append(result)
+                yield format_search_event("result", result, sse)
+        counts = summarize(results)
+        yield format_search_event("summary", {"query": plan.name, **counts}, sse)
+        # The request's session may already be closed while the body streams
+        db = SessionLocal()
+        try:
+            await asyncio.to_thread(_record_search, db, plan, counts, started_at)
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _push_search(
+    websocket: WebSocket, search_id: Any, plan: SearchPlan, search_query: DomainSearchQuery
+) -> None:
+    """Send one session search's results and summary; cancelled when superseded."""
+    results = []
+    with lookup_deadline(settings.LOOKUP_DEADLINE):
+        async for result in search_pipeline.stream(
+            plan, include_whois=search_query.include_whois, deadline=_search_deadline(search_query)
+        ):
+            results.append(result)
+            await websocket.send_json(
+                {"event": "result", "id": search_id, "data": jsonable_encoder(result)}
+            )
+    await websocket.send_json(
+        {"event": "summary", "id": search_id, "data": {"query": plan.name, **summarize(results)}}
+    )
+
+
+@router.websocket("/search/ws")
+async def search_session(websocket: WebSocket) -> None:
+    """
+    Type-ahead search over one WebSocket connection.
+    
+    The client sends a JSON search body per query update, in the shape of
+    `POST /search` with an optional `id` echoed back on every event. Each
+    update cancels the lookups of the previous query that are still
+    running; results are pushed as 'result' events as they arrive, then a
+    'summary' event. Invalid updates get an 'error' event and leave the
+    session open. Session searches are not logged to search history.
+    """
+    await websocket.accept()
+    current: Optional[asyncio.Task] = None
+    seq = 0
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except ValueError:
+                await websocket.send_json({"event": "error", "id": None, "detail": "Messages must be JSON"})
+                continue
+            seq += 1
+            search_id = message.get("id", seq) if isinstance(message, dict) else seq
             
-            if is_available:
-                available_count += 1
-                # 20% chance of being premium
-                if random.random() < 0.2:
-                    is_premium = True
-                    price = round(random.uniform(100, 5000), 2)
-                    premium_count += 1
-            else:
-                taken_count += 1
+            if current is not None and not current.done():
+                # Superseded; wait so its sends cannot interleave with the next query's
+                current.cancel()
+                await asyncio.gather(current, return_exceptions=True)
+            current = None
             
-            # Determine status based on availability and premium status
-            if is_premium:
-                status = "premium"
-            elif is_available:
-                status = "available"
-            else:
-                status = "registered"  # Using 'registered' instead of 'taken' to match schema
-                
-            results.append({
-                "domain": domain,
-                "tld": tld,
-                "is_available": is_available,
-                "status": status,
-                "is_premium": is_premium,
-                "price": price,
-                "currency": "USD"  # Always return a string, even for None prices
-            })
-        
-        # Log the search (in a real app, this would be async)
-        # --- RESTORED DB LOGGING ---
-        try:
-            # Only include fields that are actual columns on the Search ORM model
-            search_data = {
-                "query": search_in.query,
-                "search_type": "bulk",
-                "results_count": len(results),
-                "available_count": available_count,
-                "taken_count": taken_count,
-                "premium_count": premium_count,
-                "started_at": datetime.utcnow(),
-                "completed_at": datetime.utcnow(),
-                "status": "completed"
-            }
-            search = models.domain.Search(**search_data)
-            db.add(search)
-            db.commit()
-            logger.info(f"[DB LOGGING] Successfully logged search: {search_data}")
-        except Exception as e:
-            logger.warning(f"[DB LOGGING] Failed to log search to database: {str(e)}")
-            db.rollback()
-        # --- END RESTORED DB LOGGING ---
-        
-        logger.info(f"Search completed for '{search_in.query}'. Found {len(results)} results ({available_count} available, {premium_count} premium)")
-        
-        return {
-            "results": results,
-            "total": len(results),
-            "available": available_count,
-            "taken": taken_count,
-            "premium": premium_count
-        }
-        
-    except Exception as e:
-        import traceback
-        from fastapi import status as http_status  # Import status explicitly to avoid shadowing
-        error_traceback = traceback.format_exc()
-        logger.error(f"Error in search_domains: {str(e)}\n{error_traceback}")
-        
-        # Log the full request data that caused the error
-        try:
-            request_data = await request.json()
-            logger.error(f"Request data: {request_data}")
-        except Exception as json_error:
-            logger.error(f"Could not parse request data: {str(json_error)}")
-        
-        raise HTTPException(
-            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An error occurred while processing your request. Please try again later."
-        )
+            try:
+                if not isinstance(message, dict):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Messages must be JSON objects"
+                    )
+                search_query, plan = _plan_search_request(message)
+            except HTTPException as e:
+                await websocket.send_json({"event": "error", "id": search_id, "detail": e.detail})
+                continue
+            current = asyncio.create_task(
+                _push_search(websocket, search_id, plan, search_query)
+            )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if current is not None:
+            current.cancel()
+            await asyncio.gather(current, return_exceptions=True)
 
 # ... (rest of the code remains the same)
 @router.get("/{domain_id}", response_model=DomainPublic)
@@ -602,6 +588,65 @@ def get_domain_whois(
     return domain.whois_data or {}
 
 
+def format_whois_result(
+    domain: str, is_available: bool, whois_data: Dict[str, Any] = None, freshness: str = "live"
+) -> Dict[str, Any]:
+    """
+    Format an availability result for the WHOIS search response.
+    
+    Args:
+        domain: The domain name as requested
+        is_available: Whether the domain is available
+        whois_data: Parsed WHOIS data, if any
+        freshness: 'live', or 'fresh'/'stale' for answers from the cache
+        
+    Returns:
+        Dictionary in the shape returned by `search_whois`
+    """
+    result = {
+        "domain": domain,
+        "available": is_available,
+        "registered": not is_available,
+        "name_servers": [],
+        "status": [],
+        "raw_data": "",
+        "last_checked": datetime.utcnow().isoformat(),
+        "freshness": freshness
+    }
+    
+    # Only try to access whois_data if it exists
+    if whois_data:
+        # Safely get date fields
+        for date_field in ['creation_date', 'updated_date', 'expiration_date']:
+            if date_field in whois_data and whois_data[date_field]:
+                if isinstance(whois_data[date_field], list):
+                    result[f"{date_field}"] = whois_data[date_field][0].isoformat() if whois_data[date_field] else None
+                elif whois_data[date_field]:
+                    result[f"{date_field}"] = whois_data[date_field].isoformat() if hasattr(whois_data[date_field], 'isoformat') else whois_data[date_field]
+        
+        # Safely get other fields
+        for field, whois_field in [
+            ("registrar", "registrar"),
+            ("registrant_name", "name"),
+            ("registrant_organization", "org"),
+            ("registrant_email", "email"),
+        ]:
+            if whois_field in whois_data and whois_data[whois_field]:
+                result[field] = whois_data[whois_field]
+        
+        # Handle name servers and status
+        if 'name_servers' in whois_data and whois_data['name_servers']:
+            result['name_servers'] = whois_data['name_servers']
+        
+        if 'status' in whois_data and whois_data['status']:
+            result['status'] = whois_data['status']
+        
+        if 'raw' in whois_data and whois_data['raw']:
+            result['raw_data'] = whois_data['raw']
+    
+    return result
+
+
 @router.post("/whois/search")
 async def search_whois(
     *,
@@ -611,8 +656,15 @@ async def search_whois(
 ) -> Any:
     """
     Get WHOIS information for multiple domains in one request.
-    This endpoint is unauthenticated to allow public domain searches.
+    This endpoint is unauthenticated to allow public domain searches, so it
+    is rate limited per client and takes at most WHOIS_SEARCH_MAX_DOMAINS
+    domains; larger lists go to `POST /searches/jobs`.
+    
+    Lookups run through the search pipeline, each within LOOKUP_DEADLINE.
+    Domains not answered by then come back pending while their lookups
+    finish in the background and fill the cache.
     """
+    await strict_limiter(request)
     try:
         # Extract domain names from the request body
         domain_names = body.get("domain_names", [])
@@ -620,78 +672,53 @@ async def search_whois(
         # Validate we have domain names
         if not domain_names:
             return JSONResponse(
-                status_code=http_status.HTTP_400_BAD_REQUEST,
+                status_code=status.HTTP_400_BAD_REQUEST,
                 content={"detail": "No domain names provided"}
             )
         
         # Make sure domain_names is a list
         if not isinstance(domain_names, list):
             domain_names = [domain_names]
+        
+        if not all(isinstance(name, str) for name in domain_names):
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"detail": "domain_names must be a list of strings"}
+            )
             
-        logger.info(f"WHOIS search requested for domains: {domain_names}")
+        logger.info(f"WHOIS search requested for {len(domain_names)} domains")
         
         # Limit the number of domains that can be checked at once
-        if len(domain_names) > 10:
+        if len(domain_names) > settings.WHOIS_SEARCH_MAX_DOMAINS:
             return JSONResponse(
-                status_code=http_status.HTTP_400_BAD_REQUEST,
-                content={"detail": "Maximum of 10 domains can be checked at once"}
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={
+                    "detail": f"Maximum of {settings.WHOIS_SEARCH_MAX_DOMAINS} domains can be checked at once; "
+                              f"submit larger lists to /searches/jobs"
+                }
             )
         
-        # Perform real WHOIS lookups
         results = {}
-        for domain in domain_names:
-            try:
-                # Use domain_checker to get WHOIS data
-                is_available, whois_data = is_domain_available(domain)
-                
-                # Format the response with proper None checks
-                result = {
-                    "domain": domain,
-                    "available": is_available,
-                    "registered": not is_available,
-                    "name_servers": [],
-                    "status": [],
-                    "raw_data": "",
+        async for checked in search_pipeline.lookups(domain_names, deadline=settings.LOOKUP_DEADLINE):
+            if checked.error:
+                results[checked.domain] = {
+                    "domain": checked.domain,
+                    "error": f"Error looking up domain: {checked.error}",
+                    "available": False,
+                    "registered": False,
                     "last_checked": datetime.utcnow().isoformat()
                 }
-                
-                # Only try to access whois_data if it exists
-                if whois_data:
-                    # Safely get date fields
-                    for date_field in ['creation_date', 'updated_date', 'expiration_date']:
-                        if date_field in whois_data and whois_data[date_field]:
-                            if isinstance(whois_data[date_field], list):
-                                result[f"{date_field}"] = whois_data[date_field][0].isoformat() if whois_data[date_field] else None
-                            elif whois_data[date_field]:
-                                result[f"{date_field}"] = whois_data[date_field].isoformat() if hasattr(whois_data[date_field], 'isoformat') else whois_data[date_field]
-                    
-                    # Safely get other fields
-                    for field, whois_field in [
-                        ("registrar", "registrar"),
-                        ("registrant_name", "name"),
-                        ("registrant_organization", "org"),
-                        ("registrant_email", "email"),
-                    ]:
-                        if whois_field in whois_data and whois_data[whois_field]:
-                            result[field] = whois_data[whois_field]
-                    
-                    # Handle name servers and status
-                    if 'name_servers' in whois_data and whois_data['name_servers']:
-                        result['name_servers'] = whois_data['name_servers']
-                    
-                    if 'status' in whois_data and whois_data['status']:
-                        result['status'] = whois_data['status']
-                    
-                    if 'raw' in whois_data and whois_data['raw']:
-                        result['raw_data'] = whois_data['raw']
-                
-                results[domain] = result
-                
-            except Exception as e:
-                logger.error(f"Error looking up domain {domain}: {str(e)}", exc_info=True)
+            else:
+                results[checked.domain] = format_whois_result(
+                    checked.domain, checked.is_available, checked.whois_data, checked.freshness.value
+                )
+        
+        for domain in domain_names:
+            if domain not in results:
+                # Still being looked up when the deadline passed
                 results[domain] = {
                     "domain": domain,
-                    "error": f"Error looking up domain: {str(e)}",
+                    "pending": True,
                     "available": False,
                     "registered": False,
                     "last_checked": datetime.utcnow().isoformat()
@@ -702,7 +729,7 @@ async def search_whois(
     except Exception as e:
         logger.error(f"Error processing WHOIS search: {str(e)}", exc_info=True)
         return JSONResponse(
-            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={"detail": f"Error processing WHOIS search: {str(e)}"}
         )
 
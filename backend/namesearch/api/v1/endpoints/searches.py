@@ -1,26 +1,35 @@
 """Search endpoints."""
-from typing import Any, List
+from typing import Any, AsyncIterator, List, Optional
 
+import asyncio
 import math
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from .... import crud, models
+from ....core.config import settings
 from ....core.security import get_current_active_user, get_current_user_optional
 from ....db.session import get_db
 from ....schemas.domain import (
     DomainSearchQuery, DomainBulkSearchResponse, DomainPublic,
-    AdvancedDomainSearchRequest, PaginatedFilteredDomainsResponse, FilteredDomainInfo,
-    SortOrderEnum # Ensure SortOrderEnum is imported if it's used directly in type hints here, though it's part of AdvancedDomainSearchRequest
+    AdvancedDomainSearchRequest, PaginatedFilteredDomainsResponse,
 )
 from ....core.logging_config import logger # Import your configured logger
-from ....schemas.search import Search, SearchResults
+from ....models.domain import DomainStatus, SearchStatus
+from ....services.bulk_checker import bulk_checker
+from ....services.lookup_resilience import lookup_deadline
+from ....services.search_jobs import (
+    FINISHED_STATUSES, JOB_SEARCH_TYPE, job_progress, normalize_job_domains, search_jobs
+)
+from ....services.search_pipeline import format_search_event
+from ....schemas.search import Search, SearchJobCreate, SearchJobProgress
 
 router = APIRouter()
 
 
 @router.post("/domains/old-bulk-whois", response_model=DomainBulkSearchResponse, tags=["domains-legacy"], summary="Legacy bulk WHOIS lookup", description="This is the older endpoint for performing direct WHOIS lookups based on a query and TLD list. Consider using the new /domains/search for broader searches.")
-def search_domains(
+async def search_domains(
     *,
     db: Session = Depends(get_db),
     search_in: DomainSearchQuery,
@@ -36,49 +45,59 @@ def search_domains(
     """
     # Create a search record
     if save_search:
-        search = crud.domain.create_search(
-            db, query=search_in.query, user_id=current_user.id
+        search = await asyncio.to_thread(
+            crud.domain.create_search, db, query=search_in.query, user_id=current_user.id
         )
     else:
         search = None
     
-    # Perform WHOIS lookups for each domain combination
+    # Check every domain combination concurrently
+    base_query = search_in.query.lower()
+    full_domains = [f"{base_query}.{tld.lstrip('.')}" for tld in search_in.tlds]
+    checked = {}
+    # Lookups that miss the deadline are left out rather than reported as taken
+    with lookup_deadline(settings.LOOKUP_DEADLINE):
+        async for result in bulk_checker.check(full_domains):
+            if result.error:
+                logger.error(f"Error looking up domain {result.domain}: {result.error}")
+                continue
+            checked[result.domain] = result
+    
     results = []
     available_count = 0
     taken_count = 0
     premium_count = 0
     
-    # Generate domain combinations
-    base_query = search_in.query.lower()
-    for tld in search_in.tlds:
-        full_domain = f"{base_query}.{tld}"
-        try:
-            whois_result = whois_service.lookup_domain(full_domain)
-            domain_status = whois_result.get("status")
-            
-            # Update counts
-            if domain_status == DomainStatus.AVAILABLE:
-                available_count += 1
-            elif domain_status == DomainStatus.REGISTERED:
-                taken_count += 1
-            
-            # Add result
-            results.append({
-                "domain": full_domain,
-                "status": domain_status,
-                "registrar": whois_result.get("registrar"),
-                "creation_date": whois_result.get("creation_date"),
-                "expiration_date": whois_result.get("expiration_date"),
-                "name_servers": whois_result.get("name_servers"),
-                "is_available": domain_status == DomainStatus.AVAILABLE
-            })
-        except Exception as e:
-            logger.error(f"Error looking up domain {full_domain}: {str(e)}")
+    # Keep the order of the requested TLDs
+    for full_domain in full_domains:
+        result = checked.get(full_domain)
+        if result is None:
             continue
+        domain_status = DomainStatus.AVAILABLE if result.is_available else DomainStatus.REGISTERED
+        whois_data = result.whois_data or {}
+        
+        # Update counts
+        if domain_status == DomainStatus.AVAILABLE:
+            available_count += 1
+        else:
+            taken_count += 1
+        
+        # Add result
+        results.append({
+            "domain": full_domain,
+            "status": domain_status,
+            "registrar": whois_data.get("registrar"),
+            "creation_date": whois_data.get("creation_date"),
+            "expiration_date": whois_data.get("expiration_date"),
+            "name_servers": whois_data.get("name_servers"),
+            "is_available": result.is_available,
+            "freshness": result.freshness.value
+        })
     
     # If this was a saved search, create search results
     if search:
-        crud.domain.create_search_results(
+        await asyncio.to_thread(
+            crud.domain.create_search_results,
             db,
             search_id=search.id,
             results=results
@@ -178,6 +197,110 @@ async def advanced_domain_search(
     )
 
 
+def _get_job(db: Session, search_id: int, current_user: models.User) -> models.domain.Search:
+    """Load a bulk search job owned by the current user, or raise 404/403."""
+    search = crud.domain.get_search(db, search_id=search_id)
+    if not search or search.search_type != JOB_SEARCH_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Search job not found"
+        )
+    if search.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this search job"
+        )
+    return search
+
+
+@router.post("/jobs", response_model=SearchJobProgress, status_code=status.HTTP_202_ACCEPTED)
+async def create_search_job(
+    *,
+    db: Session = Depends(get_db),
+    job_in: SearchJobCreate,
+    current_user: models.User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Check up to SEARCH_JOB_MAX_DOMAINS domains in the background.
+    
+    Returns at once with the job's id; follow it with `GET /jobs/{id}` or
+    `GET /jobs/{id}/stream`, and read what it found from `/{id}/results`.
+    Entries that are not valid domains are returned and skipped.
+    """
+    if len(job_in.domains) > settings.SEARCH_JOB_MAX_DOMAINS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum of {settings.SEARCH_JOB_MAX_DOMAINS} domains can be checked in one job"
+        )
+    domains, invalid = normalize_job_domains(job_in.domains)
+    if not domains:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No valid domain names provided"
+        )
+    
+    search = search_jobs.submit(db, user_id=current_user.id, domains=domains, query=job_in.query)
+    logger.info(f"Search job {search.id} started for {len(domains)} domains ({len(invalid)} invalid)")
+    return {**job_progress(search), "invalid": invalid}
+
+
+@router.get("/jobs/{search_id}", response_model=SearchJobProgress)
+def get_search_job(
+    search_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get the progress of a bulk search job.
+    """
+    return job_progress(_get_job(db, search_id, current_user))
+
+
+@router.get("/jobs/{search_id}/stream")
+async def stream_search_job(
+    search_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    format: Optional[str] = Query(
+        None, pattern="^(sse|ndjson)$",
+        description="'sse' or 'ndjson'; defaults to SSE when the client accepts text/event-stream"
+    ),
+    current_user: models.User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Stream the progress of a bulk search job until it finishes.
+    
+    A 'progress' event is sent whenever the counters change, checked every
+    SEARCH_JOB_PROGRESS_INTERVAL seconds, and a final 'summary' event once
+    the job is no longer running.
+    """
+    _get_job(db, search_id, current_user)
+    if format is None:
+        format = "sse" if "text/event-stream" in request.headers.get("accept", "") else "ndjson"
+    sse = format == "sse"
+    
+    async def events() -> AsyncIterator[str]:
+        last = None
+        while True:
+            progress = await asyncio.to_thread(search_jobs.progress, search_id)
+            if progress is None:
+                return
+            finished = SearchStatus(progress["status"]) in FINISHED_STATUSES
+            if finished:
+                yield format_search_event("summary", progress, sse)
+                return
+            if progress != last:
+                yield format_search_event("progress", progress, sse)
+                last = progress
+            await asyncio.sleep(settings.SEARCH_JOB_PROGRESS_INTERVAL)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{search_id}", response_model=Search)
 def get_search(
     search_id: int,
@@ -229,9 +352,7 @@ def get_search_results(
             detail="Not authorized to access these search results"
         )
     
-    # TODO: Implement actual search results retrieval
-    # For now, return an empty list
-    return []
+    return crud.domain.get_search_domains(db, search_id=search_id, skip=skip, limit=limit)
 
 
 @router.delete("/{search_id}", response_model=Search)
@@ -1,14 +1,18 @@
 """API endpoints for domain watching functionality."""
+import logging
 from typing import Any, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from .... import models, schemas
+from ....core.config import settings
 from ....core.security import get_current_active_user
 from ....db.session import get_db
 from ....services.domain_monitor_service import DomainMonitorService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.post("/", response_model=schemas.DomainWatch, status_code=status.HTTP_201_CREATED)
@@ -191,16 +195,23 @@ async def check_domain_watch_now(
         )
     
     # Force a check
-    from ....utils.domain_checker import is_domain_available
-    is_available, whois_data = is_domain_available(watch.domain)
+    from ....services.lookup_resilience import LookupUnavailable, lookup_deadline
+    from ....services.outbound_scheduler import traffic_source
+    from ....utils.domain_checker import refresh_availability_async
+    try:
+        with traffic_source("check-now"), lookup_deadline(settings.LOOKUP_DEADLINE):
+            is_available, whois_data = await refresh_availability_async(watch.domain)
+        watch_status = "available" if is_available else "taken"
+    except LookupUnavailable as e:
+        logger.warning(f"Check of {watch.domain} got no answer: {str(e)}")
+        watch_status, whois_data = "unknown", None
     
     # Update watch status
-    status = "available" if is_available else "taken"
     watch = crud.domain_watch.update_last_checked(
         db,
         db_obj=watch,
-        status=status,
-        whois_data=whois_data.to_dict() if whois_data and hasattr(whois_data, 'to_dict') else None
+        status=watch_status,
+        whois_data=whois_data
     )
     
     return watch
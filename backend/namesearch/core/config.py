@@ -151,6 +151,133 @@ class Settings(BaseSettings):
     
     # WHOIS settings
     WHOIS_TIMEOUT: int = 10  # seconds
+    WHOIS_CONNECT_TIMEOUT: int = 5  # seconds
+    WHOIS_MAX_REFERRALS: int = 2  # registry -> registrar hops after IANA
+    WHOIS_ROUTES_PATH: Optional[str] = None  # overrides the shipped TLD -> server table
+    WHOIS_SERVER_CONCURRENCY: int = 4  # concurrent lookups per WHOIS server
+    WHOIS_SERVER_CONCURRENCY_OVERRIDES: Dict[str, int] = {}  # keyed by server hostname
+    BULK_CHECK_MAX_DOMAINS: int = 5000  # per bulk request
+    WHOIS_SEARCH_MAX_DOMAINS: int = 50  # per public /domains/whois/search request, more go to a job
+    SEARCH_MAX_TLDS: int = 20  # TLDs one search fans out over
+    SEARCH_REQUEST_CONCURRENCY: int = 8  # lookups one search may run at once
+    SEARCH_DEADLINE_MS: Optional[int] = None  # default search latency budget, None waits for every lookup
+    WHOIS_PARSE_WORKERS: int = 0  # processes parsing responses, 0 parses inline
+    # Outbound budgets per registry server, overridable per TLD
+    WHOIS_DEFAULT_RATE: float = 5.0  # requests per second
+    WHOIS_DEFAULT_BURST: int = 10
+    WHOIS_TLD_RATE_LIMITS: Dict[str, float] = {
+        "de": 1.0,  # DENIC blocks clients that exceed roughly one query per second
+        "ng": 1.0,
+    }
+    WHOIS_TLD_BURSTS: Dict[str, int] = {"de": 2, "ng": 2}
+    
+    # Background bulk search jobs
+    SEARCH_JOB_MAX_DOMAINS: int = 100000  # per job
+    SEARCH_JOB_CONCURRENCY: int = 32  # lookups one job may run at once
+    SEARCH_JOB_WRITE_BATCH: int = 500  # search results written per commit
+    SEARCH_JOB_PROGRESS_INTERVAL: float = 1.0  # seconds between streamed progress events
+    
+    # Lookup resilience: per-server circuit breakers, hedged secondary
+    # lookups (RDAP/DNS) and a deadline for each request's lookups
+    WHOIS_BREAKER_FAILURES: int = 5  # consecutive failures that open a server's breaker
+    WHOIS_BREAKER_RESET: float = 30.0  # seconds an open breaker fails fast before a probe
+    WHOIS_HEDGE_ENABLED: bool = True
+    WHOIS_HEDGE_QUANTILE: float = 0.95  # hedge once a lookup is slower than this quantile
+    WHOIS_HEDGE_MIN_DELAY: float = 0.25  # seconds
+    WHOIS_HEDGE_MAX_DELAY: float = 3.0  # seconds, also used until a server has samples
+    WHOIS_LATENCY_WINDOW: int = 200  # recent lookups per server the quantile is taken over
+    LOOKUP_DEADLINE: float = 12.0  # seconds a single-domain endpoint waits for an answer
+    
+    # RDAP settings
+    RDAP_BOOTSTRAP_URL: str = "https://data.iana.org/rdap/dns.json"
+    RDAP_BOOTSTRAP_CACHE_PATH: str = "~/.cache/namesearch/rdap_dns.json"
+    RDAP_BOOTSTRAP_MAX_AGE: int = 86400  # seconds
+    RDAP_TIMEOUT: float = 10.0  # seconds
+    RDAP_MAX_CONNECTIONS_PER_SERVER: int = 10
+    RDAP_KEEPALIVE_EXPIRY: float = 30.0  # seconds an idle connection is kept
+    
+    # DNS pre-check settings
+    DNS_PRECHECK_ENABLED: bool = True
+    DNS_TIMEOUT: float = 2.0  # seconds per query
+    DNS_RETRIES: int = 2
+    DNS_MAX_IN_FLIGHT: int = 500  # outstanding UDP queries per worker
+    DNS_ROOT_SERVERS: List[str] = [
+        "198.41.0.4",  # a.root-servers.net
+        "170.247.170.2",  # b.root-servers.net
+        "192.33.4.12",  # c.root-servers.net
+        "199.7.91.13",  # d.root-servers.net
+        "192.5.5.241",  # f.root-servers.net
+        "192.36.148.17",  # i.root-servers.net
+        "192.58.128.30",  # j.root-servers.net
+        "193.0.14.129",  # k.root-servers.net
+        "199.7.83.42",  # l.root-servers.net
+        "202.12.27.33",  # m.root-servers.net
+    ]
+    DNS_TLD_NAMESERVERS: Dict[str, List[str]] = {}  # e.g. {"com": ["192.5.6.30"]}
+    
+    # Zone file Bloom filter settings
+    ZONE_FILTER_ENABLED: bool = True
+    ZONE_FILTER_DIR: str = "~/.cache/namesearch/zone_filters"  # holds <tld>.bloom files
+    ZONE_FILTER_FP_RATE: float = 0.001
+    ZONE_FILTER_RELOAD_INTERVAL: float = 30.0  # seconds between checks for a new snapshot
+    # Registered names without nameservers are missing from zone files, so
+    # by default absence only skips the DNS pre-check and WHOIS still decides
+    ZONE_FILTER_TRUST_ABSENCE: bool = False
+    
+    # In-process availability cache bounds, see utils/cache.py
+    CACHE_MAX_ENTRIES: int = 200_000
+    CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # approximate
+    CACHE_SHARDS: int = 16  # independently locked shards
+    # Redis tier shared by all workers (REDIS_URL), in front of the network
+    CACHE_REDIS_ENABLED: bool = True
+    CACHE_REDIS_TIMEOUT: float = 0.1  # seconds; past this the lookup skips Redis
+    CACHE_REDIS_RETRY_AFTER: float = 30.0  # seconds Redis is skipped after an error
+    CACHE_L1_MAX_TTL: float = 300.0  # seconds entries stay in-process when Redis is on
+    # Cross-worker L1 eviction over pub/sub, see utils/cache_invalidation.py
+    CACHE_INVALIDATION_ENABLED: bool = True
+    CACHE_INVALIDATION_CHANNEL: str = "namesearch:cache:invalidate"
+    CACHE_L1_MAX_TTL_SUBSCRIBED: float = 3600.0  # replaces the bound above while subscribed
+    CACHE_INVALIDATION_RETRY_AFTER: float = 30.0  # seconds between reconnection attempts
+    # Persistent tier surviving restarts, see utils/disk_cache.py; None disables it
+    CACHE_DISK_PATH: Optional[str] = None  # e.g. "/var/cache/namesearch/availability.db"
+    CACHE_DISK_MAX_ENTRIES: int = 2_000_000
+    CACHE_DISK_MMAP_BYTES: int = 256 * 1024 * 1024
+    CACHE_DISK_COMPACT_INTERVAL: float = 300.0  # seconds
+    CACHE_DISK_RETRY_AFTER: float = 30.0  # seconds the disk tier is skipped after an error
+    # Warm-up from the domains table, see services/cache_warmer.py
+    CACHE_WARM_ON_STARTUP: bool = True
+    CACHE_WARM_LIMIT: int = 50_000  # domains loaded per run
+    CACHE_WARM_BATCH_SIZE: int = 1000
+    CACHE_WARM_HISTORY_DAYS: int = 7  # searches counted towards popularity
+    # The domains table as the tier behind Redis, see services/domain_store.py
+    CACHE_DB_TIER_ENABLED: bool = True
+    CACHE_DB_WRITEBACK_BATCH: int = 500  # answers per commit
+    CACHE_DB_WRITEBACK_INTERVAL: float = 2.0  # seconds an answer may wait
+    CACHE_DB_WRITEBACK_MAX_PENDING: int = 50_000
+    CACHE_DB_RETRY_AFTER: float = 30.0  # seconds table reads are skipped after an error
+    
+    # Availability cache TTLs in seconds, see utils/ttl_policy.py
+    CACHE_TTL_AVAILABLE: int = 3600
+    CACHE_TTL_REGISTERED: int = 86400  # registered, expiry date unknown
+    CACHE_TTL_MIN: int = 3600  # bounds of TTLs derived from the expiry date
+    CACHE_TTL_MAX: int = 7 * 86400
+    CACHE_TTL_EXPIRY_FRACTION: float = 0.25  # share of the time left until expiry
+    CACHE_TTL_EXPIRED: int = 3600  # past expiry: grace, redemption or auto-renew
+    # EPP statuses that put a domain on the path to deletion, lowercased
+    # without spaces so WHOIS ('pendingDelete') and RDAP ('pending delete') match
+    CACHE_TTL_EPP_STATUS: Dict[str, int] = {
+        "pendingdelete": 300,
+        "redemptionperiod": 900,
+        "pendingrestore": 900,
+        "pendingtransfer": 3600,
+    }
+    # Per-TLD overrides of the fields above, e.g. {"de": {"available": 600}}
+    CACHE_TTL_TLD_OVERRIDES: Dict[str, Dict[str, Any]] = {}
+    
+    # Stale-while-revalidate, see utils/revalidation.py
+    CACHE_STALE_GRACE: int = 900  # seconds stale entries are served, at most the TTL
+    CACHE_XFETCH_BETA: float = 1.0  # early refresh eagerness, 0 disables
+    CACHE_REFRESH_WORKERS: int = 4  # threads refreshing for blocking callers
     
     class Config:
         env_file = ".env"
@@ -1,13 +1,14 @@
 """CRUD operations for domains."""
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from sqlalchemy import func, or_, and_, not_
 from datetime import datetime, timedelta
 
 from ..models.domain import Domain, Search, SearchResult, DomainStatus, TLDType # Assuming DomainStatus and TLDType might be useful for filters
 from .base import CRUDBase
+from ..services.whois_archive import record_whois
 from ..schemas.domain import (
     DomainCreate, DomainUpdate, DomainSearchQuery, 
     AdvancedDomainSearchRequest, SortOrderEnum, KeywordMatchType,
@@ -46,12 +47,24 @@ class CRUDDomain(CRUDBase[Domain, DomainCreate, DomainUpdate]):
             else:
                 raise ValueError("Cannot create domain: name_part or tld_part is missing and domain_name_full cannot be derived.")
 
+        whois_data = db_obj_data.pop('whois_data', None)
         db_obj = Domain(**db_obj_data)
+        record_whois(db, db_obj, whois_data)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
     
+    def update(
+        self, db: Session, *, db_obj: Domain, obj_in: Union[DomainUpdate, Dict[str, Any]]
+    ) -> Domain:
+        """
+        Update a domain, archiving new WHOIS data and keeping only its hash on the row.
+        """
+        update_data = dict(obj_in) if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+        record_whois(db, db_obj, update_data.pop('whois_data', None))
+        return super().update(db, db_obj=db_obj, obj_in=update_data)
+
     def get_by_name(self, db: Session, *, domain_name_full: str) -> Optional[Domain]:
         """Get a domain by its full name."""
         return db.query(Domain).filter(Domain.domain_name_full == domain_name_full).first()
@@ -233,6 +246,10 @@ class CRUDDomain(CRUDBase[Domain, DomainCreate, DomainUpdate]):
         db.refresh(search)
         return search
     
+    def get_search(self, db: Session, *, search_id: int) -> Optional[Search]:
+        """Get a search record by ID."""
+        return db.query(Search).filter(Search.id == search_id).first()
+    
     def add_search_result(
         self, 
         db: Session, 
@@ -274,6 +291,67 @@ class CRUDDomain(CRUDBase[Domain, DomainCreate, DomainUpdate]):
             .all()
         )
 
+    def get_search_domains(
+        self,
+        db: Session,
+        *,
+        search_id: int,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Domain]:
+        """Get the domains found by a search, in the order they were recorded."""
+        return (
+            db.query(Domain)
+            .join(SearchResult, SearchResult.domain_id == Domain.id)
+            .filter(SearchResult.search_id == search_id)
+            .order_by(SearchResult.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+    
+    def iter_most_requested(
+        self,
+        db: Session,
+        *,
+        since: datetime,
+        limit: int,
+        batch_size: int = 1000
+    ) -> Iterator[Domain]:
+        """
+        Stream domains with WHOIS data, most searched since `since` first.
+        
+        Domains searched equally often come most recently updated first.
+        Rows are fetched `batch_size` at a time with their WHOIS archive
+        entries and detached from the session once the next batch is
+        fetched, so memory use does not grow with `limit`.
+        """
+        searched = (
+            db.query(SearchResult.domain_id, func.count(SearchResult.id).label("searches"))
+            .join(Search, Search.id == SearchResult.search_id)
+            .filter(Search.started_at >= since)
+            .group_by(SearchResult.domain_id)
+            .subquery()
+        )
+        query = (
+            db.query(Domain)
+            .outerjoin(searched, searched.c.domain_id == Domain.id)
+            .options(joinedload(Domain.whois_archive))
+            .filter(Domain.whois_last_updated.isnot(None))
+            .filter(Domain.status != DomainStatus.UNKNOWN)
+            .order_by(
+                func.coalesce(searched.c.searches, 0).desc(),
+                Domain.whois_last_updated.desc(),
+                Domain.id
+            )
+        )
+        for offset in range(0, limit, batch_size):
+            batch = query.offset(offset).limit(min(batch_size, limit - offset)).all()
+            yield from batch
+            if len(batch) < batch_size:
+                break
+            db.expunge_all()
+
 
 # Create a singleton instance
 domain = CRUDDomain(Domain)
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from .. import models, schemas
 from .base import CRUDBase
+from ..services.whois_archive import record_whois
 
 class CRUDDomainWatch(CRUDBase[models.DomainWatch, schemas.DomainWatchCreate, schemas.DomainWatchUpdate]):
     """CRUD operations for DomainWatch model."""
@@ -62,13 +63,16 @@ class CRUDDomainWatch(CRUDBase[models.DomainWatch, schemas.DomainWatchCreate, sc
     def update_last_checked(
         self, db: Session, *, db_obj: models.DomainWatch, status: str, whois_data: Optional[Dict[str, Any]] = None
     ) -> models.DomainWatch:
-        """Update the last checked timestamp for a domain watch."""
+        """Update the last checked timestamp for a domain watch.
+        
+        WHOIS data goes to the archive; the watch only references it, and its
+        WHOIS columns are left untouched when the answer has not changed.
+        """
         update_data = {
             "last_checked": datetime.utcnow(),
             "last_status": status
         }
-        if whois_data:
-            update_data["whois_data"] = whois_data
+        record_whois(db, db_obj, whois_data)
             
         return self.update(db, db_obj=db_obj, obj_in=update_data)
 
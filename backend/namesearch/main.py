@@ -8,7 +8,12 @@ from . import models
 from .api.v1.api import api_router
 from .core.config import settings
 from .db.session import engine, SessionLocal
+from .services.cache_warmer import cache_warmer
 from .services.domain_monitor import get_domain_monitor
+from .services.domain_store import domain_store
+from .services.search_jobs import search_jobs
+from .utils.cache import domain_cache
+from .utils.cache_invalidation import invalidation_bus
 from .db.base import Base
 
 # Create database tables
@@ -19,9 +24,18 @@ async def lifespan(app: FastAPI):
     # Startup: Initialize domain monitor
     monitor = get_domain_monitor()
     asyncio.create_task(monitor.start())
+    if settings.CACHE_INVALIDATION_ENABLED:
+        invalidation_bus.start()
+    if settings.CACHE_WARM_ON_STARTUP:
+        cache_warmer.start()
     yield
     # Shutdown: Clean up
     await monitor.stop()
+    await invalidation_bus.stop()
+    await search_jobs.stop()
+    domain_store.close()
+    if domain_cache.disk is not None:
+        domain_cache.disk.close()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -14,6 +14,7 @@ from .base import Base
 from .domain import TLDType, DomainStatus, SearchStatus
 
 # Then import models without relationships
+from .whois_archive import WhoisArchive
 from .domain import Domain, Search, SearchResult
 from .notification import Notification, NotificationType, NotificationStatus
 
@@ -52,6 +53,7 @@ __all__: List[str] = [
     'TLDType',
     'DomainStatus',
     'SearchStatus',
+    'WhoisArchive',
     
     # Project models
     'Project',
@@ -1,6 +1,6 @@
 """Domain and search result models."""
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from enum import Enum
 
 from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, JSON, Boolean, Enum as SQLEnum, Text, Float
@@ -63,7 +63,7 @@ class Domain(Base):
 
     # Dates & Age
     registered_date = Column(DateTime, nullable=True, index=True, comment="Date the domain was registered")
-    # expiration_date can be derived from WHOIS or stored if frequently needed for filtering
+    expiration_date = Column(DateTime, nullable=True, index=True, comment="Registry expiry date from WHOIS")
 
     # Metrics & Scores
     quality_score = Column(Float, nullable=True, index=True, comment="A generic quality score, 0-100")
@@ -74,12 +74,20 @@ class Domain(Base):
     # Language
     language = Column(String(10), nullable=True, index=True, comment="Detected language of the domain content or target audience (e.g., 'en', 'es')")
 
-    # WHOIS data
-    whois_data = Column(JSON, nullable=True)
+    # WHOIS data: the full answer lives in the archive, rows keep its hash
+    whois_hash = Column(String(64), ForeignKey("whois_archive.content_hash"), nullable=True, index=True)
+    registrar = Column(String(255), nullable=True)
     whois_last_updated = Column(DateTime, nullable=True)
     
     # Relationships
     searches = relationship("namesearch.models.domain.SearchResult", back_populates="domain")
+    whois_archive = relationship("namesearch.models.whois_archive.WhoisArchive")
+    
+    @property
+    def whois_data(self) -> Optional[Dict[str, Any]]:
+        """Parsed WHOIS data, decoded from the archive on first access."""
+        from ..services.whois_archive import row_whois
+        return row_whois(self, self.domain_name_full)
     
     def __repr__(self) -> str:
         return f"<Domain {self.domain_name_full}>"
@@ -2,7 +2,7 @@
 from datetime import datetime
 from typing import Dict, Any, Optional, TYPE_CHECKING
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -18,10 +18,20 @@ class DomainWatch(Base):
     check_frequency = Column(Integer, default=60, nullable=False)  # in minutes
     last_checked = Column(DateTime, nullable=True)
     last_status = Column(String(20), nullable=True)  # 'available', 'taken', 'unknown'
-    whois_data = Column(JSON, nullable=True)
+    # Latest WHOIS answer, stored once in the archive
+    whois_hash = Column(String(64), ForeignKey("whois_archive.content_hash"), nullable=True, index=True)
+    registrar = Column(String(255), nullable=True)
+    expiration_date = Column(DateTime, nullable=True)
     
     # Relationships
     user = relationship("namesearch.models.user.User", back_populates="domain_watches")
+    whois_archive = relationship("namesearch.models.whois_archive.WhoisArchive")
+    
+    @property
+    def whois_data(self) -> Optional[Dict[str, Any]]:
+        """Parsed WHOIS data, decoded from the archive on first access."""
+        from ..services.whois_archive import row_whois
+        return row_whois(self, self.domain)
     
     def __repr__(self) -> str:
         return f"<DomainWatch {self.domain} (User {self.user_id})>"
@@ -36,6 +46,8 @@ class DomainWatch(Base):
             "check_frequency": self.check_frequency,
             "last_checked": self.last_checked.isoformat() if self.last_checked else None,
             "last_status": self.last_status,
+            "registrar": self.registrar,
+            "expiration_date": self.expiration_date.isoformat() if self.expiration_date else None,
             "whois_data": self.whois_data,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
@@ -0,0 +1,24 @@
+"""Content-addressed archive of WHOIS responses."""
+from sqlalchemy import Column, Integer, LargeBinary, String
+
+from .base import Base
+
+
+class WhoisArchive(Base):
+    """
+    One compressed WHOIS response, keyed by the SHA-256 of its content.
+
+    Domains and watches point at an entry through their `whois_hash`, so an
+    unchanged answer is stored once however often it is fetched.
+    """
+
+    __tablename__ = "whois_archive"
+
+    content_hash = Column(String(64), primary_key=True, comment="SHA-256 of the uncompressed content")
+    codec = Column(String(8), nullable=False, comment="Compression codec: 'zlib' or 'zstd'")
+    content_type = Column(String(8), nullable=False, comment="'text' for a raw response, 'json' for parsed fields")
+    size = Column(Integer, nullable=False, comment="Uncompressed size in bytes")
+    payload = Column(LargeBinary, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<WhoisArchive {self.content_hash[:12]} ({self.content_type}, {self.codec})>"
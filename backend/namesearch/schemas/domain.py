@@ -73,6 +73,8 @@ class DomainInDBBase(DomainBase):
     search_volume: Optional[int] = None
     cpc: Optional[float] = None
     language: Optional[str] = None
+    registrar: Optional[str] = None
+    expiration_date: Optional[datetime] = None
     whois_last_updated: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
@@ -115,6 +117,11 @@ class DomainSearchQuery(BaseModel):
         default=False,
         description="Whether to include WHOIS data in the response"
     )
+    deadline_ms: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Milliseconds to wait for lookups; slower domains are returned pending"
+    )
 
 
 
@@ -129,6 +136,8 @@ class DomainSearchResult(BaseModel):
     price: Optional[float] = None
     currency: str = "USD"
     whois_data: Optional[Dict[str, Any]] = None
+    freshness: Optional[str] = Field(None, description="'live', 'fresh' or 'stale' (cached, being refreshed)")
+    pending: bool = Field(False, description="Lookup missed the search deadline and is still running")
 
 
 class DomainBulkSearchResponse(BaseModel):
@@ -138,6 +147,7 @@ class DomainBulkSearchResponse(BaseModel):
     available: int
     taken: int
     premium: int
+    pending: int = 0
 
 
 # Schemas for Advanced Domain Search with Filters
@@ -43,6 +43,8 @@ class DomainWatchInDBBase(DomainWatchBase):
     user_id: int
     last_checked: Optional[datetime] = None
     last_status: Optional[str] = None
+    registrar: Optional[str] = None
+    expiration_date: Optional[datetime] = None
     whois_data: Optional[Dict[str, Any]] = None
     created_at: datetime
     updated_at: datetime
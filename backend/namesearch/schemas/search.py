@@ -120,6 +120,27 @@ Search = SearchResponse
 SearchResult = SearchResultResponse
 SearchResults = List[SearchResultResponse]
 
+class SearchJobCreate(BaseModel):
+    """Schema for starting a bulk search job."""
+    domains: List[str] = Field(..., min_length=1, description="Full domain names to check, e.g. ['example.com']")
+    query: Optional[str] = Field(None, max_length=255, description="Label for the job in search history")
+
+
+class SearchJobProgress(BaseModel):
+    """Progress of a bulk search job."""
+    id: int
+    status: SearchStatus
+    total: int = Field(..., description="Distinct valid domains in the job")
+    checked: int = Field(..., description="Domains checked and written so far")
+    available: int = 0
+    taken: int = 0
+    premium: int = 0
+    invalid: List[str] = Field(default_factory=list, description="Submitted entries that are not valid domains")
+    error: Optional[str] = None
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+
+
 class SearchHistory(BaseModel):
     """Search history response schema."""
     searches: List[SearchResponse]
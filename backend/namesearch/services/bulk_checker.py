@@ -0,0 +1,185 @@
+"""Concurrent availability checks for large batches of domains."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+from ..core.config import settings
+from ..utils.domain_checker import (
+    availability_flight, cache_availability_async, cached_availability_async, normalize_domain,
+    stored_availability_async, whois_availability, zone_filter_answer
+)
+from ..utils.revalidation import Freshness
+from .dns_precheck import DnsPrecheckEngine, DnsVerdict, dns_precheck
+from .lookup_resilience import LookupUnavailable
+from .whois_client import whois_client
+from .zone_filter import ZoneVerdict
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AvailabilityResult:
+    """Availability of one domain from a bulk check."""
+    domain: str
+    is_available: bool
+    whois_data: Optional[Dict[str, Any]] = None
+    # 'cache', 'zone', 'db', 'dns', 'whois', 'flight' (joined a concurrent
+    # lookup of the same domain) or 'invalid'
+    source: str = "whois"
+    error: Optional[str] = None
+    freshness: Freshness = Freshness.LIVE
+
+
+class BulkAvailabilityChecker:
+    """
+    Checks thousands of domains concurrently.
+
+    Domains are grouped by the WHOIS server that answers for them and each
+    server gets its own semaphore, so one slow or strict registry cannot
+    starve the others. Results are yielded as soon as they are known.
+    """
+
+    def __init__(
+        self,
+        per_server_limit: Optional[int] = None,
+        server_limits: Optional[Dict[str, int]] = None,
+        precheck: Optional[DnsPrecheckEngine] = None,
+    ):
+        """
+        Initialize the checker.
+
+        Args:
+            per_server_limit: Concurrent WHOIS lookups allowed per server
+            server_limits: Overrides of the limit keyed by server
+            precheck: DNS pre-check engine, None to use the shared one
+        """
+        self.per_server_limit = per_server_limit or settings.WHOIS_SERVER_CONCURRENCY
+        self.server_limits = (
+            server_limits if server_limits is not None else settings.WHOIS_SERVER_CONCURRENCY_OVERRIDES
+        )
+        self.precheck = precheck or dns_precheck
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def server_key(domain: str) -> str:
+        """Return the key of the WHOIS server responsible for a domain."""
+        # TLDs sharing a registry server (com/net) share its limit
+        return whois_client.route(domain) or domain.rsplit(".", 1)[-1]
+
+    def _semaphore(self, key: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Semaphores belong to the loop that first waits on them
+            self._loop = loop
+            self._semaphores = {}
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.server_limits.get(key, self.per_server_limit))
+            self._semaphores[key] = semaphore
+        return semaphore
+
+    async def check_one(self, domain: str) -> AvailabilityResult:
+        """
+        Check a single domain under its server's concurrency limit.
+
+        Args:
+            domain: Domain name as supplied by the user
+
+        Returns:
+            The availability result, never raises for lookup failures
+        """
+        normalized = normalize_domain(domain)
+        if normalized is None:
+            return AvailabilityResult(
+                domain=domain, is_available=False, source="invalid", error="Invalid domain format"
+            )
+
+        cached = await cached_availability_async(normalized)
+        if cached is not None:
+            (is_available, whois_data), freshness = cached
+            return AvailabilityResult(
+                domain=domain,
+                is_available=is_available,
+                whois_data=whois_data,
+                source="cache",
+                freshness=freshness,
+            )
+
+        verdict, zone_result = zone_filter_answer(normalized)
+        if zone_result is not None:
+            return AvailabilityResult(domain=domain, is_available=zone_result[0], source="zone")
+
+        started = time.monotonic()
+        stored = await stored_availability_async(normalized)
+        if stored is not None:
+            (is_available, whois_data), freshness = stored
+            return AvailabilityResult(
+                domain=domain,
+                is_available=is_available,
+                whois_data=whois_data,
+                source="db",
+                freshness=freshness,
+            )
+
+        source = "flight"
+
+        async def lookup():
+            nonlocal source
+            if (
+                settings.DNS_PRECHECK_ENABLED
+                and verdict != ZoneVerdict.NOT_IN_ZONE
+                and await self.precheck.check(normalized) == DnsVerdict.DELEGATED
+            ):
+                result = (False, None)
+                source = "dns"
+            else:
+                async with self._semaphore(self.server_key(normalized)):
+                    result = await whois_availability(normalized)
+                source = "whois"
+            await cache_availability_async(normalized, result, time.monotonic() - started)
+            return result
+
+        try:
+            # Shared with every other lookup of the domain in this process, so
+            # concurrent searches for it send the registry one query
+            result = await availability_flight.do_async(normalized, lookup)
+        except LookupUnavailable as e:
+            # Unknown, not taken; nothing is cached so the next check retries
+            logger.warning(f"No answer for domain {domain}: {str(e)}")
+            return AvailabilityResult(domain=domain, is_available=False, error=str(e))
+        except Exception as e:
+            logger.error(f"Error checking domain {domain}: {str(e)}", exc_info=True)
+            return AvailabilityResult(domain=domain, is_available=False, error=str(e))
+
+        return AvailabilityResult(
+            domain=domain, is_available=result[0], whois_data=result[1], source=source
+        )
+
+    async def check(self, domains: Iterable[str]) -> AsyncIterator[AvailabilityResult]:
+        """
+        Check many domains, yielding results in completion order.
+
+        Args:
+            domains: Domain names, duplicates are checked once
+
+        Yields:
+            AvailabilityResult for every distinct domain
+        """
+        tasks = [
+            asyncio.ensure_future(self.check_one(domain))
+            for domain in dict.fromkeys(domains)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Consumers that stop early must not leave lookups running
+            for task in tasks:
+                task.cancel()
+
+
+# Shared checker instance
+bulk_checker = BulkAvailabilityChecker()
@@ -0,0 +1,129 @@
+"""Warm the availability cache from stored domains after a restart.
+
+The `domains` table keeps the last answer for every domain looked up through
+WHOISService. At startup, and when an admin asks for it, the domains searched
+most over the recent history window (then the most recently updated ones)
+are streamed into the cache in batches. Each answer keeps the TTL it would
+have had when it was looked up, counted from `whois_last_updated`, so old
+rows come in stale (and are refreshed on first use) or not at all.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..utils.cache import get_cached_domain
+from ..utils.domain_checker import cache_availability
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupReport:
+    """Outcome of one warm-up run."""
+    scanned: int = 0
+    warmed: int = 0
+    already_cached: int = 0
+    expired: int = 0
+    seconds: float = 0.0
+
+
+class CacheWarmer:
+    """Loads stored availability answers into the cache in batches."""
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        """
+        Initialize the warmer.
+
+        Args:
+            session_factory: Creates database sessions, defaults to SessionLocal
+        """
+        self.session_factory = session_factory
+        self.last_report: Optional[WarmupReport] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from ..db.session import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def warm(
+        self,
+        limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        history_days: Optional[int] = None,
+    ) -> WarmupReport:
+        """
+        Stream stored answers into the cache; blocks, run it in a thread.
+
+        Entries already cached, in this process or in Redis, are left alone
+        since they are at least as recent as the database.
+
+        Args:
+            limit: Most domains to load, defaults to CACHE_WARM_LIMIT
+            batch_size: Rows fetched per round trip, defaults to CACHE_WARM_BATCH_SIZE
+            history_days: Searches counted for popularity, defaults to CACHE_WARM_HISTORY_DAYS
+
+        Returns:
+            Counts of the rows scanned, loaded and skipped
+        """
+        from .. import crud
+
+        limit = limit or settings.CACHE_WARM_LIMIT
+        batch_size = batch_size or settings.CACHE_WARM_BATCH_SIZE
+        history_days = history_days or settings.CACHE_WARM_HISTORY_DAYS
+        report = WarmupReport()
+        started = time.monotonic()
+        db = self._session()
+        try:
+            rows = crud.domain.iter_most_requested(
+                db,
+                since=datetime.utcnow() - timedelta(days=history_days),
+                limit=limit,
+                batch_size=batch_size,
+            )
+            for row in rows:
+                report.scanned += 1
+                domain = row.domain_name_full.lower()
+                if get_cached_domain(domain) is not None:
+                    report.already_cached += 1
+                    continue
+                is_available = bool(row.is_available)
+                whois_data = None if is_available else row.whois_data
+                if cache_availability(domain, (is_available, whois_data), checked_at=row.whois_last_updated):
+                    report.warmed += 1
+                else:
+                    report.expired += 1
+        except SQLAlchemyError as e:
+            # A cold cache is slower, not broken
+            logger.error(f"Cache warm-up stopped after {report.scanned} domains: {str(e)}")
+        finally:
+            db.close()
+        report.seconds = round(time.monotonic() - started, 3)
+        self.last_report = report
+        logger.info(
+            f"Cache warm-up loaded {report.warmed} of {report.scanned} stored domains "
+            f"({report.already_cached} already cached, {report.expired} too old) in {report.seconds}s"
+        )
+        return report
+
+    def start(self) -> None:
+        """Warm up in a worker thread without holding up the running loop."""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(asyncio.to_thread(self.warm))
+
+    def stats(self) -> Dict[str, Any]:
+        running = self._task is not None and not self._task.done()
+        return {"running": running, **(asdict(self.last_report) if self.last_report is not None else {})}
+
+
+# Shared cache warmer instance
+cache_warmer = CacheWarmer()
@@ -0,0 +1,307 @@
+"""Batched DNS availability pre-check against TLD authoritative nameservers.
+
+NS queries for candidate domains are pipelined over UDP straight to the
+servers of each TLD, so a name that is delegated in the zone can be
+triaged as registered without any WHOIS traffic.
+"""
+import asyncio
+import logging
+import random
+import struct
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DNS_PORT = 53
+TYPE_A = 1
+TYPE_NS = 2
+CLASS_IN = 1
+RCODE_NOERROR = 0
+RCODE_NXDOMAIN = 3
+
+
+class DnsVerdict(str, Enum):
+    """Outcome of a pre-check for one domain."""
+    DELEGATED = "delegated"  # NS records exist in the TLD zone, domain is registered
+    NXDOMAIN = "nxdomain"  # Not in the zone, a WHOIS candidate
+    UNKNOWN = "unknown"  # Timeout, SERVFAIL or an answer we could not classify
+
+
+class DnsPrecheckError(Exception):
+    """Raised when no nameserver could be found or reached for a TLD, or its answer is malformed."""
+
+
+def build_query(query_id: int, name: str, qtype: int = TYPE_NS) -> bytes:
+    """Encode a non-recursive DNS query for a single question."""
+    header = struct.pack("!HHHHHH", query_id, 0, 1, 0, 0, 0)
+    qname = b"".join(
+        bytes([len(label)]) + label.encode("ascii")
+        for label in name.strip(".").split(".") if label
+    ) + b"\x00"
+    return header + qname + struct.pack("!HH", qtype, CLASS_IN)
+
+
+def _read_name(packet: bytes, offset: int) -> Tuple[str, int]:
+    """
+    Decode a possibly compressed name, returning it and the offset after it.
+
+    Raises:
+        DnsPrecheckError: If the name runs past the end of the packet or loops
+    """
+    labels: List[str] = []
+    end: Optional[int] = None
+    for _ in range(128):  # Guards against pointer loops
+        if offset >= len(packet):
+            raise DnsPrecheckError("Truncated DNS name")
+        length = packet[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(packet):
+                raise DnsPrecheckError("Truncated DNS name pointer")
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | packet[offset + 1]
+            continue
+        if length == 0:
+            return ".".join(labels).lower(), end if end is not None else offset + 1
+        if offset + 1 + length > len(packet):
+            raise DnsPrecheckError("Truncated DNS label")
+        labels.append(packet[offset + 1:offset + 1 + length].decode("ascii", errors="replace"))
+        offset += length + 1
+    raise DnsPrecheckError("DNS name compression loop")
+
+
+def parse_response(packet: bytes) -> Tuple[int, int, List[Tuple[str, int, bytes, int, int]]]:
+    """
+    Parse a DNS response into its id, rcode and resource records.
+
+    Returns:
+        Tuple of (query_id, rcode, records) where each record is
+        (owner, type, packet, rdata_offset, rdata_length)
+
+    Raises:
+        DnsPrecheckError: If the packet is truncated or malformed
+    """
+    if len(packet) < 12:
+        raise DnsPrecheckError("Truncated DNS header")
+    query_id, flags, qdcount, ancount, nscount, arcount = struct.unpack("!HHHHHH", packet[:12])
+    offset = 12
+    for _ in range(qdcount):
+        _, offset = _read_name(packet, offset)
+        offset += 4
+
+    records = []
+    for _ in range(ancount + nscount + arcount):
+        owner, offset = _read_name(packet, offset)
+        if offset + 10 > len(packet):
+            raise DnsPrecheckError("Truncated DNS record")
+        rtype, _, _, rdlength = struct.unpack("!HHIH", packet[offset:offset + 10])
+        offset += 10
+        if offset + rdlength > len(packet):
+            raise DnsPrecheckError("Truncated DNS record data")
+        records.append((owner, rtype, packet, offset, rdlength))
+        offset += rdlength
+    return query_id, flags & 0x000F, records
+
+
+class _DnsTransport(asyncio.DatagramProtocol):
+    """One UDP socket to a nameserver with many queries in flight at once."""
+
+    def __init__(self):
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12:
+            return
+        query_id = struct.unpack("!H", data[:2])[0]
+        future = self.pending.pop(query_id, None)
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc):
+        logger.debug(f"DNS transport error: {exc!r}")
+
+    def connection_lost(self, exc):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(exc or ConnectionError("DNS socket closed"))
+        self.pending.clear()
+
+    async def query(self, name: str, qtype: int, timeout: float) -> bytes:
+        """Send one query and wait for the matching answer."""
+        loop = asyncio.get_running_loop()
+        query_id = random.getrandbits(16)
+        while query_id in self.pending:
+            query_id = random.getrandbits(16)
+        future = loop.create_future()
+        self.pending[query_id] = future
+        self.transport.sendto(build_query(query_id, name, qtype))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(query_id, None)
+
+
+class DnsPrecheckEngine:
+    """Classifies domains as delegated or NXDOMAIN using the TLD's own servers."""
+
+    def __init__(
+        self,
+        root_servers: Optional[List[str]] = None,
+        tld_nameservers: Optional[Dict[str, List[str]]] = None,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        port: int = DNS_PORT,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            root_servers: Root server addresses used to discover TLD nameservers
+            tld_nameservers: Known nameserver addresses per TLD, skipping discovery
+            timeout: Seconds to wait for each answer
+            retries: Extra attempts, each against the next nameserver of the TLD
+            max_in_flight: Maximum number of outstanding queries
+            port: UDP port of the servers, 53 unless testing against a local server
+        """
+        self.root_servers = root_servers or list(settings.DNS_ROOT_SERVERS)
+        self.timeout = timeout if timeout is not None else settings.DNS_TIMEOUT
+        self.retries = retries if retries is not None else settings.DNS_RETRIES
+        self.port = port
+        self._max_in_flight = max_in_flight or settings.DNS_MAX_IN_FLIGHT
+        self._tld_servers: Dict[str, List[str]] = {
+            tld.lower().strip("."): list(servers)
+            for tld, servers in (tld_nameservers or settings.DNS_TLD_NAMESERVERS).items()
+        }
+        self._transports: Dict[str, _DnsTransport] = {}
+        self._discovery: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind_loop(self) -> None:
+        """Reset per-loop state when used from a new event loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._transports = {}
+            self._discovery = {}
+            self._semaphore = asyncio.Semaphore(self._max_in_flight)
+
+    async def _transport(self, address: str) -> _DnsTransport:
+        transport = self._transports.get(address)
+        if transport is None or transport.transport is None or transport.transport.is_closing():
+            _, transport = await self._loop.create_datagram_endpoint(
+                _DnsTransport, remote_addr=(address, self.port)
+            )
+            self._transports[address] = transport
+        return transport
+
+    async def _ask(self, servers: List[str], name: str, qtype: int) -> bytes:
+        """Query the given servers in turn until one answers."""
+        last_error: Optional[BaseException] = None
+        start = random.randrange(len(servers))
+        for attempt in range(self.retries + 1):
+            address = servers[(start + attempt) % len(servers)]
+            try:
+                async with self._semaphore:
+                    transport = await self._transport(address)
+                    return await transport.query(name, qtype, self.timeout)
+            except (asyncio.TimeoutError, OSError) as e:
+                last_error = e
+        raise DnsPrecheckError(f"No answer for {name} from {servers}: {last_error!r}")
+
+    async def _discover(self, tld: str) -> List[str]:
+        """Ask a root server for the TLD delegation and use the glue addresses."""
+        packet = await self._ask(self.root_servers, tld, TYPE_NS)
+        _, _, records = parse_response(packet)
+        addresses = [
+            ".".join(str(b) for b in data[offset:offset + 4])
+            for owner, rtype, data, offset, length in records
+            if rtype == TYPE_A and length == 4
+        ]
+        if not addresses:
+            raise DnsPrecheckError(f"No glue addresses for .{tld} nameservers")
+        return addresses
+
+    async def tld_nameservers(self, tld: str) -> List[str]:
+        """Return the authoritative nameserver addresses for a TLD."""
+        self._bind_loop()
+        tld = tld.lower().strip(".")
+        if tld in self._tld_servers:
+            return self._tld_servers[tld]
+        task = self._discovery.get(tld)
+        if task is None:
+            task = self._loop.create_task(self._discover(tld))
+            self._discovery[tld] = task
+        try:
+            servers = await asyncio.shield(task)
+        except DnsPrecheckError:
+            self._discovery.pop(tld, None)
+            raise
+        self._tld_servers[tld] = servers
+        return servers
+
+    @staticmethod
+    def classify(domain: str, packet: bytes) -> DnsVerdict:
+        """Classify an NS answer from a TLD server."""
+        _, rcode, records = parse_response(packet)
+        if rcode == RCODE_NXDOMAIN:
+            return DnsVerdict.NXDOMAIN
+        if rcode != RCODE_NOERROR:
+            return DnsVerdict.UNKNOWN
+        if any(rtype == TYPE_NS and owner == domain for owner, rtype, *_ in records):
+            return DnsVerdict.DELEGATED
+        return DnsVerdict.UNKNOWN
+
+    async def check(self, domain: str) -> DnsVerdict:
+        """
+        Pre-check a single normalized domain.
+
+        Args:
+            domain: Domain name such as 'example.com'
+
+        Returns:
+            The DNS verdict, UNKNOWN if the TLD servers could not be reached
+        """
+        self._bind_loop()
+        domain = domain.lower().strip(".")
+        tld = domain.rsplit(".", 1)[-1]
+        try:
+            servers = await self.tld_nameservers(tld)
+            packet = await self._ask(servers, domain, TYPE_NS)
+            return self.classify(domain, packet)
+        except DnsPrecheckError as e:
+            logger.debug(f"DNS pre-check inconclusive for {domain}: {e}")
+            return DnsVerdict.UNKNOWN
+
+    async def triage(self, domains: Iterable[str]) -> Dict[str, DnsVerdict]:
+        """
+        Pre-check many domains concurrently.
+
+        Args:
+            domains: Normalized domain names
+
+        Returns:
+            Mapping of domain to verdict
+        """
+        domains = list(dict.fromkeys(domains))
+        verdicts = await asyncio.gather(*(self.check(domain) for domain in domains))
+        return dict(zip(domains, verdicts))
+
+    def close(self) -> None:
+        """Close all open sockets."""
+        for transport in self._transports.values():
+            if transport.transport is not None:
+                transport.transport.close()
+        self._transports = {}
+
+
+# Shared engine instance
+dns_precheck = DnsPrecheckEngine()
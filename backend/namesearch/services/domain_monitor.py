@@ -10,8 +10,9 @@ from namesearch import crud, schemas
 from namesearch.models import domain_watch
 from namesearch.core.config import settings
 from namesearch.db.session import get_db
-from namesearch.utils.domain_checker import is_domain_available
+from namesearch.utils.domain_checker import refresh_availability_async
 from namesearch.utils.cache import cache_domain, get_cached_domain
+from namesearch.services.outbound_scheduler import outbound_source
 
 logger = logging.getLogger(__name__)
 
@@ -72,14 +73,15 @@ class DomainMonitor:
     async def _monitor_domain(self, watch: domain_watch.DomainWatch):
         """Monitor a single domain for changes."""
         logger.info(f"Starting monitoring for domain: {watch.domain}")
+        outbound_source.set("monitor")  # This task's lookups queue as monitor traffic
         
         check_interval = timedelta(minutes=settings.DOMAIN_CHECK_INTERVAL_MINUTES)
         last_status = watch.last_status
         
         while self.running:
             try:
-                # Check domain availability
-                is_available, whois_data = is_domain_available(watch.domain)
+                # Check domain availability; a cached answer would hide changes
+                is_available, whois_data = await refresh_availability_async(watch.domain)
                 current_status = "available" if is_available else "taken"
                 
                 # Check for status change
@@ -10,7 +10,10 @@ from fastapi import HTTPException, status, BackgroundTasks
 from ..crud.domain_watch import domain_watch as crud_domain_watch
 from ..models.domain_watch import DomainWatch
 from ..schemas.domain_watch import DomainWatchCreate, DomainWatchUpdate
+from ..utils.cache_invalidation import invalidate_domains
 from .whois_service import whois_service
+from .outbound_scheduler import outbound_source
+from .whois_archive import record_whois
 from .notification_service import NotificationService, NotificationType
 
 if TYPE_CHECKING:
@@ -73,6 +76,7 @@ class DomainMonitorService:
             check_interval: Seconds between monitoring cycles
         """
         logger.info("Starting domain monitor loop")
+        outbound_source.set("monitor")  # This task's lookups queue as monitor traffic
         
         while self._monitoring:
             try:
@@ -117,10 +121,11 @@ class DomainMonitorService:
             # Store the previous status for change detection
             previous_status = watch.last_status
             
-            # Update the watch with the latest data
+            # Update the watch with the latest data; an unchanged WHOIS
+            # answer leaves the archive and the watch's WHOIS columns alone
             watch.last_checked = datetime.utcnow()
             watch.last_status = whois_data.get('status', 'unknown')
-            watch.whois_data = whois_data
+            record_whois(db, watch, whois_data)
             
             db.add(watch)
             db.commit()
@@ -165,6 +170,8 @@ class DomainMonitorService:
         # Check for status changes
         if current_status != previous_status:
             logger.info(f"Status changed for {watch.domain}: {previous_status} -> {current_status}")
+            # No worker may keep serving the old answer from its cache
+            invalidate_domains([watch.domain])
             
             # Determine notification type based on status change
             notification_type = None
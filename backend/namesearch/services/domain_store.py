@@ -0,0 +1,263 @@
+"""The `domains` table as the durable tier of the availability cache.
+
+Lookups that miss memory and Redis read the domain's row before going to the
+network, and answers are only trusted while the row is within its TTL,
+counted from `whois_last_updated`. Answers from the network are written back
+to the table by a background thread in batches, so the request path never
+waits on a database write and one commit covers many lookups.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session, joinedload
+
+from ..core.config import settings
+from ..models.domain import Domain, DomainStatus, TLDType
+from .whois_archive import record_whois
+
+logger = logging.getLogger(__name__)
+
+# Legacy generic TLDs; other two-letter TLDs are country codes, the rest new gTLDs
+_LEGACY_GTLDS = frozenset({"com", "net", "org", "info", "biz", "edu", "gov", "mil", "int"})
+
+
+def tld_type(tld: str) -> TLDType:
+    """Classify a TLD for new `domains` rows."""
+    tld = tld.lower()
+    if tld in _LEGACY_GTLDS:
+        return TLDType.GTLD
+    if tld == "arpa":
+        return TLDType.INFRASTRUCTURE
+    if len(tld) == 2:
+        return TLDType.CCTLD
+    return TLDType.NGTDLD
+
+
+def new_domain_row(domain: str) -> Domain:
+    """Build an unchecked `domains` row for a normalized domain."""
+    name_part, tld_part = domain.split(".", 1)
+    return Domain(
+        domain_name_full=domain,
+        name_part=name_part,
+        tld_part=tld_part,
+        name_part_length=len(name_part),
+        tld_type=tld_type(domain.rsplit(".", 1)[-1]),
+    )
+
+
+def insert_domain_row(db: Session, domain: str) -> Optional[Domain]:
+    """
+    Add an unchecked row for a normalized domain, or load the one another
+    worker inserted first.
+
+    The insert runs in its own savepoint, so a conflict undoes only this
+    row and not the caller's transaction.
+
+    Returns:
+        The domain's row, or None if it could neither be added nor found
+    """
+    row = new_domain_row(domain)
+    try:
+        with db.begin_nested():
+            db.add(row)
+    except IntegrityError:
+        row = db.query(Domain).filter(Domain.domain_name_full == domain).first()
+        if row is None:
+            logger.warning(f"Could not add {domain} to the domains table")
+    return row
+
+
+class DomainStore:
+    """Reads stored availability answers and writes new ones back in batches."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            session_factory: Creates database sessions, defaults to SessionLocal
+            batch_size: Answers written per commit
+            flush_interval: Seconds pending answers may wait for a write
+            max_pending: Answers held while the database is slow; more are dropped
+            retry_after: Seconds reads are skipped after a database error
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.CACHE_DB_WRITEBACK_BATCH
+        self.flush_interval = flush_interval or settings.CACHE_DB_WRITEBACK_INTERVAL
+        self.max_pending = max_pending or settings.CACHE_DB_WRITEBACK_MAX_PENDING
+        self.retry_after = retry_after if retry_after is not None else settings.CACHE_DB_RETRY_AFTER
+        self._lock = threading.Lock()
+        # Latest answer per domain: (is_available, whois_data, checked_at)
+        self._pending: Dict[str, Tuple[bool, Optional[Dict[str, Any]], datetime]] = {}
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._down_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from ..db.session import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def lookup(
+        self, domain: str
+    ) -> Optional[Tuple[Tuple[bool, Optional[Dict[str, Any]]], datetime]]:
+        """
+        Read the stored answer for a normalized domain; blocks.
+
+        Returns:
+            Tuple of ((is_available, whois_data), whois_last_updated), or None
+            if the domain has no checked row; the caller decides whether it
+            is recent enough
+        """
+        if time.monotonic() < self._down_until:
+            return None
+        db = self._session()
+        try:
+            row = (
+                db.query(Domain)
+                .options(joinedload(Domain.whois_archive))
+                .filter(Domain.domain_name_full == domain)
+                .first()
+            )
+            if row is None or row.whois_last_updated is None or row.status == DomainStatus.UNKNOWN:
+                self.misses += 1
+                return None
+            is_available = bool(row.is_available)
+            result = (is_available, None if is_available else row.whois_data)
+            checked_at = row.whois_last_updated
+        except SQLAlchemyError as e:
+            self._failed("read", e)
+            return None
+        finally:
+            db.close()
+        self.hits += 1
+        return result, checked_at
+
+    def _failed(self, operation: str, error: Exception) -> None:
+        self.errors += 1
+        self._down_until = time.monotonic() + self.retry_after
+        logger.warning(f"Domain store {operation} failed, skipping reads for {self.retry_after}s: {str(error)}")
+
+    def enqueue(
+        self,
+        domain: str,
+        result: Tuple[bool, Optional[Dict[str, Any]]],
+        checked_at: Optional[datetime] = None,
+    ) -> None:
+        """Queue an answer from the network for the next batched write."""
+        with self._lock:
+            if domain not in self._pending and len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending[domain] = (result[0], result[1], checked_at or datetime.utcnow())
+            full = len(self._pending) >= self.batch_size
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="domain-store-writer", daemon=True
+                )
+                self._writer.start()
+        if full:
+            self._wake.set()
+
+    def _take_batch(self) -> Dict[str, Tuple[bool, Optional[Dict[str, Any]], datetime]]:
+        with self._lock:
+            domains = list(self._pending)[:self.batch_size]
+            return {domain: self._pending.pop(domain) for domain in domains}
+
+    def flush(self) -> int:
+        """
+        Write every pending answer now.
+
+        Returns:
+            Number of answers written
+        """
+        written = 0
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return written
+            written += self._write(batch)
+
+    def _write(self, batch: Dict[str, Tuple[bool, Optional[Dict[str, Any]], datetime]]) -> int:
+        db = self._session()
+        written = 0
+        try:
+            rows = {
+                row.domain_name_full: row
+                for row in db.query(Domain).filter(Domain.domain_name_full.in_(list(batch)))
+            }
+            for domain, (is_available, whois_data, checked_at) in batch.items():
+                row = rows.get(domain) or insert_domain_row(db, domain)
+                if row is None:
+                    self.dropped += 1
+                    continue
+                written += 1
+                if row.whois_last_updated is not None and row.whois_last_updated > checked_at:
+                    # WHOISService stored a newer answer meanwhile
+                    continue
+                row.is_available = is_available
+                row.status = DomainStatus.AVAILABLE if is_available else DomainStatus.REGISTERED
+                row.whois_last_updated = checked_at
+                record_whois(db, row, whois_data)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            self.errors += 1
+            self.dropped += written
+            logger.error(f"Writing {len(batch)} availability answers to the domains table failed: {str(e)}")
+            return 0
+        finally:
+            db.close()
+        self.written += written
+        return written
+
+    def _write_loop(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the writer and write what is still pending."""
+        self._stopping.set()
+        self._wake.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        self.flush()
+        self._stopping.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "pending": pending,
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "available": time.monotonic() >= self._down_until,
+        }
+
+
+# Shared domain store instance
+domain_store = DomainStore()
@@ -0,0 +1,331 @@
+"""Circuit breakers, hedged requests and deadlines for registry lookups.
+
+`LookupGuard.call` runs a primary lookup (WHOIS) for a domain under the
+circuit breaker of the server answering it. If the primary has not answered
+by the server's recent p95 latency, a secondary lookup (RDAP/DNS) is started
+alongside it and whichever conclusive answer comes first wins. An open
+breaker sends lookups straight to the secondary, and the whole exchange is
+bounded by the deadline the endpoint set with `lookup_deadline`.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, TypeVar
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Absolute time.monotonic() by which the current request wants its answer;
+# tasks started inside `lookup_deadline` inherit it
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class LookupUnavailable(Exception):
+    """Raised when no source could answer a lookup in time.
+
+    Callers must treat the domain's availability as unknown, not as registered.
+    """
+
+
+class CircuitState(str, Enum):
+    """State of a server's circuit breaker."""
+    CLOSED = "closed"  # Healthy, lookups go through
+    OPEN = "open"  # Failing, lookups are refused until the reset timeout passes
+    HALF_OPEN = "half_open"  # One probe lookup decides whether to close again
+
+
+@contextmanager
+def lookup_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound every lookup made inside the block to finish within `seconds`.
+
+    Nested deadlines never extend an outer one. None leaves the current
+    deadline, if any, in place.
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = request_deadline.get()
+    token = request_deadline.set(deadline if outer is None else min(deadline, outer))
+    try:
+        yield
+    finally:
+        request_deadline.reset(token)
+
+
+def time_left() -> Optional[float]:
+    """Seconds until the current request's deadline, None without one."""
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def clamp_timeout(timeout: float) -> float:
+    """The smaller of `timeout` and the time left before the request deadline."""
+    remaining = time_left()
+    return timeout if remaining is None else min(timeout, remaining)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one server."""
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe is let through
+            clock: Monotonic time source, replaceable in tests
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self.opened_at is None:
+            return CircuitState.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return CircuitState.HALF_OPEN
+        return CircuitState.OPEN
+
+    def allow(self) -> bool:
+        """Whether a lookup may go to the server now."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and not self._probing:
+            # Only one probe at a time; everyone else keeps failing fast
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """Let another probe through after one ended without an answer either way."""
+        self._probing = False
+
+
+class LatencyWindow:
+    """Latencies of a server's most recent successful lookups."""
+
+    def __init__(self, size: int):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """The q-quantile of the window, None until enough samples were seen."""
+        if len(self.samples) < 20:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LookupGuard:
+    """Per-server circuit breakers and hedged secondary lookups."""
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        hedge_quantile: Optional[float] = None,
+        hedge_min_delay: Optional[float] = None,
+        hedge_max_delay: Optional[float] = None,
+        latency_window: Optional[int] = None,
+    ):
+        """
+        Initialize the guard.
+
+        Args:
+            failure_threshold: Consecutive failures that open a server's breaker
+            reset_timeout: Seconds an open breaker fails fast before probing
+            hedge_quantile: Latency quantile after which the secondary is started
+            hedge_min_delay: Lower bound of the hedge delay in seconds
+            hedge_max_delay: Upper bound of the hedge delay, also used until
+                a server has enough latency samples
+            latency_window: Recent lookups per server the quantile is taken over
+        """
+        self.failure_threshold = failure_threshold or settings.WHOIS_BREAKER_FAILURES
+        self.reset_timeout = reset_timeout or settings.WHOIS_BREAKER_RESET
+        self.hedge_quantile = hedge_quantile or settings.WHOIS_HEDGE_QUANTILE
+        self.hedge_min_delay = (
+            hedge_min_delay if hedge_min_delay is not None else settings.WHOIS_HEDGE_MIN_DELAY
+        )
+        self.hedge_max_delay = (
+            hedge_max_delay if hedge_max_delay is not None else settings.WHOIS_HEDGE_MAX_DELAY
+        )
+        self.latency_window = latency_window or settings.WHOIS_LATENCY_WINDOW
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latencies: Dict[str, LatencyWindow] = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.short_circuited = 0
+
+    def breaker(self, server: str) -> CircuitBreaker:
+        breaker = self._breakers.get(server)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self._breakers[server] = breaker
+        return breaker
+
+    def _latency(self, server: str) -> LatencyWindow:
+        window = self._latencies.get(server)
+        if window is None:
+            window = LatencyWindow(self.latency_window)
+            self._latencies[server] = window
+        return window
+
+    def hedge_delay(self, server: str) -> float:
+        """Seconds to wait for the primary before starting the secondary."""
+        observed = self._latency(server).quantile(self.hedge_quantile)
+        if observed is None:
+            return self.hedge_max_delay
+        return min(self.hedge_max_delay, max(self.hedge_min_delay, observed))
+
+    async def call(
+        self,
+        server: str,
+        primary: Callable[[], Awaitable[T]],
+        secondary: Optional[Callable[[], Awaitable[T]]] = None,
+    ) -> T:
+        """
+        Run a lookup against `server`, hedged by `secondary`.
+
+        Args:
+            server: Key of the server the primary queries; breakers and
+                latency statistics are kept per key
+            primary: Starts the primary lookup
+            secondary: Starts the fallback lookup, None for no hedging. It
+                must raise when it has no conclusive answer.
+
+        Returns:
+            The first conclusive answer
+
+        Raises:
+            LookupUnavailable: If neither source answered before the deadline
+        """
+        remaining = time_left()
+        if remaining is not None and remaining <= 0:
+            raise LookupUnavailable(f"Deadline exceeded before querying {server}")
+
+        breaker = self.breaker(server)
+        if not breaker.allow():
+            self.short_circuited += 1
+            if secondary is None:
+                raise LookupUnavailable(f"Circuit open for {server}")
+            logger.debug(f"Circuit open for {server}, using the secondary source only")
+            return await self._first_answer([asyncio.ensure_future(secondary())], server)
+
+        started = time.monotonic()
+        primary_task = asyncio.ensure_future(primary())
+        primary_task.add_done_callback(
+            lambda task: self._record(server, breaker, task, time.monotonic() - started)
+        )
+        tasks = [primary_task]
+
+        if secondary is not None:
+            delay = clamp_timeout(self.hedge_delay(server))
+            done, _ = await asyncio.wait([primary_task], timeout=delay)
+            if not done or primary_task.exception() is not None:
+                # Slow or failed: give the secondary a chance too
+                self.hedged += 1
+                tasks.append(asyncio.ensure_future(secondary()))
+        try:
+            result = await self._first_answer(tasks, server)
+        except LookupUnavailable:
+            if not primary_task.done():
+                # Cut off by the deadline, counts against the server
+                breaker.record_failure()
+            raise
+        primary_answered = (
+            primary_task.done() and not primary_task.cancelled() and primary_task.exception() is None
+        )
+        if len(tasks) > 1 and not primary_answered:
+            self.hedge_wins += 1
+        return result
+
+    @staticmethod
+    async def _first_answer(tasks: List["asyncio.Future[T]"], server: str) -> T:
+        """Wait for the first task to succeed, cancelling the rest."""
+        pending = set(tasks)
+        errors: List[BaseException] = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=time_left(), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise LookupUnavailable(f"Deadline exceeded waiting for {server}")
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+            raise LookupUnavailable(
+                f"No source answered for {server}: " + "; ".join(str(e) for e in errors)
+            ) from errors[0]
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _record(self, server: str, breaker: CircuitBreaker, task: "asyncio.Future[Any]", elapsed: float) -> None:
+        if task.cancelled():
+            # Lost the race to the secondary or its caller went away; says
+            # nothing about the server, but a half-open probe must be freed
+            breaker.release_probe()
+            return
+        if task.exception() is None:
+            breaker.record_success()
+            self._latency(server).add(elapsed)
+        else:
+            breaker.record_failure()
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state and hedge delay of every known server, plus counters."""
+        return {
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "short_circuited": self.short_circuited,
+            "servers": [
+                {
+                    "server": server,
+                    "state": breaker.state.value,
+                    "consecutive_failures": breaker.failures,
+                    "hedge_delay": round(self.hedge_delay(server), 3),
+                }
+                for server, breaker in sorted(self._breakers.items())
+            ],
+        }
+
+
+# Shared guard instance
+lookup_guard = LookupGuard()
@@ -0,0 +1,217 @@
+"""Shared scheduler for outbound WHOIS/RDAP traffic.
+
+Every request to a registry server first takes a token from that server's
+bucket. Requests that find the bucket empty are queued rather than put to
+sleep, and queued work is released round-robin across traffic sources
+(monitor loop, public search, check-now), so a large monitor cycle cannot
+starve interactive lookups hitting the same registry.
+"""
+import asyncio
+import contextvars
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Name of the component issuing the current outbound request
+outbound_source: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "outbound_source", default="search"
+)
+
+
+@contextmanager
+def traffic_source(name: str) -> Iterator[None]:
+    """Tag outbound requests made inside the block with a source name."""
+    token = outbound_source.set(name)
+    try:
+        yield
+    finally:
+        outbound_source.reset(token)
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_take(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            0 if a token was taken, otherwise seconds until the next one
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class _ServerQueue:
+    """Token bucket plus per-source FIFO queues for one outbound server."""
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.waiting: Dict[str, Deque[asyncio.Future]] = {}
+        self.order: Deque[str] = deque()  # Round-robin order of sources
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.granted = 0
+
+    def depth(self) -> int:
+        return sum(
+            1 for queue in self.waiting.values() for future in queue if not future.done()
+        )
+
+    def push(self, source: str, future: asyncio.Future) -> None:
+        if source not in self.waiting:
+            self.waiting[source] = deque()
+            self.order.append(source)
+        self.waiting[source].append(future)
+
+    def pop(self) -> Optional[asyncio.Future]:
+        """Return the next live waiter, rotating between sources."""
+        while self.order:
+            source = self.order.popleft()
+            queue = self.waiting[source]
+            while queue and queue[0].done():
+                queue.popleft()  # Cancelled while waiting
+            if not queue:
+                del self.waiting[source]
+                continue
+            future = queue.popleft()
+            if queue:
+                self.order.append(source)
+            else:
+                del self.waiting[source]
+            return future
+        return None
+
+
+class OutboundScheduler:
+    """Per-server token buckets with fair queueing for outbound lookups."""
+
+    def __init__(
+        self,
+        default_rate: Optional[float] = None,
+        default_burst: Optional[int] = None,
+        tld_rates: Optional[Dict[str, float]] = None,
+        tld_bursts: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            default_rate: Requests per second allowed per server
+            default_burst: Requests a server may receive back to back
+            tld_rates: Per-TLD overrides of the rate
+            tld_bursts: Per-TLD overrides of the burst
+        """
+        self.default_rate = default_rate or settings.WHOIS_DEFAULT_RATE
+        self.default_burst = default_burst or settings.WHOIS_DEFAULT_BURST
+        self.tld_rates = tld_rates if tld_rates is not None else settings.WHOIS_TLD_RATE_LIMITS
+        self.tld_bursts = tld_bursts if tld_bursts is not None else settings.WHOIS_TLD_BURSTS
+        self._servers: Dict[str, _ServerQueue] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _server(self, server: str, tld: Optional[str]) -> _ServerQueue:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Waiters and timers belong to one event loop
+            self._loop = loop
+            self._servers = {}
+
+        rate = self.tld_rates.get(tld, self.default_rate) if tld else self.default_rate
+        burst = self.tld_bursts.get(tld, self.default_burst) if tld else self.default_burst
+        queue = self._servers.get(server)
+        if queue is None:
+            queue = _ServerQueue(TokenBucket(rate, burst))
+            self._servers[server] = queue
+        elif rate < queue.bucket.rate or burst < queue.bucket.burst:
+            # A server shared by several TLDs gets the strictest budget
+            queue.bucket.rate = min(rate, queue.bucket.rate)
+            queue.bucket.burst = min(burst, queue.bucket.burst)
+        return queue
+
+    def _dispatch(self, server: str) -> None:
+        """Hand out available tokens to queued requests, then re-arm the timer."""
+        queue = self._servers.get(server)
+        if queue is None:
+            return
+        queue.timer = None
+        while True:
+            if not queue.depth():
+                return
+            wait = queue.bucket.try_take()
+            if wait > 0:
+                queue.timer = self._loop.call_later(wait, self._dispatch, server)
+                return
+            future = queue.pop()
+            if future is None:
+                # Token taken for nobody, give it back
+                queue.bucket.tokens += 1
+                return
+            future.set_result(None)
+            queue.granted += 1
+
+    async def acquire(self, server: str, tld: Optional[str] = None) -> None:
+        """
+        Wait until a request to `server` is allowed.
+
+        Args:
+            server: Hostname of the WHOIS/RDAP server about to be queried
+            tld: TLD being looked up, selects the budget from settings
+        """
+        server = server.lower()
+        queue = self._server(server, tld)
+        if not queue.depth() and queue.bucket.try_take() == 0:
+            queue.granted += 1
+            return
+
+        future = self._loop.create_future()
+        queue.push(outbound_source.get(), future)
+        if queue.timer is None:
+            self._dispatch(server)
+        await future
+
+    def queue_depth(self, server: Optional[str] = None) -> int:
+        """Number of requests waiting for a token, for one server or all of them."""
+        if server is not None:
+            queue = self._servers.get(server.lower())
+            return queue.depth() if queue else 0
+        return sum(queue.depth() for queue in self._servers.values())
+
+    def stats(self) -> List[Dict[str, object]]:
+        """Budget, queue depth and grant count for every known server."""
+        return [
+            {
+                "server": server,
+                "rate": queue.bucket.rate,
+                "burst": queue.bucket.burst,
+                "queue_depth": queue.depth(),
+                "queued_by_source": {
+                    source: sum(1 for f in waiters if not f.done())
+                    for source, waiters in queue.waiting.items()
+                },
+                "granted": queue.granted,
+            }
+            for server, queue in sorted(self._servers.items())
+        ]
+
+
+# Shared scheduler instance
+outbound_scheduler = OutboundScheduler()
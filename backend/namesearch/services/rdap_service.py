@@ -0,0 +1,282 @@
+"""RDAP lookup service, an alternative backend to WHOIS for gTLDs."""
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import HTTPException, status
+
+from ..core.config import settings
+from ..models.domain import DomainStatus
+from .outbound_scheduler import OutboundScheduler, outbound_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class RDAPLookupError(Exception):
+    """Raised when no RDAP server serves a TLD or the server cannot be queried."""
+
+
+class RDAPBootstrap:
+    """IANA RDAP bootstrap registry mapping TLDs to RDAP base URLs, cached on disk."""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        cache_path: Optional[str] = None,
+        max_age: Optional[int] = None,
+    ):
+        """
+        Initialize the bootstrap registry.
+
+        Args:
+            url: Location of the IANA dns.json bootstrap file
+            cache_path: File the bootstrap data is cached in
+            max_age: Seconds before the cached file is refreshed
+        """
+        self.url = url or settings.RDAP_BOOTSTRAP_URL
+        self.cache_path = os.path.expanduser(cache_path or settings.RDAP_BOOTSTRAP_CACHE_PATH)
+        self.max_age = max_age if max_age is not None else settings.RDAP_BOOTSTRAP_MAX_AGE
+        self._services: Optional[Dict[str, str]] = None
+        self._loaded_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    @staticmethod
+    def _index(data: Dict[str, Any]) -> Dict[str, str]:
+        """Flatten the bootstrap 'services' list into a TLD -> base URL map."""
+        services: Dict[str, str] = {}
+        for tlds, urls in data.get("services", []):
+            # Prefer HTTPS endpoints when a service lists several
+            urls = sorted(urls, key=lambda u: not u.startswith("https://"))
+            if not urls:
+                continue
+            for tld in tlds:
+                services[tld.lower()] = urls[0] if urls[0].endswith("/") else urls[0] + "/"
+        return services
+
+    def _read_cache(self) -> Optional[Dict[str, Any]]:
+        try:
+            if time.time() - os.path.getmtime(self.cache_path) > self.max_age:
+                return None
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, data: Dict[str, Any]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache RDAP bootstrap file: {str(e)}")
+
+    async def _load(self) -> Dict[str, str]:
+        data = await asyncio.to_thread(self._read_cache)
+        if data is None:
+            logger.info(f"Fetching RDAP bootstrap file from {self.url}")
+            async with httpx.AsyncClient(timeout=settings.RDAP_TIMEOUT) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+                data = response.json()
+            await asyncio.to_thread(self._write_cache, data)
+        return self._index(data)
+
+    async def base_url(self, tld: str) -> Optional[str]:
+        """Return the RDAP base URL for a TLD, or None if it has no RDAP service."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        if self._services is None or time.time() - self._loaded_at > self.max_age:
+            async with self._lock:
+                if self._services is None or time.time() - self._loaded_at > self.max_age:
+                    try:
+                        self._services = await self._load()
+                        self._loaded_at = time.time()
+                    except (httpx.HTTPError, ValueError) as e:
+                        if self._services is None:
+                            raise RDAPLookupError(f"RDAP bootstrap unavailable: {str(e)}") from e
+                        logger.warning(f"RDAP bootstrap refresh failed, keeping old data: {str(e)}")
+        return self._services.get(tld.lower().strip("."))
+
+
+class RDAPService:
+    """Performs RDAP lookups with one pooled keep-alive client per RDAP server."""
+
+    def __init__(
+        self,
+        bootstrap: Optional[RDAPBootstrap] = None,
+        scheduler: Optional[OutboundScheduler] = None,
+    ):
+        self.bootstrap = bootstrap or RDAPBootstrap()
+        self.scheduler = scheduler or outbound_scheduler
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def client_for(self, base_url: str) -> httpx.AsyncClient:
+        """Return the pooled HTTP/1.1 client for an RDAP base URL."""
+        client = self._clients.get(base_url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=base_url,
+                timeout=settings.RDAP_TIMEOUT,
+                headers={"Accept": "application/rdap+json"},
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=settings.RDAP_MAX_CONNECTIONS_PER_SERVER,
+                    max_keepalive_connections=settings.RDAP_MAX_CONNECTIONS_PER_SERVER,
+                    keepalive_expiry=settings.RDAP_KEEPALIVE_EXPIRY,
+                ),
+            )
+            self._clients[base_url] = client
+        return client
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    @staticmethod
+    def _parse_date(value: Optional[str]) -> Optional[datetime]:
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _registrar_name(entities: List[Dict[str, Any]]) -> Optional[str]:
+        """Pull the registrar's full name out of the jCard of its entity."""
+        for entity in entities or []:
+            if "registrar" not in entity.get("roles", []):
+                continue
+            vcard = entity.get("vcardArray") or [None, []]
+            for prop in vcard[1] if len(vcard) > 1 else []:
+                if prop and prop[0] == "fn":
+                    return prop[3]
+        return None
+
+    @classmethod
+    def _parse_rdap_data(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map an RDAP domain object onto the fields WHOISService returns."""
+        events = {
+            event.get("eventAction"): cls._parse_date(event.get("eventDate"))
+            for event in data.get("events", [])
+        }
+        return {
+            "domain_name": (data.get("ldhName") or "").lower() or None,
+            "registrar": cls._registrar_name(data.get("entities", [])),
+            "whois_server": data.get("port43"),
+            "referral_url": None,
+            "updated_date": events.get("last changed"),
+            "creation_date": events.get("registration"),
+            "expiration_date": events.get("expiration"),
+            "name_servers": [
+                ns["ldhName"].lower() for ns in data.get("nameservers", []) if ns.get("ldhName")
+            ],
+            "status": data.get("status", []),
+            "emails": [],
+            "dnssec": (data.get("secureDNS") or {}).get("delegationSigned"),
+            "name": None,
+            "org": None,
+            "address": None,
+            "city": None,
+            "state": None,
+            "zipcode": None,
+            "country": None,
+        }
+
+    async def query(self, domain_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the raw RDAP domain object.
+
+        Args:
+            domain_name: Normalized domain name
+
+        Returns:
+            The decoded JSON object, or None if the registry has no such domain
+
+        Raises:
+            RDAPLookupError: If the TLD has no RDAP service or the request fails
+        """
+        tld = domain_name.rsplit(".", 1)[-1]
+        base_url = await self.bootstrap.base_url(tld)
+        if base_url is None:
+            raise RDAPLookupError(f"No RDAP service for .{tld}")
+        await self.scheduler.acquire(httpx.URL(base_url).host, tld)
+        try:
+            response = await self.client_for(base_url).get(f"domain/{domain_name}")
+        except httpx.HTTPError as e:
+            raise RDAPLookupError(f"RDAP request to {base_url} failed: {e!r}") from e
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise RDAPLookupError(f"RDAP server {base_url} answered {response.status_code}")
+        try:
+            return response.json()
+        except ValueError as e:
+            raise RDAPLookupError(f"RDAP server {base_url} returned invalid JSON") from e
+
+    async def availability(self, domain_name: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Decide availability from RDAP alone.
+
+        Args:
+            domain_name: Normalized domain name
+
+        Returns:
+            Tuple of (is_available, registration data if registered)
+
+        Raises:
+            RDAPLookupError: If the TLD has no RDAP service or the request fails
+        """
+        data = await self.query(domain_name)
+        if data is None:
+            return True, None
+        return False, self._parse_rdap_data(data)
+
+    async def lookup_domain(self, domain_name: str) -> Dict[str, Any]:
+        """
+        Perform an RDAP lookup for a domain.
+
+        Same contract as `WHOISService.lookup_domain`.
+
+        Args:
+            domain_name: The domain name to look up
+
+        Returns:
+            Dict containing the parsed registration data and a DomainStatus
+
+        Raises:
+            HTTPException: If the RDAP lookup fails
+        """
+        try:
+            logger.info(f"Performing RDAP lookup for domain: {domain_name}")
+            data = await self.query(domain_name.lower())
+        except RDAPLookupError as e:
+            logger.error(f"RDAP lookup failed for {domain_name}: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"RDAP lookup failed: {str(e)}"
+            )
+
+        if data is None:
+            return {
+                "domain_name": domain_name,
+                "status": DomainStatus.AVAILABLE,
+                "is_available": True
+            }
+        parsed_data = self._parse_rdap_data(data)
+        parsed_data["status"] = DomainStatus.REGISTERED
+        parsed_data["is_available"] = False
+        return parsed_data
+
+
+# Create singleton instance
+rdap_service = RDAPService()
@@ -0,0 +1,267 @@
+"""Bulk availability checks run as background search jobs.
+
+A job is a `Search` row of type 'bulk-job'. It is created PENDING, moves to
+IN_PROGRESS when its lookups start and ends COMPLETED, or FAILED with the
+error. Up to SEARCH_JOB_MAX_DOMAINS domains go through the bulk checker,
+SEARCH_JOB_CONCURRENCY at a time and queued as 'bulk-job' traffic, so the
+shared per-server limits and the outbound scheduler keep interactive
+searches moving alongside it. Answers are written as `SearchResult` rows in
+batches of SEARCH_JOB_WRITE_BATCH, and every batch's commit also advances
+the job's counters, which is how clients follow its progress. Domain lists
+are only held in memory; a job interrupted by a shutdown is marked FAILED.
+"""
+import asyncio
+import contextvars
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.domain import Domain, DomainStatus, Search, SearchResult, SearchStatus
+from ..utils.domain_checker import normalize_domain
+from .bulk_checker import AvailabilityResult, BulkAvailabilityChecker, bulk_checker
+from .domain_store import insert_domain_row
+from .lookup_resilience import lookup_deadline
+from .outbound_scheduler import traffic_source
+from .search_pipeline import price_domains, search_result, summarize
+
+logger = logging.getLogger(__name__)
+
+JOB_SEARCH_TYPE = "bulk-job"
+
+# Statuses after which a job's counters no longer change
+FINISHED_STATUSES = frozenset({SearchStatus.COMPLETED, SearchStatus.FAILED, SearchStatus.PARTIAL})
+
+
+def normalize_job_domains(domains: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """
+    Normalize and deduplicate the domains of a job.
+
+    Returns:
+        Tuple of (domains to check, entries that are not valid domains)
+    """
+    valid: Dict[str, None] = {}
+    invalid = []
+    for domain in domains:
+        normalized = normalize_domain(domain)
+        if normalized is None:
+            invalid.append(domain)
+        else:
+            valid[normalized] = None
+    return list(valid), invalid
+
+
+def job_progress(search: Search) -> Dict[str, Any]:
+    """Progress of a job in the shape of `SearchJobProgress`."""
+    return {
+        "id": search.id,
+        "status": search.status.value,
+        "total": (search.filters or {}).get("domains", 0),
+        "checked": search.results_count,
+        "available": search.available_count,
+        "taken": search.taken_count,
+        "premium": search.premium_count,
+        "error": search.error,
+        "started_at": search.started_at,
+        "completed_at": search.completed_at,
+    }
+
+
+class SearchJobRunner:
+    """Runs bulk search jobs in background tasks and records their progress."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        checker: Optional[BulkAvailabilityChecker] = None,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            session_factory: Creates database sessions, defaults to SessionLocal
+            checker: Availability checker, None to use the shared one
+            concurrency: Lookups one job may run at once
+            batch_size: Search results written per commit
+        """
+        self.session_factory = session_factory
+        self.checker = checker or bulk_checker
+        self.concurrency = concurrency or settings.SEARCH_JOB_CONCURRENCY
+        self.batch_size = batch_size or settings.SEARCH_JOB_WRITE_BATCH
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def _session(self) -> Session:
+        if self.session_factory is None:
+            from ..db.session import SessionLocal
+            self.session_factory = SessionLocal
+        return self.session_factory()
+
+    def submit(
+        self, db: Session, *, user_id: int, domains: List[str], query: Optional[str] = None
+    ) -> Search:
+        """
+        Record a PENDING job and start it on the running loop.
+
+        Args:
+            db: Session the job row is created in
+            user_id: Owner of the job and its results
+            domains: Normalized, distinct domains
+            query: Label for search history, defaults to the domain count
+
+        Returns:
+            The job's search row
+        """
+        search = Search(
+            query=(query or f"{len(domains)} domains")[:255],
+            search_type=JOB_SEARCH_TYPE,
+            status=SearchStatus.PENDING,
+            user_id=user_id,
+            filters={"domains": len(domains)},
+        )
+        db.add(search)
+        db.commit()
+        db.refresh(search)
+        # A fresh context: the job must not inherit the request's lookup deadline
+        task = asyncio.get_running_loop().create_task(
+            self.run(search.id, user_id, domains), context=contextvars.Context()
+        )
+        self._tasks[search.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(search.id, None))
+        return search
+
+    async def lookups(self, domains: List[str]) -> AsyncIterator[AvailabilityResult]:
+        """
+        Check domains with a fixed pool of workers, yielding in completion order.
+
+        Unlike starting one task per domain, memory stays flat however long
+        the list is, and workers wait while a batch is being written.
+        """
+        done: asyncio.Queue = asyncio.Queue(maxsize=self.batch_size)
+        remaining = iter(domains)
+
+        async def worker() -> None:
+            for domain in remaining:
+                try:
+                    with lookup_deadline(settings.LOOKUP_DEADLINE):
+                        result = await self.checker.check_one(domain)
+                except Exception as e:
+                    # A dead worker would leave the job waiting for its results
+                    logger.error(f"Search job lookup of {domain} failed: {str(e)}", exc_info=True)
+                    result = AvailabilityResult(domain=domain, is_available=False, error=str(e))
+                await done.put(result)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(self.concurrency, len(domains)))]
+        try:
+            for _ in range(len(domains)):
+                yield await done.get()
+        finally:
+            for task in workers:
+                task.cancel()
+
+    async def run(self, search_id: int, user_id: int, domains: List[str]) -> None:
+        """Check every domain of a job, writing results and counters in batches."""
+        with traffic_source("bulk-job"):
+            try:
+                await asyncio.to_thread(self._set_status, search_id, SearchStatus.IN_PROGRESS)
+                batch: List[AvailabilityResult] = []
+                async for checked in self.lookups(domains):
+                    batch.append(checked)
+                    if len(batch) >= self.batch_size:
+                        await asyncio.to_thread(self._write, search_id, user_id, batch)
+                        batch = []
+                if batch:
+                    await asyncio.to_thread(self._write, search_id, user_id, batch)
+                await asyncio.to_thread(self._set_status, search_id, SearchStatus.COMPLETED)
+                logger.info(f"Search job {search_id} checked {len(domains)} domains")
+            except asyncio.CancelledError:
+                # Off the loop, and shielded so a second cancel cannot lose the status
+                await asyncio.shield(asyncio.to_thread(
+                    self._set_status, search_id, SearchStatus.FAILED, "Interrupted before it finished"
+                ))
+                raise
+            except Exception as e:
+                logger.error(f"Search job {search_id} failed: {str(e)}", exc_info=True)
+                await asyncio.to_thread(self._set_status, search_id, SearchStatus.FAILED, str(e))
+
+    def _write(self, search_id: int, user_id: int, batch: List[AvailabilityResult]) -> None:
+        available = [checked.domain for checked in batch if checked.is_available and not checked.error]
+        pricing = price_domains(available)
+        results = [search_result(checked, pricing.get(checked.domain)) for checked in batch]
+        db = self._session()
+        try:
+            rows = {
+                row.domain_name_full: row
+                for row in db.query(Domain).filter(Domain.domain_name_full.in_([r["domain"] for r in results]))
+            }
+            for result in results:
+                # The domain store's writer may add the same new domain meanwhile
+                row = rows.get(result["domain"]) or insert_domain_row(db, result["domain"])
+                if row is None:
+                    continue
+                if result["status"] != DomainStatus.UNKNOWN.value:
+                    # whois_last_updated is left to the domain store's write-back
+                    row.is_available = result["is_available"]
+                    row.status = DomainStatus(result["status"])
+                    if result["is_available"]:
+                        row.is_premium = result["is_premium"]
+                        row.price = result["price"]
+                        row.currency = result["currency"]
+                db.add(SearchResult(search_id=search_id, user_id=user_id, domain=row))
+            counts = summarize(results)
+            search = db.get(Search, search_id)
+            search.results_count += counts["total"]
+            search.available_count += counts["available"]
+            search.taken_count += counts["taken"]
+            search.premium_count += counts["premium"]
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _set_status(self, search_id: int, status: SearchStatus, error: Optional[str] = None) -> None:
+        db = self._session()
+        try:
+            search = db.get(Search, search_id)
+            if search is None:
+                return
+            search.status = status
+            if error is not None:
+                search.error = error
+            if status in FINISHED_STATUSES:
+                search.completed_at = datetime.utcnow()
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Could not mark search job {search_id} {status.value}: {str(e)}")
+        finally:
+            db.close()
+
+    def progress(self, search_id: int) -> Optional[Dict[str, Any]]:
+        """Read a job's progress with a fresh session; blocks."""
+        db = self._session()
+        try:
+            search = db.get(Search, search_id)
+            return job_progress(search) if search is not None else None
+        finally:
+            db.close()
+
+    async def stop(self) -> None:
+        """Cancel running jobs, marking them FAILED."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"running": len(self._tasks)}
+
+
+# Shared search job runner instance
+search_jobs = SearchJobRunner()
@@ -0,0 +1,318 @@
+"""Domain search as a pipeline of concurrent availability lookups.
+
+A search normalizes its query to a second-level name and fans it out over
+the requested TLDs. Every domain goes through the bulk checker, which
+answers from the cache tiers (memory, Redis, disk, the domains table) before
+going to DNS or WHOIS. One search may only run SEARCH_REQUEST_CONCURRENCY
+lookups at once, on top of the checker's per-server limits, so a request for
+many TLDs cannot take a registry's whole budget from the others. Available
+domains are priced in one batch, then the results are counted for the
+response; streamed searches price and yield each result as it finishes.
+A search with a deadline reports the domains not answered by then as
+pending, while their lookups go on in the background and fill the cache.
+Those lookups run outside the request's context, each with its own
+LOOKUP_DEADLINE, so the rest of the request's budget does not cut them off.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+
+from ..core.config import settings
+from ..models.domain import DomainStatus
+from ..utils.domain_checker import get_domain_pricing
+from .bulk_checker import AvailabilityResult, BulkAvailabilityChecker, bulk_checker
+from .lookup_resilience import lookup_deadline
+from .outbound_scheduler import outbound_source, traffic_source
+
+logger = logging.getLogger(__name__)
+
+_LABEL = re.compile(r"^[a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?$")
+_TLD = re.compile(r"^[a-z0-9-]+(\.[a-z0-9-]+)*$")
+
+
+class SearchQueryError(ValueError):
+    """Raised when a search query or its TLDs cannot form domain names."""
+
+
+@dataclass
+class SearchPlan:
+    """Domains one search checks, in the order the TLDs were requested."""
+    query: str
+    name: str
+    domains: List[str]
+
+
+def plan_search(query: str, tlds: Iterable[str], limit: int) -> SearchPlan:
+    """
+    Normalize a search query and fan it out over TLDs.
+
+    A query with a TLD, e.g. 'example.io', searches 'example' with that TLD
+    checked first.
+
+    Args:
+        query: Name or domain the user typed
+        tlds: Requested TLDs, with or without a leading dot
+        limit: Most domains to check, further capped by SEARCH_MAX_TLDS
+
+    Returns:
+        The search plan
+
+    Raises:
+        SearchQueryError: If the query is not a valid name or no TLD is left
+    """
+    name = query.lower().strip()
+    for prefix in ("http://", "https://", "www."):
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+    name = name.split("/")[0]
+    requested = [tld.lower().strip().strip(".") for tld in tlds]
+    if "." in name:
+        name, tld = name.split(".", 1)
+        requested.insert(0, tld)
+    if not _LABEL.match(name):
+        raise SearchQueryError(f"'{query}' is not a valid domain name")
+
+    invalid = [tld for tld in requested if tld and not _TLD.match(tld)]
+    if invalid:
+        raise SearchQueryError(f"Invalid TLDs: {', '.join(invalid)}")
+    requested = [tld for tld in dict.fromkeys(requested) if tld]
+    if not requested:
+        raise SearchQueryError("At least one TLD must be specified")
+
+    cap = min(limit, settings.SEARCH_MAX_TLDS)
+    if len(requested) > cap:
+        logger.info(f"Search for '{name}' limited to {cap} of {len(requested)} TLDs")
+    return SearchPlan(query=query, name=name, domains=[f"{name}.{tld}" for tld in requested[:cap]])
+
+
+def price_domains(domains: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Price domains in one pass; blocks, run it in a thread."""
+    return {domain: get_domain_pricing(domain) for domain in domains}
+
+
+def search_result(
+    checked: AvailabilityResult,
+    pricing: Optional[Dict[str, Any]] = None,
+    include_whois: bool = False,
+) -> Dict[str, Any]:
+    """
+    Shape one lookup as a `DomainSearchResult`.
+
+    Args:
+        checked: Result of the availability lookup
+        pricing: Pricing of the domain if it is available
+        include_whois: Whether to return the WHOIS data of taken domains
+
+    Returns:
+        Dictionary matching `DomainSearchResult`
+    """
+    is_premium = bool(pricing and pricing.get("is_premium"))
+    if checked.error:
+        # No source answered; unknown, not taken
+        status = DomainStatus.UNKNOWN
+    elif not checked.is_available:
+        status = DomainStatus.REGISTERED
+    elif is_premium:
+        status = DomainStatus.PREMIUM
+    else:
+        status = DomainStatus.AVAILABLE
+    return {
+        "domain": checked.domain,
+        "tld": checked.domain.split(".", 1)[-1],
+        "is_available": checked.is_available and not checked.error,
+        "status": status.value,
+        "is_premium": is_premium,
+        "price": pricing.get("price") if pricing else None,
+        "currency": pricing.get("currency", "USD") if pricing else "USD",
+        "whois_data": checked.whois_data if include_whois else None,
+        "freshness": None if checked.error else checked.freshness.value,
+        "pending": False,
+    }
+
+
+def pending_result(domain: str) -> Dict[str, Any]:
+    """A `DomainSearchResult` for a domain whose lookup missed the search deadline."""
+    return {
+        "domain": domain,
+        "tld": domain.split(".", 1)[-1],
+        "is_available": False,
+        "status": DomainStatus.UNKNOWN.value,
+        "is_premium": False,
+        "price": None,
+        "currency": "USD",
+        "whois_data": None,
+        "freshness": None,
+        "pending": True,
+    }
+
+
+def summarize(results: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """Count search results the way the search response reports them."""
+    counts = {"total": 0, "available": 0, "taken": 0, "premium": 0, "pending": 0}
+    for result in results:
+        counts["total"] += 1
+        if result.get("pending"):
+            counts["pending"] += 1
+        if result["is_available"]:
+            counts["available"] += 1
+        elif result["status"] == DomainStatus.REGISTERED.value:
+            counts["taken"] += 1
+        if result["is_premium"]:
+            counts["premium"] += 1
+    return counts
+
+
+def format_search_event(event: str, data: Dict[str, Any], sse: bool) -> str:
+    """
+    Encode one event of a streamed search.
+
+    Args:
+        event: Event name, e.g. 'result' or 'summary'
+        data: Event payload
+        sse: Server-Sent Events if True, else one line of NDJSON
+
+    Returns:
+        The encoded event
+    """
+    # WHOIS data may hold datetimes
+    data = jsonable_encoder(data)
+    if sse:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, "data": data}) + "\n"
+
+
+class SearchPipeline:
+    """Runs the lookups of a search under a per-request concurrency budget."""
+
+    def __init__(
+        self,
+        checker: Optional[BulkAvailabilityChecker] = None,
+        concurrency: Optional[int] = None,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            checker: Availability checker, None to use the shared one
+            concurrency: Lookups one search may run at once
+        """
+        self.checker = checker or bulk_checker
+        self.concurrency = concurrency or settings.SEARCH_REQUEST_CONCURRENCY
+        # Strong references to lookups left running after a deadline,
+        # the event loop only keeps weak ones
+        self._background: Set[asyncio.Task] = set()
+
+    async def lookups(
+        self, domains: Iterable[str], deadline: Optional[float] = None
+    ) -> AsyncIterator[AvailabilityResult]:
+        """
+        Check domains within this search's budget, yielding in completion order.
+
+        Args:
+            domains: Normalized domains, duplicates are checked once
+            deadline: Seconds to wait for results; lookups still running
+                then are not yielded but left to finish in the background,
+                within their own LOOKUP_DEADLINE, so their answers reach the
+                cache for the next search
+
+        Yields:
+            AvailabilityResult for every distinct domain answered in time
+        """
+        budget = asyncio.Semaphore(self.concurrency)
+        source = outbound_source.get()
+
+        async def check(domain: str) -> AvailabilityResult:
+            async with budget:
+                return await self.checker.check_one(domain)
+
+        async def check_detached(domain: str) -> AvailabilityResult:
+            with traffic_source(source), lookup_deadline(settings.LOOKUP_DEADLINE):
+                return await check(domain)
+
+        if deadline is None:
+            tasks = [asyncio.ensure_future(check(domain)) for domain in dict.fromkeys(domains)]
+        else:
+            # Lookups may outlive the request, so they must not inherit its
+            # lookup deadline; each gets its own
+            loop = asyncio.get_running_loop()
+            tasks = [
+                loop.create_task(check_detached(domain), context=contextvars.Context())
+                for domain in dict.fromkeys(domains)
+            ]
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=deadline):
+                yield await next_done
+        except asyncio.TimeoutError:
+            for task in tasks:
+                if not task.done():
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+            tasks = []
+        finally:
+            # Consumers that stop early must not leave lookups running
+            for task in tasks:
+                task.cancel()
+
+    async def run(
+        self, plan: SearchPlan, include_whois: bool = False, deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Check, price and count every domain of a search.
+
+        Args:
+            plan: Domains to check
+            include_whois: Whether to return the WHOIS data of taken domains
+            deadline: Seconds to wait for lookups, the rest are returned pending
+
+        Returns:
+            Dictionary matching `DomainBulkSearchResponse`, results in plan order
+        """
+        checked = {result.domain: result async for result in self.lookups(plan.domains, deadline)}
+        available = [domain for domain, result in checked.items() if result.is_available and not result.error]
+        pricing = await asyncio.to_thread(price_domains, available) if available else {}
+        results = [
+            search_result(checked[domain], pricing.get(domain), include_whois)
+            if domain in checked else pending_result(domain)
+            for domain in plan.domains
+        ]
+        return {"results": results, **summarize(results)}
+
+    async def stream(
+        self, plan: SearchPlan, include_whois: bool = False, deadline: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Check and price every domain of a search, yielding results as they finish.
+
+        Args:
+            plan: Domains to check
+            include_whois: Whether to return the WHOIS data of taken domains
+            deadline: Seconds to wait for lookups, the rest are yielded pending
+
+        Yields:
+            Dictionaries matching `DomainSearchResult`, in completion order,
+            then those still pending at the deadline
+        """
+        answered = set()
+        async for checked in self.lookups(plan.domains, deadline):
+            answered.add(checked.domain)
+            pricing = None
+            if checked.is_available and not checked.error:
+                # Priced one by one so no result waits for a slower lookup
+                pricing = (await asyncio.to_thread(price_domains, [checked.domain]))[checked.domain]
+            yield search_result(checked, pricing, include_whois)
+        for domain in plan.domains:
+            if domain not in answered:
+                yield pending_result(domain)
+
+    def stats(self) -> Dict[str, int]:
+        return {"background_lookups": len(self._background)}
+
+
+# Shared search pipeline instance
+search_pipeline = SearchPipeline()
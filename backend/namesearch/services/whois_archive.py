@@ -0,0 +1,226 @@
+"""Content-addressed, compressed storage of WHOIS responses.
+
+`domains` and `domain_watches` rows keep the SHA-256 of their latest WHOIS
+answer plus a few normalized fields (registrar, expiry and creation dates);
+the answer itself is stored once in `whois_archive`, zstd-compressed when the
+optional `zstandard` package is installed and zlib-compressed otherwise.
+Raw responses are archived as text and re-parsed on read; answers that only
+exist as parsed fields are archived as canonical JSON.
+"""
+import hashlib
+import json
+import logging
+import re
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from whois.parser import PywhoisError
+
+from ..models.whois_archive import WhoisArchive
+from ..utils.whois_classifier import whois_classifier
+from .whois_parser import DATE_FIELDS, parse_response
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CODEC = "zstd" if zstandard is not None else "zlib"
+ZLIB_LEVEL = 9
+ZSTD_LEVEL = 12
+
+# Lines registries regenerate on every query, e.g. Verisign's
+# ">>> Last update of whois database: ... <<<"; dropping them lets an
+# unchanged record hash the same from one check to the next
+VOLATILE_LINE = re.compile(
+    r"^[ \t%]*(?:>>> last update of whois database|whois lookup made at|query time|timestamp)\b.*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def compress(content: bytes, codec: str = CODEC) -> bytes:
+    """Compress archive content with the given codec."""
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd archive codec requires the zstandard package")
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(content)
+    if codec == "zlib":
+        return zlib.compress(content, ZLIB_LEVEL)
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+
+def decompress(payload: bytes, codec: str) -> bytes:
+    """Inverse of `compress`."""
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd archive codec requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+
+def encode_whois(whois_data: Dict[str, Any]) -> Tuple[str, str, bytes]:
+    """
+    Canonical archive form of a WHOIS answer.
+
+    Args:
+        whois_data: WHOIS dict, with the raw response under "raw" if available
+
+    Returns:
+        Tuple of (content_hash, content_type, content)
+    """
+    raw = whois_data.get("raw")
+    if raw:
+        content_type = "text"
+        content = VOLATILE_LINE.sub("", raw.replace("\r\n", "\n")).strip().encode("utf-8")
+    else:
+        content_type = "json"
+        fields = {k: v for k, v in whois_data.items() if v not in (None, "", [])}
+        content = json.dumps(fields, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    return hashlib.sha256(content).hexdigest(), content_type, content
+
+
+def archive_whois(db: Session, whois_data: Dict[str, Any]) -> WhoisArchive:
+    """
+    Store a WHOIS answer in the archive unless identical content is already there.
+
+    The entry is flushed but not committed; the caller owns the transaction.
+
+    Returns:
+        The archive entry holding the answer
+    """
+    content_hash, content_type, content = encode_whois(whois_data)
+    return _store(db, content_hash, content_type, content)
+
+
+def _store(db: Session, content_hash: str, content_type: str, content: bytes) -> WhoisArchive:
+    entry = db.get(WhoisArchive, content_hash)
+    if entry is not None:
+        return entry
+    entry = WhoisArchive(
+        content_hash=content_hash,
+        codec=CODEC,
+        content_type=content_type,
+        size=len(content),
+        payload=compress(content),
+    )
+    try:
+        with db.begin_nested():
+            db.add(entry)
+    except IntegrityError:
+        # Another worker archived the same content first
+        entry = db.get(WhoisArchive, content_hash)
+    return entry
+
+
+def _first(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return value[0] if value else None
+    return value
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    value = _first(value)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return value.replace(tzinfo=None)
+
+
+def record_whois(db: Session, obj: Any, whois_data: Optional[Dict[str, Any]]) -> bool:
+    """
+    Point a Domain or DomainWatch row at its latest WHOIS answer.
+
+    Nothing is written when the answer hashes the same as the one the row
+    already references, so periodic re-checks of an unchanged domain cost
+    no archive or row writes.
+
+    Args:
+        db: Database session
+        obj: Row with `whois_hash`, `registrar` and `expiration_date` columns
+        whois_data: WHOIS dict, with the raw response under "raw" if available
+
+    Returns:
+        True if the row now references a different answer
+    """
+    if not whois_data:
+        return False
+    content_hash, content_type, content = encode_whois(whois_data)
+    if obj.whois_hash == content_hash:
+        return False
+
+    _store(db, content_hash, content_type, content)
+    obj.whois_hash = content_hash
+    registrar = _first(whois_data.get("registrar"))
+    obj.registrar = str(registrar)[:255] if registrar else None
+    obj.expiration_date = _as_datetime(whois_data.get("expiration_date"))
+    if hasattr(obj, "registered_date"):
+        obj.registered_date = _as_datetime(whois_data.get("creation_date")) or obj.registered_date
+    return True
+
+
+def load_whois(entry: Optional[WhoisArchive], domain: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode an archive entry back into a WHOIS dict.
+
+    Args:
+        entry: Archive entry, or None for rows without WHOIS data
+        domain: Domain the answer belongs to, selects the TLD parser
+
+    Returns:
+        The parsed fields (with "status" and "raw" for text entries), or None
+    """
+    if entry is None:
+        return None
+    content = decompress(entry.payload, entry.codec).decode("utf-8")
+    if entry.content_type == "json":
+        data = json.loads(content)
+        for field in DATE_FIELDS & data.keys():
+            if isinstance(data[field], list):
+                data[field] = [_as_datetime(v) or v for v in data[field]]
+            else:
+                data[field] = _as_datetime(data[field]) or data[field]
+        return data
+
+    try:
+        data = parse_response(domain, content)
+    except PywhoisError as e:
+        logger.warning(f"Archived WHOIS answer for {domain} no longer parses: {str(e)}")
+        return {"domain_name": domain, "raw": content}
+    data["status"] = whois_classifier.domain_status(data)
+    data["raw"] = content
+    return data
+
+
+def row_whois(obj: Any, domain: str) -> Optional[Dict[str, Any]]:
+    """
+    WHOIS dict of a Domain or DomainWatch row, decoded once per archive entry.
+
+    The dict is kept on the instance until the row points at another entry,
+    so rows read on hot paths (the domains tier, the cache warmer) are not
+    decompressed and re-parsed on every access. Callers must not modify it.
+
+    Args:
+        obj: Row with a `whois_archive` relationship
+        domain: Domain the answer belongs to, selects the TLD parser
+
+    Returns:
+        The parsed fields, or None for rows without WHOIS data
+    """
+    entry = obj.whois_archive
+    memo = obj.__dict__.get("_whois_memo")
+    if memo is not None and memo[0] is entry:
+        return memo[1]
+    data = load_whois(entry, domain)
+    obj._whois_memo = (entry, data)
+    return data
@@ -0,0 +1,232 @@
+"""Asyncio WHOIS client speaking the port-43 protocol directly."""
+import asyncio
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Optional
+
+from ..core.config import settings
+from .lookup_resilience import clamp_timeout, time_left
+from .outbound_scheduler import OutboundScheduler, outbound_scheduler
+
+logger = logging.getLogger(__name__)
+
+IANA_WHOIS_SERVER = "whois.iana.org"
+WHOIS_PORT = 43
+
+# TLD -> authoritative WHOIS server, built from IANA data by scripts/build_whois_routes.py
+WHOIS_ROUTES_PATH = os.path.join(os.path.dirname(__file__), "..", "resources", "whois_servers.json")
+
+# Servers that expect something other than the bare domain name as the query
+QUERY_FORMATS = {
+    "whois.verisign-grs.com": "={domain}",
+    "whois.denic.de": "-T dn,ace {domain}",
+    "whois.jprs.jp": "{domain}/e",
+}
+
+# Lines pointing at a more specific WHOIS server
+REFERRAL_PATTERN = re.compile(
+    r"^[ \t]*(?:refer|whois|registrar whois server|referralserver)[ \t]*:[ \t]*"
+    r"(?:r?whois://)?([a-z0-9.\-]+)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+class WhoisLookupError(Exception):
+    """Raised when a WHOIS server cannot be reached or does not answer in time."""
+
+
+_routes: Optional[Dict[str, str]] = None
+
+
+def load_whois_routes() -> Dict[str, str]:
+    """
+    Return the TLD -> WHOIS server routing table, reading it on first use.
+
+    WHOIS_ROUTES_PATH in settings points at a newer table than the one
+    shipped with the package, if set.
+    """
+    global _routes
+    if _routes is None:
+        path = settings.WHOIS_ROUTES_PATH or WHOIS_ROUTES_PATH
+        try:
+            with open(os.path.expanduser(path), "r", encoding="utf-8") as f:
+                _routes = {tld.lower(): server.lower() for tld, server in json.load(f)["servers"].items()}
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Could not load WHOIS routing table {path}: {str(e)}")
+            _routes = {}
+    return _routes
+
+
+class AsyncWhoisClient:
+    """Non-blocking WHOIS client with timeouts and referral following."""
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        max_referrals: Optional[int] = None,
+        max_response_bytes: int = 256 * 1024,
+        port: int = WHOIS_PORT,
+        scheduler: Optional[OutboundScheduler] = None,
+        routes: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            timeout: Seconds allowed for a whole query/response exchange
+            connect_timeout: Seconds allowed to establish the TCP connection
+            max_referrals: Maximum number of referral hops to follow
+            max_response_bytes: Responses are truncated beyond this size
+            port: TCP port of the servers, 43 unless testing against a local server
+            scheduler: Outbound rate budget scheduler, None to use the shared one
+            routes: TLD -> WHOIS server table, None to use the shipped one
+        """
+        self.timeout = timeout if timeout is not None else settings.WHOIS_TIMEOUT
+        self.connect_timeout = (
+            connect_timeout if connect_timeout is not None else settings.WHOIS_CONNECT_TIMEOUT
+        )
+        self.max_referrals = (
+            max_referrals if max_referrals is not None else settings.WHOIS_MAX_REFERRALS
+        )
+        self.max_response_bytes = max_response_bytes
+        self.port = port
+        self.scheduler = scheduler or outbound_scheduler
+        self._routes = routes
+
+    async def query_server(self, server: str, query: str) -> str:
+        """
+        Send a single query to a WHOIS server and return its raw answer.
+
+        Args:
+            server: Hostname of the WHOIS server
+            query: Domain name being looked up
+
+        Returns:
+            The decoded response text
+
+        Raises:
+            WhoisLookupError: If the connection fails or times out
+        """
+        line = QUERY_FORMATS.get(server.lower(), "{domain}").format(domain=query)
+        # IANA answers for every TLD, so per-TLD budgets do not apply to it
+        tld = None if server.lower() == IANA_WHOIS_SERVER else query.rsplit(".", 1)[-1].lower()
+        # Waiting and socket timeouts never run past the request deadline
+        try:
+            await asyncio.wait_for(self.scheduler.acquire(server, tld), timeout=time_left())
+        except asyncio.TimeoutError as e:
+            raise WhoisLookupError(f"Deadline exceeded waiting to query {server}") from e
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(server, self.port), timeout=clamp_timeout(self.connect_timeout)
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise WhoisLookupError(f"Could not connect to {server}: {e!r}") from e
+
+        async def exchange() -> List[bytes]:
+            writer.write(f"{line}\r\n".encode("utf-8"))
+            await writer.drain()
+            chunks: List[bytes] = []
+            received = 0
+            # Servers may stream the answer in several segments before closing
+            while received < self.max_response_bytes:
+                data = await reader.read(self.max_response_bytes - received)
+                if not data:
+                    break
+                chunks.append(data)
+                received += len(data)
+            return chunks
+
+        try:
+            chunks = await asyncio.wait_for(exchange(), timeout=clamp_timeout(self.timeout))
+        except (OSError, asyncio.TimeoutError) as e:
+            raise WhoisLookupError(f"No answer from {server}: {e!r}") from e
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+        return b"".join(chunks).decode("utf-8", errors="replace")
+
+    @staticmethod
+    def find_referral(text: str, current_server: str) -> Optional[str]:
+        """Return the referral server named in a response, if any."""
+        for match in REFERRAL_PATTERN.finditer(text):
+            server = match.group(1).strip(".").lower()
+            if server and server != current_server.lower():
+                return server
+        return None
+
+    def route(self, domain: str) -> Optional[str]:
+        """Return the authoritative WHOIS server for a domain, None if not in the table."""
+        routes = self._routes if self._routes is not None else load_whois_routes()
+        labels = domain.lower().strip(".").split(".")
+        # Longest suffix first, so entries like 'co.uk' win over 'uk'
+        for i in range(1, len(labels)):
+            server = routes.get(".".join(labels[i:]))
+            if server:
+                return server
+        return None
+
+    async def lookup(self, domain: str, server: Optional[str] = None) -> str:
+        """
+        Look up a domain, following referrals down to the registrar server.
+
+        Starts at the TLD's server from the routing table, skipping the IANA
+        hop; TLDs missing from the table, or whose routed server cannot be
+        reached, are resolved through IANA.
+
+        Args:
+            domain: Normalized domain name (e.g. 'example.com')
+            server: Server to start from, defaults to the routed server
+
+        Returns:
+            Raw WHOIS text of the registry answer followed by any registrar answer
+
+        Raises:
+            WhoisLookupError: If the first authoritative server cannot be queried
+        """
+        routed = None if server else self.route(domain)
+        try:
+            return await self._follow(domain, server or routed or IANA_WHOIS_SERVER)
+        except WhoisLookupError as e:
+            if not routed:
+                raise
+            # The table may be out of date, ask IANA where the TLD lives now
+            logger.warning(f"Routed WHOIS server {routed} failed for {domain}, asking IANA: {str(e)}")
+            return await self._follow(domain, IANA_WHOIS_SERVER)
+
+    async def _follow(self, domain: str, server: str) -> str:
+        """Query `server` and follow its referrals."""
+        responses: List[str] = []
+
+        for _ in range(self.max_referrals + 1):
+            try:
+                text = await self.query_server(server, domain)
+            except WhoisLookupError:
+                # A failing registrar server still leaves us with the registry answer
+                if responses:
+                    logger.warning(f"Referral to {server} failed for {domain}, using registry data")
+                    break
+                raise
+
+            if server != IANA_WHOIS_SERVER:
+                responses.append(text)
+
+            referral = self.find_referral(text, server)
+            if not referral:
+                if server == IANA_WHOIS_SERVER:
+                    raise WhoisLookupError(f"No WHOIS server is registered for {domain}")
+                break
+            logger.debug(f"WHOIS referral for {domain}: {server} -> {referral}")
+            server = referral
+
+        return "\n".join(responses)
+
+
+# Shared client instance
+whois_client = AsyncWhoisClient()
@@ -0,0 +1,298 @@
+"""Streaming WHOIS response parser with precompiled per-TLD field tables.
+
+Reads the raw text line by line, maps each "Key: value" line to one of the
+fields WHOISService returns and stops as soon as the fields needed for a
+status decision are complete, skipping the legal notices registries append.
+Parsing is a pure function of (domain, text), so it can run in a process pool.
+"""
+import asyncio
+import logging
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple
+
+from whois.parser import WhoisEntry
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Fields collected as lists; every other field keeps its first value
+LIST_FIELDS = frozenset({"name_servers", "status", "emails"})
+DATE_FIELDS = frozenset({"updated_date", "creation_date", "expiration_date"})
+
+# Parsing stops once all of these are present and the current run of
+# repeated list keys has ended
+REQUIRED_FIELDS = frozenset({"status", "creation_date", "expiration_date", "registrar", "name_servers"})
+
+DATE_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d",
+    "%d-%b-%Y",
+    "%d-%b-%Y %H:%M:%S",
+    "%d.%m.%Y",
+    "%Y/%m/%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y.%m.%d",
+    "%d/%m/%Y",
+)
+
+# ICANN-style "Key: value" lines, shared by most registries
+KEY_VALUE_LINE = re.compile(r"^\s*([^:\[\]>%#]{2,60}?)\s*:\s*(.*?)\s*$")
+# JPRS-style "[Key]  value" lines
+BRACKET_LINE = re.compile(r"^\s*\[([^\]]+)\]\s*(.*?)\s*$")
+# Trailing zone names such as "UTC" or "(JST)" after a date
+ZONE_SUFFIX = re.compile(r"\s*\(?[A-Za-z]{2,5}\)?$")
+
+
+class WhoisRecord:
+    """Parsed registration data of one domain, with the WHOISService field set."""
+
+    __slots__ = (
+        "domain_name", "registrar", "whois_server", "referral_url",
+        "updated_date", "creation_date", "expiration_date",
+        "name_servers", "status", "emails", "dnssec",
+        "name", "org", "address", "city", "state", "zipcode", "country",
+    )
+
+    def __init__(self):
+        for slot in self.__slots__:
+            setattr(self, slot, [] if slot in LIST_FIELDS else None)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __getstate__(self):
+        return self.as_dict()
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
+    def __repr__(self) -> str:
+        return f"WhoisRecord({self.as_dict()!r})"
+
+
+DEFAULT_KEYS: Dict[str, str] = {
+    "domain name": "domain_name",
+    "domain": "domain_name",
+    "registrar": "registrar",
+    "sponsoring registrar": "registrar",
+    "registrar name": "registrar",
+    "registrar whois server": "whois_server",
+    "whois server": "whois_server",
+    "registrar url": "referral_url",
+    "referral url": "referral_url",
+    "updated date": "updated_date",
+    "last updated": "updated_date",
+    "last modified": "updated_date",
+    "changed": "updated_date",
+    "creation date": "creation_date",
+    "created": "creation_date",
+    "created on": "creation_date",
+    "registered on": "creation_date",
+    "registration time": "creation_date",
+    "registry expiry date": "expiration_date",
+    "registrar registration expiration date": "expiration_date",
+    "expiration date": "expiration_date",
+    "expiry date": "expiration_date",
+    "expires on": "expiration_date",
+    "expires": "expiration_date",
+    "paid-till": "expiration_date",
+    "name server": "name_servers",
+    "nameserver": "name_servers",
+    "nameservers": "name_servers",
+    "nserver": "name_servers",
+    "domain status": "status",
+    "status": "status",
+    "registrar abuse contact email": "emails",
+    "dnssec": "dnssec",
+    "registrant name": "name",
+    "registrant organization": "org",
+    "registrant street": "address",
+    "registrant city": "city",
+    "registrant state/province": "state",
+    "registrant postal code": "zipcode",
+    "registrant country": "country",
+}
+
+
+class TldParser:
+    """Field extractor for one registry's response format."""
+
+    def __init__(
+        self,
+        keys: Dict[str, str],
+        line_pattern: Pattern[str] = KEY_VALUE_LINE,
+        block_keys: Iterable[str] = (),
+        stop_markers: Tuple[str, ...] = (">>> last update of",),
+    ):
+        """
+        Initialize the parser.
+
+        Args:
+            keys: Lowercased response key -> record field
+            line_pattern: Regex splitting a line into key and value
+            block_keys: Keys whose values follow on indented lines
+                (e.g. Nominet's "Name servers:" block)
+            stop_markers: Lowercased line prefixes after which nothing useful follows
+        """
+        self.keys = keys
+        self.line_pattern = line_pattern
+        self.block_keys: FrozenSet[str] = frozenset(block_keys)
+        self.stop_markers = stop_markers
+
+    def parse(self, text: str) -> WhoisRecord:
+        record = WhoisRecord()
+        found = set()
+        block_field: Optional[str] = None
+        previous_field: Optional[str] = None
+
+        for line in text.splitlines():
+            stripped = line.strip()
+            if not stripped:
+                block_field = None
+                continue
+            lowered = stripped.lower()
+            if lowered.startswith(self.stop_markers):
+                break
+
+            match = self.line_pattern.match(line)
+            key = match.group(1).strip().lower() if match else None
+            field = self.keys.get(key) if key else None
+
+            if field is None and block_field is not None and line[:1].isspace():
+                # Indented continuation of a block such as "Name servers:"
+                _store(record, block_field, stripped)
+                found.add(block_field)
+                continue
+            block_field = None
+            if field is None:
+                continue
+
+            value = match.group(2)
+            if not value:
+                if key in self.block_keys:
+                    block_field = field
+                continue
+            # Whether this line ends the last repeated field we needed
+            done = previous_field in LIST_FIELDS and field != previous_field and REQUIRED_FIELDS <= found
+            _store(record, field, value)
+            if done:
+                break
+            found.add(field)
+            previous_field = field
+        return record
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        parsed = None
+        candidate = ZONE_SUFFIX.sub("", value)
+        for fmt in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(candidate, fmt)
+                break
+            except ValueError:
+                continue
+    if parsed is not None and parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _store(record: WhoisRecord, field: str, value: str) -> None:
+    if field in LIST_FIELDS:
+        if field == "name_servers":
+            value = value.split()[0].rstrip(".").lower()
+        values: List[str] = getattr(record, field)
+        if value not in values:
+            values.append(value)
+    elif getattr(record, field) is None:
+        setattr(record, field, _parse_date(value) if field in DATE_FIELDS else value)
+
+
+DEFAULT_PARSER = TldParser(DEFAULT_KEYS)
+
+TLD_PARSERS: Dict[str, TldParser] = {
+    # Nominet lists values on indented lines under a heading
+    "uk": TldParser(
+        {**DEFAULT_KEYS, "name servers": "name_servers", "registration status": "status"},
+        block_keys=("domain name", "registrar", "name servers", "registration status"),
+        stop_markers=("whois lookup made at", "copyright nominet"),
+    ),
+    # JPRS answers in English with "[Key]  value" lines when queried with /e
+    "jp": TldParser(
+        {
+            "domain name": "domain_name",
+            "name server": "name_servers",
+            "created on": "creation_date",
+            "expires on": "expiration_date",
+            "last updated": "updated_date",
+            "status": "status",
+            "state": "status",
+            "registrant": "name",
+        },
+        line_pattern=BRACKET_LINE,
+    ),
+}
+
+
+def parse_whois(domain: str, text: str) -> WhoisRecord:
+    """
+    Parse a raw WHOIS response.
+
+    Args:
+        domain: Domain that was looked up, selects the TLD's field table
+        text: Raw response text
+
+    Returns:
+        The parsed record; fields the response lacks are None or empty lists
+    """
+    tld = domain.lower().rsplit(".", 1)[-1]
+    record = TLD_PARSERS.get(tld, DEFAULT_PARSER).parse(text)
+    if record.domain_name:
+        record.domain_name = record.domain_name.lower()
+    return record
+
+
+def parse_response(domain: str, text: str) -> Dict[str, Any]:
+    """
+    Parse a raw WHOIS response into the WHOISService field dict.
+
+    Falls back to python-whois for formats our field tables do not know,
+    recognisable by nothing having been extracted.
+
+    Raises:
+        PywhoisError: If the fallback parser rejects the response
+    """
+    record = parse_whois(domain, text)
+    if record.domain_name or record.creation_date or record.name_servers:
+        return record.as_dict()
+    logger.debug(f"No known WHOIS fields for {domain}, falling back to python-whois")
+    whois_data = WhoisEntry.load(domain, text)
+    return {slot: whois_data.get(slot) for slot in WhoisRecord.__slots__}
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+async def parse_response_async(domain: str, text: str) -> Dict[str, Any]:
+    """
+    Like `parse_response`, in a process pool when WHOIS_PARSE_WORKERS is set.
+
+    With WHOIS_PARSE_WORKERS at 0 the (cheap) parse runs inline.
+    """
+    global _pool
+    if settings.WHOIS_PARSE_WORKERS <= 0:
+        return parse_response(domain, text)
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.WHOIS_PARSE_WORKERS)
+    return await asyncio.get_running_loop().run_in_executor(_pool, parse_response, domain, text)
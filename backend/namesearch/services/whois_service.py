@@ -2,7 +2,6 @@
 import logging
 from datetime import datetime
 from typing import Dict, Optional, Any
-import whois
 from whois.parser import PywhoisError
 
 from fastapi import HTTPException, status
@@ -12,35 +11,19 @@ from ..core.config import settings
 from ..crud import crud_domain
 from ..models.domain import DomainStatus
 from ..schemas.domain import DomainCreate, DomainUpdate
+from ..utils.single_flight import SingleFlight
+from ..utils.whois_classifier import whois_classifier
+from .lookup_resilience import LookupUnavailable, lookup_guard
+from .whois_client import AsyncWhoisClient, WhoisLookupError, whois_client
+from .whois_parser import parse_response_async
 
 logger = logging.getLogger(__name__)
 
 class WHOISService:
     """Service for performing WHOIS lookups and processing results."""
     
-    @staticmethod
-    def _parse_whois_data(whois_data: Dict) -> Dict[str, Any]:
-        """Parse raw WHOIS data into a structured format."""
-        return {
-            "domain_name": whois_data.get("domain_name"),
-            "registrar": whois_data.get("registrar"),
-            "whois_server": whois_data.get("whois_server"),
-            "referral_url": whois_data.get("referral_url"),
-            "updated_date": whois_data.get("updated_date"),
-            "creation_date": whois_data.get("creation_date"),
-            "expiration_date": whois_data.get("expiration_date"),
-            "name_servers": whois_data.get("name_servers", []),
-            "status": whois_data.get("status"),
-            "emails": whois_data.get("emails", []),
-            "dnssec": whois_data.get("dnssec"),
-            "name": whois_data.get("name"),
-            "org": whois_data.get("org"),
-            "address": whois_data.get("address"),
-            "city": whois_data.get("city"),
-            "state": whois_data.get("state"),
-            "zipcode": whois_data.get("zipcode"),
-            "country": whois_data.get("country"),
-        }
+    client: AsyncWhoisClient = whois_client
+    flight: SingleFlight = SingleFlight("whois_lookup")
     
     @staticmethod
     def _determine_domain_status(whois_data: Dict) -> DomainStatus:
@@ -48,79 +31,10 @@ class WHOISService:
         Determine the status of a domain based on WHOIS data.
         Handles TLD-specific status messages and common patterns.
         """
-        domain_name = whois_data.get("domain_name", "").lower()
-        if not domain_name:
-            return DomainStatus.UNKNOWN
-            
-        # Convert status to list if it's not already
-        statuses = whois_data.get("status", [])
-        if not isinstance(statuses, list):
-            statuses = [statuses] if statuses else []
-            
-        status_lower = [str(s).lower() for s in statuses if s]
-        whois_str = str(whois_data).lower()
-        
-        # TLD-specific handling
-        if domain_name.endswith(".ng"):
-            # .ng domains return "Not found" when available
-            if "not found" in whois_str:
-                return DomainStatus.AVAILABLE
-            return DomainStatus.REGISTERED
-            
-        # Common availability indicators across TLDs
-        availability_indicators = [
-            "no match", 
-            "no data found", 
-            "not found",
-            "no entries found",
-            "no object found",
-            "no such domain",
-            "domain not found"
-        ]
-        
-        if any(indicator in whois_str for indicator in availability_indicators):
-            return DomainStatus.AVAILABLE
-            
-        # Check for registered domain indicators
-        registered_indicators = [
-            "clientdeleteprohibited", 
-            "clienttransferprohibited",
-            "clientupdateprohibited",
-            "serverdeleteprohibited",
-            "servertransferprohibited",
-            "serverupdateprohibited",
-            "active",
-            "registered",
-            "ok",
-            "paid-till"
-        ]
-        
-        # If we have any registered indicators or statuses, domain is registered
-        if any(indicator in status_lower for indicator in registered_indicators):
-            return DomainStatus.REGISTERED
-            
-        # Check expiration date if available
-        if whois_data.get("expiration_date"):
-            exp_date = whois_data.get("expiration_date")
-            if isinstance(exp_date, list):
-                exp_date = exp_date[0] if exp_date else None
-                
-            if exp_date and isinstance(exp_date, datetime) and exp_date < datetime.now():
-                return DomainStatus.AVAILABLE
-                
-        # If we have a creation date but no explicit status, assume registered
-        if whois_data.get("creation_date"):
-            return DomainStatus.REGISTERED
-            
-        # If we have name servers, domain is likely registered
-        if whois_data.get("name_servers"):
-            return DomainStatus.REGISTERED
-            
-        # Default to unknown if we can't determine status
-        return DomainStatus.UNKNOWN
+        return whois_classifier.domain_status(whois_data)
     
     @classmethod
-    def lookup_domain(cls, domain_name: str) -> Dict[str, Any]:
+    async def lookup_domain(cls, domain_name: str) -> Dict[str, Any]:
         """
         Perform a WHOIS lookup for a domain.
         
@@ -133,11 +47,33 @@ class WHOISService:
         Raises:
             HTTPException: If the WHOIS lookup fails
         """
+        # Concurrent lookups of one domain share a single query; each caller
+        # gets its own copy of the result
+        result = await cls.flight.do_async(
+            domain_name.lower(), lambda: cls._lookup_domain(domain_name)
+        )
+        return dict(result)
+    
+    @classmethod
+    async def _lookup_domain(cls, domain_name: str) -> Dict[str, Any]:
+        """Uncoalesced WHOIS lookup behind `lookup_domain`."""
         try:
             logger.info(f"Performing WHOIS lookup for domain: {domain_name}")
-            whois_data = whois.whois(domain_name)
-            parsed_data = cls._parse_whois_data(whois_data)
-            parsed_data["status"] = cls._determine_domain_status(whois_data)
+            raw = await lookup_guard.call(
+                cls.client.route(domain_name) or domain_name.rsplit(".", 1)[-1].lower(),
+                lambda: cls.client.lookup(domain_name.lower()),
+            )
+            if whois_classifier.raw_says_available(domain_name, raw):
+                # No need to parse a "no match" answer
+                return {
+                    "domain_name": domain_name,
+                    "status": DomainStatus.AVAILABLE,
+                    "is_available": True
+                }
+            parsed_data = await parse_response_async(domain_name, raw)
+            parsed_data["status"] = cls._determine_domain_status(parsed_data)
+            # Kept for the WHOIS archive, which stores the raw answer
+            parsed_data["raw"] = raw
             return parsed_data
             
         except PywhoisError as e:
@@ -152,6 +88,12 @@ class WHOISService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"WHOIS lookup failed: {str(e)}"
             )
+        except (WhoisLookupError, LookupUnavailable) as e:
+            logger.error(f"WHOIS server unreachable for {domain_name}: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"WHOIS server unavailable: {str(e)}"
+            )
         except Exception as e:
             logger.error(f"Unexpected error during WHOIS lookup for {domain_name}: {str(e)}")
             raise HTTPException(
@@ -160,7 +102,7 @@ class WHOISService:
             )
     
     @classmethod
-    def check_domain_availability(cls, domain_name: str) -> Dict[str, Any]:
+    async def check_domain_availability(cls, domain_name: str) -> Dict[str, Any]:
         """
         Check if a domain is available.
         
@@ -171,7 +113,7 @@ class WHOISService:
             Dict containing availability information
         """
         try:
-            data = cls.lookup_domain(domain_name)
+            data = await cls.lookup_domain(domain_name)
             is_available = data.get("status") == DomainStatus.AVAILABLE
             return {
                 "domain": domain_name,
@@ -189,7 +131,7 @@ class WHOISService:
             }
     
     @classmethod
-    def update_domain_from_whois(
+    async def update_domain_from_whois(
         cls, 
         db: Session, 
         domain_name: str,
@@ -211,7 +153,7 @@ class WHOISService:
             db_domain = crud_domain.domain.get_by_name(db, name=domain_name)
             
             # Perform WHOIS lookup
-            whois_data = cls.lookup_domain(domain_name)
+            whois_data = await cls.lookup_domain(domain_name)
             
             # Prepare domain data for create/update
             domain_data = {
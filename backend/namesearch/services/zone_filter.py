@@ -0,0 +1,240 @@
+"""Bloom filters of registered domains built from TLD zone files.
+
+A filter answers "is this name delegated in the zone?" from a memory-mapped
+file without any network traffic. A miss is definite (the name is not in
+the zone); a hit is right except for the configured false-positive rate.
+Filters are built offline with `python -m scripts.build_zone_filter` and
+picked up again whenever a new snapshot replaces the file.
+"""
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from enum import Enum
+from typing import Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"NSBLOOM1"
+# magic, number of bits, number of hash functions, number of names, TLD
+HEADER = struct.Struct("!8sQIQ64s")
+
+
+class ZoneVerdict(str, Enum):
+    """Outcome of a zone filter lookup."""
+    IN_ZONE = "in_zone"  # Delegated in the zone, registered (small false-positive rate)
+    NOT_IN_ZONE = "not_in_zone"  # Definitely not delegated in the zone
+    NO_FILTER = "no_filter"  # No filter has been built for the TLD
+
+
+def _positions(name: str, num_bits: int, num_hashes: int) -> Iterator[int]:
+    """Bit positions of a name, by double hashing one 128-bit digest."""
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    for i in range(num_hashes):
+        yield (h1 + i * h2) % num_bits
+
+
+def filter_size(expected_items: int, fp_rate: float) -> Tuple[int, int]:
+    """Return the optimal (number of bits, number of hashes) for a filter."""
+    expected_items = max(expected_items, 1)
+    num_bits = math.ceil(-expected_items * math.log(fp_rate) / (math.log(2) ** 2))
+    num_bits = (num_bits + 7) // 8 * 8
+    num_hashes = max(1, round(num_bits / expected_items * math.log(2)))
+    return num_bits, num_hashes
+
+
+def iter_zone_domains(lines: Iterable[str], tld: str) -> Iterator[str]:
+    """
+    Yield the delegated second-level names of a master-format zone file.
+
+    Handles both relative owners under `$ORIGIN` (as in the Verisign .com
+    dump) and fully qualified owners (as in ICANN CZDS files). Each name is
+    yielded once per run of consecutive NS records.
+
+    Args:
+        lines: Lines of the zone file
+        tld: TLD the zone is for, e.g. 'com'
+    """
+    tld = tld.lower().strip(".")
+    origin = tld
+    suffix = "." + tld
+    previous = None
+    for line in lines:
+        line = line.split(";", 1)[0]
+        if not line.strip():
+            continue
+        tokens = line.split()
+        if tokens[0].upper() == "$ORIGIN" and len(tokens) > 1:
+            origin = tokens[1].lower().strip(".")
+            continue
+        if tokens[0].startswith("$") or line[0] in " \t":
+            continue  # Other directives, and records continuing the previous owner
+        if "NS" not in (t.upper() for t in tokens[1:4]):
+            continue
+
+        owner = tokens[0].lower()
+        if owner.endswith("."):
+            owner = owner[:-1]
+        elif owner == "@":
+            owner = origin
+        else:
+            owner = f"{owner}.{origin}"
+        if owner == previous or not owner.endswith(suffix):
+            continue
+        if "." in owner[:-len(suffix)]:
+            continue  # Glue or names below the second level
+        previous = owner
+        yield owner
+
+
+def build_zone_filter(
+    zone: TextIO,
+    tld: str,
+    out_path: str,
+    expected_items: Optional[int] = None,
+    fp_rate: Optional[float] = None,
+) -> int:
+    """
+    Stream a zone file into a Bloom filter file.
+
+    The filter is written next to `out_path` and moved into place in one
+    rename, so readers never see a partially written file.
+
+    Args:
+        zone: Open zone file; read twice when `expected_items` is not given
+        tld: TLD the zone is for
+        out_path: Destination of the filter file
+        expected_items: Number of delegated names, counted from the file if None
+        fp_rate: Target false-positive rate
+
+    Returns:
+        Number of names added to the filter
+    """
+    fp_rate = fp_rate or settings.ZONE_FILTER_FP_RATE
+    if expected_items is None:
+        expected_items = sum(1 for _ in iter_zone_domains(zone, tld))
+        zone.seek(0)
+
+    num_bits, num_hashes = filter_size(expected_items, fp_rate)
+    bits = bytearray(num_bits // 8)
+    count = 0
+    for name in iter_zone_domains(zone, tld):
+        for position in _positions(name, num_bits, num_hashes):
+            bits[position >> 3] |= 1 << (position & 7)
+        count += 1
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, num_bits, num_hashes, count, tld.lower().encode("ascii")))
+        f.write(bits)
+    os.replace(tmp_path, out_path)
+    logger.info(f"Built zone filter for .{tld} with {count} names ({num_bits // 8} bytes)")
+    return count
+
+
+class ZoneFilter:
+    """Read-only, memory-mapped Bloom filter for one TLD."""
+
+    def __init__(self, path: str):
+        """
+        Map a filter file.
+
+        Raises:
+            ValueError: If the file is not a zone filter
+        """
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f"{path} is not a zone filter")
+        magic, self.num_bits, self.num_hashes, self.count, tld = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or len(self._mmap) < HEADER.size + self.num_bits // 8:
+            raise ValueError(f"{path} is not a zone filter")
+        self.tld = tld.rstrip(b"\x00").decode("ascii")
+
+    def __contains__(self, domain: str) -> bool:
+        data = self._mmap
+        for position in _positions(domain, self.num_bits, self.num_hashes):
+            if not data[HEADER.size + (position >> 3)] >> (position & 7) & 1:
+                return False
+        return True
+
+
+class ZoneFilterStore:
+    """Per-TLD zone filters loaded from a directory and swapped on new snapshots."""
+
+    def __init__(self, directory: Optional[str] = None, reload_interval: Optional[float] = None):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory holding '<tld>.bloom' files
+            reload_interval: Seconds between checks for a replaced file
+        """
+        self.directory = os.path.expanduser(directory or settings.ZONE_FILTER_DIR)
+        self.reload_interval = (
+            reload_interval if reload_interval is not None else settings.ZONE_FILTER_RELOAD_INTERVAL
+        )
+        self._lock = threading.Lock()
+        # tld -> (filter or None, (inode, mtime) of the loaded file, time of last check)
+        self._filters: Dict[str, Tuple[Optional[ZoneFilter], Optional[Tuple[int, int]], float]] = {}
+
+    def path_for(self, tld: str) -> str:
+        return os.path.join(self.directory, f"{tld}.bloom")
+
+    def _load(self, tld: str) -> Optional[ZoneFilter]:
+        now = time.monotonic()
+        entry = self._filters.get(tld)
+        if entry is not None and now - entry[2] < self.reload_interval:
+            return entry[0]
+
+        with self._lock:
+            entry = self._filters.get(tld)
+            if entry is not None and now - entry[2] < self.reload_interval:
+                return entry[0]
+            path = self.path_for(tld)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self._filters[tld] = (None, None, now)
+                return None
+
+            identity = (stat.st_ino, stat.st_mtime_ns)
+            zone_filter = entry[0] if entry is not None and entry[1] == identity else None
+            if zone_filter is None:
+                try:
+                    zone_filter = ZoneFilter(path)
+                    logger.info(f"Loaded zone filter for .{tld} ({zone_filter.count} names)")
+                except (OSError, ValueError) as e:
+                    logger.error(f"Could not load zone filter {path}: {str(e)}")
+                    # Keep answering from the previous snapshot if there is one
+                    zone_filter = entry[0] if entry is not None else None
+            # Replacing the tuple swaps snapshots atomically for readers; the
+            # old mapping is released once no lookup holds it any more
+            self._filters[tld] = (zone_filter, identity, now)
+            return zone_filter
+
+    def check(self, domain: str) -> ZoneVerdict:
+        """
+        Look a normalized domain up in its TLD's filter.
+
+        Args:
+            domain: Domain name such as 'example.com'
+        """
+        tld = domain.rsplit(".", 1)[-1]
+        zone_filter = self._load(tld)
+        if zone_filter is None:
+            return ZoneVerdict.NO_FILTER
+        return ZoneVerdict.IN_ZONE if domain in zone_filter else ZoneVerdict.NOT_IN_ZONE
+
+
+# Shared store instance
+zone_filters = ZoneFilterStore()
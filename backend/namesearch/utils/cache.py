@@ -1,57 +1,460 @@
-"""Caching utilities for domain availability checks."""
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
-import hashlib
+"""Caching utilities for domain availability checks.
 
-# In-memory cache (replace with Redis in production)
-_cache: Dict[str, Dict] = {}
+Lookups read through two tiers: a small in-process L1 and a Redis L2 shared
+by every worker (REDIS_URL), then an optional on-disk tier that survives
+restarts (utils/disk_cache.py), then the network. The L1 is a bounded,
+thread-safe LRU cache with per-entry TTLs, split into independently locked
+shards so lookups running in `asyncio.to_thread` workers do not contend on a
+single lock; each shard evicts its least recently used entries once it
+exceeds its share of the entry or byte budget, and drops expired entries as
+writes come in rather than waiting for them to be read. The L2 fails open:
+while Redis is unreachable the L1 carries on alone.
+
+The Redis and disk tiers use blocking clients. Code running on an event
+loop reads through `get_cached_domain_async`, which answers L1 hits inline
+and runs the rest of the read in `asyncio.to_thread`, so an L1 miss never
+stalls the loop for a Redis round trip or, while Redis is degraded, its
+socket timeout; async lookups write their answers back from a thread too
+(`cache_availability_async` in utils/domain_checker.py). A thread keeps one
+client and one code path for sync and async callers, where `redis.asyncio`
+would need a second client per loop.
+"""
+import asyncio
+import heapq
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import redis
+
+from ..core.config import settings
+from .cache_codec import CacheCodecError, decode_entry, encode_entry
+from .disk_cache import DiskCacheTier
+
+logger = logging.getLogger(__name__)
+
+
+def approximate_size(value: Any) -> int:
+    """Rough deep size in bytes of a cached value built from plain containers."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approximate_size(k) + approximate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(item) for item in value)
+    elif not isinstance(value, (str, bytes, int, float, bool, date, type(None))):
+        # Objects such as WhoisRecord; their attributes are not walked
+        size += 64
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class _Shard:
+    """One lock's worth of the cache: an LRU-ordered dict plus an expiry heap."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # (expires_at, key); entries overwritten since leave stale items
+        # behind, recognised by a differing expires_at
+        self.expiry_heap: List[Tuple[float, str]] = []
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def remove(self, key: str) -> None:
+        entry = self.entries.pop(key)
+        self.bytes -= entry.size
+
+    def purge_expired(self, now: float) -> int:
+        purged = 0
+        heap = self.expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self.remove(key)
+                purged += 1
+        if len(heap) > 2 * len(self.entries) + 64:
+            # Mostly stale items from overwritten or evicted keys
+            self.expiry_heap = [(e.expires_at, k) for k, e in self.entries.items()]
+            heapq.heapify(self.expiry_heap)
+        self.expirations += purged
+        return purged
+
+    def evict(self) -> None:
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            key = next(iter(self.entries))
+            self.remove(key)
+            self.evictions += 1
+
+
+class TTLCache:
+    """Bounded, thread-safe LRU cache with per-entry TTLs and lock striping."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        default_ttl: float = 3600,
+        shards: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Entries kept across all shards
+            max_bytes: Approximate memory budget across all shards
+            default_ttl: Seconds an entry lives when set without a TTL
+            shards: Number of independently locked shards
+            clock: Monotonic time source, replaceable in tests
+        """
+        self.default_ttl = default_ttl
+        self.clock = clock
+        shards = max(1, shards)
+        self._shards = [
+            _Shard(max(1, max_entries // shards), max(1, max_bytes // shards))
+            for _ in range(shards)
+        ]
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the live value for `key`, or None."""
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None:
+                shard.misses += 1
+                return None
+            if entry.expires_at <= self.clock():
+                shard.remove(key)
+                shard.expirations += 1
+                shard.misses += 1
+                return None
+            shard.entries.move_to_end(key)
+            shard.hits += 1
+            return entry.value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store `value` under `key` for `ttl` seconds (the default TTL if None)."""
+        now = self.clock()
+        expires_at = now + (ttl if ttl else self.default_ttl)
+        size = approximate_size(key) + approximate_size(value)
+        shard = self._shard(key)
+        with shard.lock:
+            if key in shard.entries:
+                shard.remove(key)
+            shard.entries[key] = _Entry(value, expires_at, size)
+            shard.bytes += size
+            heapq.heappush(shard.expiry_heap, (expires_at, key))
+            shard.purge_expired(now)
+            shard.evict()
+
+    def delete(self, key: str) -> bool:
+        """Remove `key`; returns whether it was cached."""
+        shard = self._shard(key)
+        with shard.lock:
+            if key not in shard.entries:
+                return False
+            shard.remove(key)
+            return True
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry now; returns how many were dropped."""
+        now = self.clock()
+        purged = 0
+        for shard in self._shards:
+            with shard.lock:
+                purged += shard.purge_expired(now)
+        return purged
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.expiry_heap = []
+                shard.bytes = 0
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def stats(self) -> Dict[str, int]:
+        """Size, budget and hit/miss/eviction counters summed over the shards."""
+        totals = {
+            "entries": 0, "bytes": 0, "max_entries": 0, "max_bytes": 0,
+            "hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+        }
+        for shard in self._shards:
+            with shard.lock:
+                totals["entries"] += len(shard.entries)
+                totals["bytes"] += shard.bytes
+                totals["max_entries"] += shard.max_entries
+                totals["max_bytes"] += shard.max_bytes
+                totals["hits"] += shard.hits
+                totals["misses"] += shard.misses
+                totals["evictions"] += shard.evictions
+                totals["expirations"] += shard.expirations
+        return totals
+
+
+class RedisCacheTier:
+    """Shared cache tier in Redis, storing entries in the compact binary format."""
+
+    def __init__(
+        self,
+        client: Optional[redis.Redis] = None,
+        url: Optional[str] = None,
+        prefix: str = "namesearch:domain:",
+        timeout: Optional[float] = None,
+        retry_after: Optional[float] = None,
+    ):
+        """
+        Initialize the tier.
+
+        Args:
+            client: Redis client to use, None to connect to `url` on first use
+            url: Redis URL, defaults to REDIS_URL
+            prefix: Namespace of the cache keys
+            timeout: Socket timeout in seconds; a slow Redis must not slow lookups
+            retry_after: Seconds to skip Redis after an error
+        """
+        self._client = client
+        self.url = url or settings.REDIS_URL
+        self.prefix = prefix
+        self.timeout = timeout if timeout is not None else settings.CACHE_REDIS_TIMEOUT
+        self.retry_after = retry_after if retry_after is not None else settings.CACHE_REDIS_RETRY_AFTER
+        self._down_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _redis(self) -> Optional[redis.Redis]:
+        if time.monotonic() < self._down_until:
+            return None
+        if self._client is None:
+            self._client = redis.from_url(
+                self.url, socket_timeout=self.timeout, socket_connect_timeout=self.timeout
+            )
+        return self._client
+
+    def _failed(self, operation: str, error: Exception) -> None:
+        self.errors += 1
+        self._down_until = time.monotonic() + self.retry_after
+        logger.warning(f"Redis cache {operation} failed, using the local cache only for {self.retry_after}s: {str(error)}")
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, seconds to live) for `key`, or None."""
+        client = self._redis()
+        if client is None:
+            return None
+        try:
+            with client.pipeline(transaction=False) as pipe:
+                data, pttl = pipe.get(self.prefix + key).pttl(self.prefix + key).execute()
+        except redis.RedisError as e:
+            self._failed("read", e)
+            return None
+        if data is None:
+            self.misses += 1
+            return None
+        try:
+            value = decode_entry(data)
+        except CacheCodecError as e:
+            logger.warning(f"Dropping unreadable cache entry {key}: {str(e)}")
+            self.delete(key)
+            return None
+        self.hits += 1
+        return value, (pttl / 1000 if pttl and pttl > 0 else None)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.set(self.prefix + key, encode_entry(value), px=max(1, int(ttl * 1000)))
+        except redis.RedisError as e:
+            self._failed("write", e)
+
+    def delete(self, key: str) -> None:
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.delete(self.prefix + key)
+        except redis.RedisError as e:
+            self._failed("delete", e)
+
+    def publish(self, channel: str, message: bytes) -> bool:
+        """Publish a message on a pub/sub channel; returns whether it was sent."""
+        client = self._redis()
+        if client is None:
+            return False
+        try:
+            client.publish(channel, message)
+        except redis.RedisError as e:
+            self._failed("publish", e)
+            return False
+        return True
+
+    def clear(self) -> None:
+        """Delete every key under the prefix."""
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            keys = list(client.scan_iter(match=self.prefix + "*", count=1000))
+            for start in range(0, len(keys), 1000):
+                client.delete(*keys[start:start + 1000])
+        except redis.RedisError as e:
+            self._failed("clear", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "available": time.monotonic() >= self._down_until,
+        }
+
+
+class TieredCache:
+    """Read-through L1 (in-process), L2 (Redis) and disk cache."""
+
+    def __init__(
+        self,
+        l1: TTLCache,
+        l2: Optional[RedisCacheTier] = None,
+        l1_max_ttl: Optional[float] = None,
+        disk: Optional[DiskCacheTier] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            l1: In-process tier
+            l2: Shared tier, None for a process-local cache
+            l1_max_ttl: Upper bound of L1 TTLs when an L2 exists, so workers
+                pick up entries other workers rewrote in Redis
+            disk: Persistent tier, read after Redis so that Redis, which
+                every worker updates, wins while it is reachable
+        """
+        self.l1 = l1
+        self.l2 = l2
+        self.disk = disk
+        self.l1_max_ttl = l1_max_ttl if l1_max_ttl is not None else settings.CACHE_L1_MAX_TTL
+
+    def _l1_ttl(self, ttl: Optional[float]) -> float:
+        ttl = ttl or self.l1.default_ttl
+        return min(ttl, self.l1_max_ttl) if self.l2 is not None else ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+        return self._get_shared(key)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """`get` with the Redis and disk reads in a worker thread."""
+        value = self.l1.get(key)
+        if value is not None or (self.l2 is None and self.disk is None):
+            return value
+        return await asyncio.to_thread(self._get_shared, key)
+
+    def _get_shared(self, key: str) -> Optional[Any]:
+        """Read the tiers behind L1, promoting a hit into L1."""
+        for tier in (self.l2, self.disk):
+            found = tier.get(key) if tier is not None else None
+            if found is not None:
+                value, ttl = found
+                self.l1.set(key, value, self._l1_ttl(ttl))
+                return value
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.l1.set(key, value, self._l1_ttl(ttl))
+        for tier in (self.l2, self.disk):
+            if tier is not None:
+                tier.set(key, value, ttl or self.l1.default_ttl)
+
+    def delete(self, key: str) -> None:
+        self.l1.delete(key)
+        for tier in (self.l2, self.disk):
+            if tier is not None:
+                tier.delete(key)
+
+    def clear(self) -> None:
+        self.l1.clear()
+        for tier in (self.l2, self.disk):
+            if tier is not None:
+                tier.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "l1": self.l1.stats(),
+            "l2": self.l2.stats() if self.l2 is not None else None,
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
+
+
+# Shared domain cache instance
+domain_cache = TieredCache(
+    TTLCache(
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        max_bytes=settings.CACHE_MAX_BYTES,
+        shards=settings.CACHE_SHARDS,
+    ),
+    RedisCacheTier() if settings.CACHE_REDIS_ENABLED and settings.REDIS_URL else None,
+    disk=DiskCacheTier(settings.CACHE_DISK_PATH) if settings.CACHE_DISK_PATH else None,
+)
 
-def get_cache_key(domain: str) -> str:
-    """Generate a cache key for a domain."""
-    return hashlib.md5(domain.lower().encode()).hexdigest()
 
 def get_cached_domain(domain: str) -> Optional[Dict]:
     """
     Get a domain from cache if it exists and is not expired.
-    
+
+    Looks in this process's cache first, then in the cache shared by all
+    workers.
+
     Args:
         domain: The domain name to retrieve from cache
-        
+
     Returns:
         Cached data if found and not expired, None otherwise
     """
-    key = get_cache_key(domain)
-    if key in _cache:
-        cached = _cache[key]
-        
-        # Check if cache entry has an explicit expiration
-        if 'expires_at' in cached and cached['expires_at'] is not None:
-            if datetime.now() < cached['expires_at']:
-                return cached['data']
-        # Fall back to default TTL (1 hour)
-        elif datetime.now() - cached['timestamp'] < timedelta(hours=1):
-            return cached['data']
-            
-        # Entry is expired, remove it
-        del _cache[key]
-    return None
+    return domain_cache.get(domain.lower())
+
+async def get_cached_domain_async(domain: str) -> Optional[Dict]:
+    """`get_cached_domain` for event loop code; never blocks on Redis or disk."""
+    return await domain_cache.get_async(domain.lower())
 
 def cache_domain(domain: str, data: Dict, ttl: Optional[int] = None) -> None:
     """
-    Cache domain availability data.
-    
+    Cache domain availability data in both tiers.
+
     Args:
         domain: The domain name to cache
         data: The data to cache
         ttl: Time to live in seconds (optional, defaults to 1 hour)
     """
-    key = get_cache_key(domain)
-    _cache[key] = {
-        'data': data,
-        'timestamp': datetime.now(),
-        'expires_at': datetime.now() + timedelta(seconds=ttl) if ttl else None
-    }
+    domain_cache.set(domain.lower(), data, ttl)
 
 def clear_cache() -> None:
     """Clear the entire cache."""
-    _cache.clear()
+    domain_cache.clear()
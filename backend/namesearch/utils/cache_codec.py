@@ -0,0 +1,111 @@
+"""Compact binary encoding of cache entries shared through Redis.
+
+Availability entries ({is_available, whois_data, expires_at, lookup_time})
+are packed as a two-byte header, the freshness deadline as a 32-bit
+timestamp, the lookup time in milliseconds and the WHOIS fields as compact
+JSON, zlib-compressed once they are large enough for it to pay off. Any other
+JSON-compatible dict is stored as a whole. Datetimes survive the round trip;
+nothing is unpickled, so a shared Redis cannot inject objects.
+"""
+import json
+import struct
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+FORMAT_VERSION = 2
+HEADER = struct.Struct("!BB")  # version, flags
+EXPIRY = struct.Struct("!IH")  # seconds since the epoch (0 for none), lookup milliseconds
+
+FLAG_AVAILABILITY = 0x01  # body is whois_data of an availability entry
+FLAG_AVAILABLE = 0x02
+FLAG_WHOIS = 0x04  # availability entry carries whois_data
+FLAG_ZLIB = 0x08
+
+# Bodies shorter than this are stored uncompressed
+COMPRESS_MIN_BYTES = 256
+AVAILABILITY_KEYS = frozenset({"is_available", "whois_data", "expires_at", "lookup_time"})
+
+
+class CacheCodecError(ValueError):
+    """Raised for bytes that are not a cache entry of a known format version."""
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def _object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "$dt" in obj:
+        return datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), default=_default, ensure_ascii=False).encode("utf-8")
+
+
+def _loads(body: bytes) -> Any:
+    return json.loads(body.decode("utf-8"), object_hook=_object_hook)
+
+
+def encode_entry(value: Dict[str, Any]) -> bytes:
+    """Encode a cache entry for the shared tier."""
+    flags = 0
+    prefix = b""
+    body = b""
+    if isinstance(value.get("is_available"), bool) and set(value) <= AVAILABILITY_KEYS:
+        flags |= FLAG_AVAILABILITY
+        if value["is_available"]:
+            flags |= FLAG_AVAILABLE
+        expires_at: Optional[datetime] = value.get("expires_at")
+        lookup_ms = min(0xFFFF, int((value.get("lookup_time") or 0) * 1000))
+        prefix = EXPIRY.pack(int(expires_at.timestamp()) if expires_at else 0, lookup_ms)
+        if value.get("whois_data"):
+            flags |= FLAG_WHOIS
+            body = _dumps(value["whois_data"])
+    else:
+        body = _dumps(value)
+
+    if len(body) >= COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(body, 6)
+        if len(compressed) < len(body):
+            flags |= FLAG_ZLIB
+            body = compressed
+    return HEADER.pack(FORMAT_VERSION, flags) + prefix + body
+
+
+def decode_entry(data: bytes) -> Dict[str, Any]:
+    """
+    Inverse of `encode_entry`.
+
+    Raises:
+        CacheCodecError: If the bytes are not a valid entry
+    """
+    try:
+        version, flags = HEADER.unpack_from(data)
+        if version != FORMAT_VERSION:
+            raise CacheCodecError(f"Unknown cache entry version {version}")
+        offset = HEADER.size
+        if flags & FLAG_AVAILABILITY:
+            expires_ts, lookup_ms = EXPIRY.unpack_from(data, offset)
+            offset += EXPIRY.size
+        body = data[offset:]
+        if flags & FLAG_ZLIB:
+            body = zlib.decompress(body)
+        if not flags & FLAG_AVAILABILITY:
+            return _loads(body)
+        return {
+            "is_available": bool(flags & FLAG_AVAILABLE),
+            "whois_data": _loads(body) if flags & FLAG_WHOIS else None,
+            "expires_at": datetime.fromtimestamp(expires_ts) if expires_ts else None,
+            "lookup_time": lookup_ms / 1000,
+        }
+    except (struct.error, zlib.error, ValueError) as e:
+        if isinstance(e, CacheCodecError):
+            raise
+        raise CacheCodecError(f"Corrupt cache entry: {str(e)}") from e
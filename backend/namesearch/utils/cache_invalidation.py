@@ -0,0 +1,179 @@
+"""Cross-worker eviction of cached availability answers over Redis pub/sub.
+
+A worker that learns a domain's availability changed writes the new answer
+to its own L1 and to Redis, then publishes the domain on the invalidation
+channel. Every other worker is subscribed and evicts the domain from its L1,
+so its next read goes through to Redis. While the subscription is up, L1
+entries may live as long as CACHE_L1_MAX_TTL_SUBSCRIBED; when it drops, the
+L1 is cleared, since invalidations may have been missed, and TTLs fall back
+to CACHE_L1_MAX_TTL until it is back.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import redis
+import redis.asyncio
+
+from ..core.config import settings
+from .cache import TieredCache, domain_cache
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidationBus:
+    """Publishes changed domains and evicts those published by other workers."""
+
+    def __init__(
+        self,
+        cache: TieredCache,
+        channel: Optional[str] = None,
+        url: Optional[str] = None,
+        async_client_factory: Optional[Callable[[], redis.asyncio.Redis]] = None,
+        retry_after: Optional[float] = None,
+        ping_interval: float = 10.0,
+    ):
+        """
+        Initialize the bus.
+
+        Args:
+            cache: Cache whose L1 is evicted; publishing goes through its L2
+            channel: Pub/sub channel, defaults to CACHE_INVALIDATION_CHANNEL
+            url: Redis URL for the subscription, defaults to REDIS_URL
+            async_client_factory: Creates the subscribing client, for tests
+            retry_after: Seconds between reconnection attempts
+            ping_interval: Seconds between pings that detect a dead
+                connection, which would otherwise look like a quiet channel
+        """
+        self.cache = cache
+        self.channel = channel or settings.CACHE_INVALIDATION_CHANNEL
+        self.url = url or settings.REDIS_URL
+        self.async_client_factory = async_client_factory or (lambda: redis.asyncio.from_url(self.url))
+        self.retry_after = retry_after if retry_after is not None else settings.CACHE_INVALIDATION_RETRY_AFTER
+        self.ping_interval = ping_interval
+        # Lets a worker skip its own messages
+        self.origin = uuid.uuid4().hex
+        self.subscribed = False
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.received = 0
+        self.evicted = 0
+
+    def publish(self, keys: Iterable[str]) -> bool:
+        """
+        Tell the other workers to evict `keys` from their L1.
+
+        Returns:
+            Whether the message was sent; without Redis there is no one to tell
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys or self.cache.l2 is None:
+            return False
+        message = json.dumps({"origin": self.origin, "keys": keys}).encode("utf-8")
+        sent = self.cache.l2.publish(self.channel, message)
+        if sent:
+            self.published += 1
+        return sent
+
+    def handle(self, data: bytes) -> int:
+        """Evict the keys in one message; returns how many were cached here."""
+        try:
+            message = json.loads(data)
+            keys: List[str] = message["keys"]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed cache invalidation: {str(e)}")
+            return 0
+        if message.get("origin") == self.origin:
+            return 0
+        self.received += 1
+        evicted = sum(1 for key in keys if self.cache.l1.delete(key))
+        if self.cache.disk is not None:
+            # Read only when Redis misses, but then it must not be stale either
+            for key in keys:
+                self.cache.disk.delete(key)
+        self.evicted += evicted
+        return evicted
+
+    def _set_subscribed(self, subscribed: bool) -> None:
+        self.subscribed = subscribed
+        self.cache.l1_max_ttl = (
+            settings.CACHE_L1_MAX_TTL_SUBSCRIBED if subscribed else settings.CACHE_L1_MAX_TTL
+        )
+        # Entries cached while invalidations could have been missed, or
+        # with the long TTL that assumed they would arrive, are dropped
+        self.cache.l1.clear()
+
+    async def run(self) -> None:
+        """Listen for invalidations until cancelled, reconnecting after errors."""
+        while True:
+            client = self.async_client_factory()
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                self._set_subscribed(True)
+                logger.info(f"Subscribed to cache invalidations on {self.channel}")
+                last_ping = time.monotonic()
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=self.ping_interval
+                    )
+                    if message is not None and message.get("type") == "message":
+                        self.handle(message["data"])
+                    if time.monotonic() - last_ping >= self.ping_interval:
+                        await pubsub.ping()
+                        last_ping = time.monotonic()
+            except (redis.RedisError, OSError) as e:
+                logger.warning(f"Cache invalidation subscription lost, retrying in {self.retry_after}s: {str(e)}")
+            finally:
+                if self.subscribed:
+                    self._set_subscribed(False)
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except (redis.RedisError, OSError):
+                    pass
+            await asyncio.sleep(self.retry_after)
+
+    def start(self) -> None:
+        """Start listening in a background task on the running loop."""
+        if self.cache.l2 is None or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribed": self.subscribed,
+            "published": self.published,
+            "received": self.received,
+            "evicted": self.evicted,
+        }
+
+
+# Shared invalidation bus instance
+invalidation_bus = InvalidationBus(domain_cache)
+
+
+def invalidate_domains(domains: Iterable[str]) -> None:
+    """
+    Drop cached answers for `domains` from both tiers and from every worker's L1.
+
+    For changes detected without a new cacheable answer, e.g. by the watch
+    monitor's WHOIS lookups.
+    """
+    keys = [domain.lower() for domain in domains]
+    for key in keys:
+        domain_cache.delete(key)
+    invalidation_bus.publish(keys)
@@ -0,0 +1,247 @@
+"""Persistent availability cache tier in a memory-mapped SQLite file.
+
+Entries are stored in the compact binary format of utils/cache_codec.py with
+an absolute wall-clock expiry, so they stay valid across restarts: a worker
+that comes back up reads them straight from the file, which the OS usually
+still has in its page cache, instead of sending its whole working set to
+WHOIS again. Workers on one host may share the file (WAL mode lets readers
+run alongside the writer). Expired rows are ignored when read and deleted by
+a background compaction thread that also keeps the file within its entry
+budget and returns freed pages to the filesystem.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from .cache_codec import CacheCodecError, decode_entry, encode_entry
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL,
+    value BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at);
+"""
+
+# Rows deleted per statement during compaction, so writers are not
+# locked out for long
+COMPACT_BATCH = 5000
+
+
+class DiskCacheTier:
+    """Cache tier persisted in SQLite, with per-entry TTLs and background compaction."""
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: Optional[int] = None,
+        mmap_bytes: Optional[int] = None,
+        compact_interval: Optional[float] = None,
+        retry_after: Optional[float] = None,
+    ):
+        """
+        Initialize the tier; the file is created on first use.
+
+        Args:
+            path: SQLite file, shared by the workers of one host
+            max_entries: Entries kept after compaction, the soonest to expire go first
+            mmap_bytes: Bytes of the file read through a memory map
+            compact_interval: Seconds between background compactions
+            retry_after: Seconds the tier is skipped after a database error
+        """
+        self.path = path
+        self.max_entries = max_entries or settings.CACHE_DISK_MAX_ENTRIES
+        self.mmap_bytes = mmap_bytes if mmap_bytes is not None else settings.CACHE_DISK_MMAP_BYTES
+        self.compact_interval = (
+            compact_interval if compact_interval is not None else settings.CACHE_DISK_COMPACT_INTERVAL
+        )
+        self.retry_after = retry_after if retry_after is not None else settings.CACHE_DISK_RETRY_AFTER
+        # sqlite3 connections may not be shared between threads
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._down_until = 0.0
+        self._compactor: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.compacted = 0
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if time.monotonic() < self._down_until:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Used by this thread only; `close` may close it from another
+        conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+        # Must precede table creation to take effect on a new file
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_bytes)}")
+        conn.executescript(SCHEMA)
+        self._local.conn = conn
+        with self._lock:
+            self._connections.append(conn)
+        self._start_compactor()
+        return conn
+
+    def _failed(self, operation: str, error: Exception) -> None:
+        self.errors += 1
+        self._down_until = time.monotonic() + self.retry_after
+        logger.warning(f"Disk cache {operation} failed, skipping it for {self.retry_after}s: {str(error)}")
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, seconds to live) for `key`, or None."""
+        try:
+            conn = self._connect()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            self._failed("read", e)
+            return None
+        ttl = row[1] - time.time() if row is not None else 0
+        if ttl <= 0:
+            # Expired rows are left to the compactor
+            self.misses += 1
+            return None
+        try:
+            value = decode_entry(row[0])
+        except CacheCodecError as e:
+            logger.warning(f"Dropping unreadable disk cache entry {key}: {str(e)}")
+            self.delete(key)
+            return None
+        self.hits += 1
+        return value, ttl
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            conn = self._connect()
+            if conn is None:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, time.time() + ttl, encode_entry(value)),
+            )
+        except (sqlite3.Error, OSError) as e:
+            self._failed("write", e)
+
+    def delete(self, key: str) -> None:
+        try:
+            conn = self._connect()
+            if conn is None:
+                return
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        except (sqlite3.Error, OSError) as e:
+            self._failed("delete", e)
+
+    def clear(self) -> None:
+        try:
+            conn = self._connect()
+            if conn is None:
+                return
+            conn.execute("DELETE FROM cache_entries")
+        except (sqlite3.Error, OSError) as e:
+            self._failed("clear", e)
+
+    def compact(self) -> int:
+        """
+        Delete expired rows and trim the file to its entry budget.
+
+        Returns:
+            Number of rows deleted
+        """
+        deleted = 0
+        try:
+            conn = self._connect()
+            if conn is None:
+                return 0
+            while True:
+                cursor = conn.execute(
+                    "DELETE FROM cache_entries WHERE key IN ("
+                    "SELECT key FROM cache_entries WHERE expires_at <= ? LIMIT ?)",
+                    (time.time(), COMPACT_BATCH),
+                )
+                deleted += cursor.rowcount
+                if cursor.rowcount < COMPACT_BATCH:
+                    break
+            (count,) = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+            while count > self.max_entries:
+                cursor = conn.execute(
+                    "DELETE FROM cache_entries WHERE key IN ("
+                    "SELECT key FROM cache_entries ORDER BY expires_at LIMIT ?)",
+                    (min(COMPACT_BATCH, count - self.max_entries),),
+                )
+                if not cursor.rowcount:
+                    break
+                deleted += cursor.rowcount
+                count -= cursor.rowcount
+            if deleted:
+                conn.execute("PRAGMA incremental_vacuum")
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except (sqlite3.Error, OSError) as e:
+            self._failed("compaction", e)
+        self.compacted += deleted
+        return deleted
+
+    def _compact_loop(self) -> None:
+        while not self._stopping.wait(self.compact_interval):
+            deleted = self.compact()
+            if deleted:
+                logger.info(f"Disk cache compaction removed {deleted} entries")
+
+    def _start_compactor(self) -> None:
+        with self._lock:
+            if self._compactor is not None or not self.compact_interval:
+                return
+            self._compactor = threading.Thread(
+                target=self._compact_loop, name="disk-cache-compactor", daemon=True
+            )
+            self._compactor.start()
+
+    def close(self) -> None:
+        """Stop compaction and close every thread's connection."""
+        self._stopping.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, Any]:
+        entries = None
+        try:
+            conn = self._connect()
+            if conn is not None:
+                (entries,) = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+        except (sqlite3.Error, OSError) as e:
+            self._failed("stats", e)
+        return {
+            "path": self.path,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "compacted": self.compacted,
+            "available": time.monotonic() >= self._down_until,
+        }
@@ -1,34 +1,55 @@
 """
-Domain availability checker using python-whois with caching.
+Domain availability checker with caching.
+
+The async path uses the native asyncio WHOIS client; the sync path is kept
+for callers that cannot await and still goes through python-whois. Both
+read through memory, Redis and the `domains` table before the network, and
+serve stale cache entries within a grace period while the entry is
+refreshed in the background, see utils/revalidation.py.
 """
+import asyncio
 import re
 import whois
 import socket
 import logging
+import time
 from typing import Dict, Any, Optional, Tuple, List
 from datetime import datetime, timedelta
 
-from .cache import get_cached_domain, cache_domain
+from whois.parser import PywhoisError
+
+from .cache import cache_domain, get_cached_domain, get_cached_domain_async
+from .cache_invalidation import invalidation_bus
+from .revalidation import Freshness, revalidator
+from .single_flight import SingleFlight
+from .ttl_policy import ttl_policies
+from .whois_classifier import whois_classifier
+from ..core.config import settings
+from ..services.dns_precheck import DnsVerdict, dns_precheck
+from ..services.domain_store import domain_store
+from ..services.lookup_resilience import LookupUnavailable, lookup_guard
+from ..services.rdap_service import RDAPLookupError, rdap_service
+from ..services.whois_client import whois_client
+from ..services.whois_parser import parse_response_async
+from ..services.zone_filter import ZoneVerdict, zone_filters
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Concurrent misses for the same domain share one lookup, sync or async
+availability_flight = SingleFlight("availability")
 
-def is_domain_available(domain: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+
+def normalize_domain(domain: str) -> Optional[str]:
     """
-    Check if a domain is available by querying WHOIS information with caching.
+    Normalize a user-supplied domain and validate its format.
     
-    Args:
-        domain: The domain name to check (e.g., 'example.com')
-        
     Returns:
-        Tuple of (is_available, whois_data)
-        - is_available: Boolean indicating if the domain is available
-        - whois_data: Dictionary containing WHOIS information if domain is registered
+        The normalized domain, or None if it is not a valid domain name
     """
-    if not domain:
-        return False, None
+    if not domain or not isinstance(domain, str):
+        return None
     
     # Normalize domain (remove www. and convert to lowercase)
     domain = domain.lower().strip()
@@ -37,23 +58,266 @@ def is_domain_available(domain: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
     # Validate domain format
     if not re.match(r'^([a-z0-9]+(-[a-z0-9]+)*\.)+[a-z]{2,}$', domain):
         logger.warning(f"Invalid domain format: {domain}")
+        return None
+    return domain
+
+
+def _classify_whois_data(
+    whois_data: Dict[str, Any], domain: Optional[str] = None
+) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Decide availability from parsed WHOIS data.
+    
+    Args:
+        whois_data: Parsed WHOIS fields for the domain
+        domain: Domain looked up, selects TLD-specific rules
+        
+    Returns:
+        Tuple of (is_available, whois_data)
+    """
+    return whois_classifier.availability(domain, whois_data)
+
+
+def cache_availability(
+    domain: str,
+    result: Tuple[bool, Optional[Dict[str, Any]]],
+    lookup_time: float = 0.0,
+    checked_at: Optional[datetime] = None
+) -> bool:
+    """
+    Cache an availability result with a TTL from the domain's TLD policy.
+    
+    The entry stays fresh for the TTL and is kept for a grace period after
+    that, during which it is served stale while being refreshed. When the
+    answer differs from the cached one, other workers are told to evict
+    their in-process copies. Answers from the network are also queued for
+    writing back to the `domains` table.
+    
+    Args:
+        domain: Normalized domain name
+        result: Tuple of (is_available, whois_data)
+        lookup_time: Seconds the lookup took, weighs early refreshes
+        checked_at: UTC time of the lookup if it was made earlier, e.g. for
+            answers loaded from the database; the TTL runs from then
+        
+    Returns:
+        False if the answer was too old to cache
+    """
+    # Minutes for domains pending deletion, up to days far from expiry
+    ttl = ttl_policies.ttl_for(domain, result[0], result[1])
+    # Short-lived answers are not served stale for longer than they were fresh
+    grace = min(settings.CACHE_STALE_GRACE, ttl)
+    if checked_at is not None:
+        ttl -= (datetime.utcnow() - checked_at).total_seconds()
+        if ttl + grace <= 0:
+            return False
+    previous = get_cached_domain(domain)
+    
+    cache_domain(
+        domain, 
+        {
+            'is_available': result[0],
+            'whois_data': result[1],
+            'expires_at': datetime.now() + timedelta(seconds=ttl),
+            'lookup_time': lookup_time
+        },
+        ttl=ttl + grace
+    )
+    if previous is not None and previous.get('is_available') != result[0]:
+        logger.info(f"Availability of {domain} changed, invalidating other workers' copies")
+        invalidation_bus.publish([domain])
+    if checked_at is None and settings.CACHE_DB_TIER_ENABLED:
+        domain_store.enqueue(domain, result)
+    return True
+
+
+async def cache_availability_async(
+    domain: str,
+    result: Tuple[bool, Optional[Dict[str, Any]]],
+    lookup_time: float = 0.0,
+    checked_at: Optional[datetime] = None
+) -> bool:
+    """`cache_availability` with the Redis and disk writes in a worker thread."""
+    return await asyncio.to_thread(cache_availability, domain, result, lookup_time, checked_at)
+
+
+def cached_availability(
+    domain: str
+) -> Optional[Tuple[Tuple[bool, Optional[Dict[str, Any]]], Freshness]]:
+    """
+    Look a normalized domain up in the cache, refreshing the entry when due.
+    
+    Stale entries are returned while one background lookup replaces them,
+    and fresh ones are sometimes refreshed early as their deadline nears.
+    Refreshes run as asyncio tasks when called from an event loop, in the
+    refresh thread pool otherwise.
+    
+    Args:
+        domain: Normalized domain name
+        
+    Returns:
+        Tuple of ((is_available, whois_data), freshness), or None on a miss
+    """
+    return _serve_cached(domain, get_cached_domain(domain))
+
+
+async def cached_availability_async(
+    domain: str
+) -> Optional[Tuple[Tuple[bool, Optional[Dict[str, Any]]], Freshness]]:
+    """`cached_availability` that reads Redis and disk without blocking the loop."""
+    return _serve_cached(domain, await get_cached_domain_async(domain))
+
+
+def _serve_cached(
+    domain: str, cached: Optional[Dict[str, Any]]
+) -> Optional[Tuple[Tuple[bool, Optional[Dict[str, Any]]], Freshness]]:
+    """Classify a cache entry's freshness, scheduling a refresh when due."""
+    if cached is None:
+        return None
+    
+    freshness = revalidator.freshness(cached)
+    if revalidator.refresh_due(cached, freshness):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            revalidator.refresh_sync(
+                domain, lambda: availability_flight.do(domain, lambda: _lookup_availability(domain))
+            )
+        else:
+            revalidator.refresh_async(
+                domain,
+                lambda: availability_flight.do_async(domain, lambda: _lookup_availability_async(domain)),
+            )
+    return (cached['is_available'], cached.get('whois_data')), freshness
+
+
+def _promote_stored(
+    domain: str, stored: Optional[Tuple[Tuple[bool, Optional[Dict[str, Any]]], datetime]]
+) -> Optional[Tuple[Tuple[bool, Optional[Dict[str, Any]]], Freshness]]:
+    """Cache a stored answer that is still within its TTL plus grace, and serve it."""
+    if stored is None:
+        return None
+    result, checked_at = stored
+    if not cache_availability(domain, result, checked_at=checked_at):
+        return None
+    return cached_availability(domain)
+
+
+def stored_availability(
+    domain: str
+) -> Optional[Tuple[Tuple[bool, Optional[Dict[str, Any]]], Freshness]]:
+    """
+    Answer a normalized domain from its `domains` row, caching the answer.
+    
+    Rows older than their TTL plus the stale grace period are ignored; rows
+    within the grace period are served stale and refreshed, as cache entries
+    are. Blocks on the database; async code uses `stored_availability_async`.
+    
+    Args:
+        domain: Normalized domain name
+        
+    Returns:
+        Tuple of ((is_available, whois_data), freshness), or None
+    """
+    if not settings.CACHE_DB_TIER_ENABLED:
+        return None
+    return _promote_stored(domain, domain_store.lookup(domain))
+
+
+async def stored_availability_async(
+    domain: str
+) -> Optional[Tuple[Tuple[bool, Optional[Dict[str, Any]]], Freshness]]:
+    """`stored_availability` with the database read and cache write in worker threads."""
+    if not settings.CACHE_DB_TIER_ENABLED:
+        return None
+    stored = await asyncio.to_thread(domain_store.lookup, domain)
+    if stored is None:
+        return None
+    result, checked_at = stored
+    if not await cache_availability_async(domain, result, checked_at=checked_at):
+        return None
+    return await cached_availability_async(domain)
+
+
+def zone_filter_answer(domain: str) -> Tuple[ZoneVerdict, Optional[Tuple[bool, Optional[Dict[str, Any]]]]]:
+    """
+    Consult the zone file Bloom filter for a normalized domain.
+    
+    Returns:
+        Tuple of (verdict, result) where result is the availability answer
+        when the filter alone decides it, otherwise None
+    """
+    if not settings.ZONE_FILTER_ENABLED:
+        return ZoneVerdict.NO_FILTER, None
+    verdict = zone_filters.check(domain)
+    if verdict == ZoneVerdict.IN_ZONE:
+        return verdict, (False, None)
+    if verdict == ZoneVerdict.NOT_IN_ZONE and settings.ZONE_FILTER_TRUST_ABSENCE:
+        return verdict, (True, None)
+    return verdict, None
+
+
+def is_domain_available(domain: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Check if a domain is available by querying WHOIS information with caching.
+    
+    This blocks the calling thread; async code should use
+    `is_domain_available_async` instead.
+    
+    Args:
+        domain: The domain name to check (e.g., 'example.com')
+        
+    Returns:
+        Tuple of (is_available, whois_data)
+        - is_available: Boolean indicating if the domain is available
+        - whois_data: Dictionary containing WHOIS information if domain is registered
+        
+    Raises:
+        LookupUnavailable: If the WHOIS lookup failed; availability is unknown
+    """
+    domain = normalize_domain(domain)
+    if domain is None:
         return False, None
     
     # Check cache first
-    cached = get_cached_domain(domain)
+    cached = cached_availability(domain)
     if cached is not None:
-        logger.debug(f"Cache hit for domain: {domain}")
-        return cached['is_available'], cached.get('whois_data')
+        logger.debug(f"Cache hit for domain: {domain} ({cached[1].value})")
+        return cached[0]
+    
+    verdict, result = zone_filter_answer(domain)
+    if result is not None:
+        return result
+    
+    stored = stored_availability(domain)
+    if stored is not None:
+        logger.debug(f"Database hit for domain: {domain} ({stored[1].value})")
+        return stored[0]
     
     logger.info(f"Cache miss for domain: {domain}, performing WHOIS lookup")
+    return availability_flight.do(
+        domain, lambda: _lookup_availability(domain, verdict == ZoneVerdict.NOT_IN_ZONE)
+    )
+
+
+def _lookup_availability(domain: str, skip_dns: bool = False) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """Blocking DNS + WHOIS lookup behind `is_domain_available`, caches the result."""
+    started = time.monotonic()
+    # First, try a DNS lookup as it's faster than WHOIS; skipped when the
+    # zone filter already says the name is not delegated
+    resolves = False
+    if not skip_dns:
+        try:
+            # Try to resolve the domain
+            socket.gethostbyname(domain)
+            resolves = True
+        except (socket.gaierror, socket.herror):
+            pass
     
-    # First, try a DNS lookup as it's faster than WHOIS
-    try:
-        # Try to resolve the domain
-        socket.gethostbyname(domain)
+    if resolves:
         # If we get here, the domain exists and is registered
         result = (False, None)
-    except (socket.gaierror, socket.herror):
+    else:
         # Domain doesn't resolve, proceed with WHOIS check
         try:
             # Set a timeout for the WHOIS lookup
@@ -71,70 +335,184 @@ def is_domain_available(domain: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
             
             # Convert WHOIS data to dict if it's not already
             whois_data = dict(w) if w and not isinstance(w, dict) else (w or {})
-            
-            # Check if we got any meaningful data
             if not whois_data:
                 logger.warning(f"No WHOIS data received for {domain}, assuming available")
-                result = (True, None)
-            else:
-                # Check for common availability indicators in the response
-                whois_str = str(whois_data).lower()
-                availability_indicators = [
-                    "no match", "no data found", "not found", 
-                    "no entries found", "no object found",
-                    "no such domain", "domain not found"
-                ]
-                
-                if any(indicator in whois_str for indicator in availability_indicators):
-                    result = (True, whois_data)
-                else:
-                    # Check if we have a domain name in the response
-                    if whois_data.get('domain_name'):
-                        # Check if domain is expired
-                        exp_date = whois_data.get('expiration_date')
-                        if exp_date:
-                            if isinstance(exp_date, list):
-                                exp_date = exp_date[0] if exp_date else None
-                            if exp_date and isinstance(exp_date, datetime) and exp_date < datetime.now():
-                                result = (True, whois_data)
-                                return result  # Early return for expired domains
-                        
-                        # If we have name servers, domain is likely registered
-                        if whois_data.get('name_servers'):
-                            result = (False, whois_data)
-                        else:
-                            # If we have a creation date but no name servers, still consider it registered
-                            if whois_data.get('creation_date'):
-                                result = (False, whois_data)
-                            else:
-                                # If we can't determine, assume available
-                                result = (True, whois_data)
-                    else:
-                        # No domain name in response, assume available
-                        result = (True, whois_data)
+            result = _classify_whois_data(whois_data, domain)
                         
-        except (whois.parser.PywhoisError, socket.timeout, Exception) as e:
+        except whois.parser.PywhoisError:
+            # python-whois raises when the text is a "no match" answer
+            result = (True, None)
+        except Exception as e:
             logger.warning(f"WHOIS lookup failed for {domain}: {str(e)}")
-            # If we can't get WHOIS info, be conservative and assume registered
-            result = (False, None)
+            # A failed lookup says nothing about the domain; don't cache a guess
+            raise LookupUnavailable(f"WHOIS lookup failed for {domain}: {str(e)}") from e
     
-    # Cache the result with a TTL based on the result
-    # Shorter TTL for available domains to catch new registrations faster
-    ttl_hours = 1 if result[0] else 24  # 1 hour for available, 24 hours for registered
+    cache_availability(domain, result, time.monotonic() - started)
+    return result
+
+
+async def whois_availability(domain: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Decide availability of a normalized domain from a WHOIS lookup alone.
     
-    cache_domain(
-        domain, 
-        {
-            'is_available': result[0],
-            'whois_data': result[1],
-            'expires_at': datetime.now() + timedelta(hours=ttl_hours)
-        },
-        ttl=ttl_hours * 3600  # Convert hours to seconds
+    No caching or DNS pre-check is done here; callers such as the bulk
+    checker wrap it with their own concurrency limits. The lookup runs under
+    the WHOIS server's circuit breaker and, when it is slow or the breaker is
+    open, is hedged with RDAP and DNS.
+    
+    Args:
+        domain: Normalized domain name
+        
+    Returns:
+        Tuple of (is_available, whois_data)
+        
+    Raises:
+        LookupUnavailable: If no source answered before the request deadline;
+            availability is then unknown, not "registered"
+    """
+    secondary = (lambda: _secondary_availability(domain)) if settings.WHOIS_HEDGE_ENABLED else None
+    return await lookup_guard.call(
+        whois_client.route(domain) or domain.rsplit('.', 1)[-1],
+        lambda: _whois_lookup(domain),
+        secondary,
     )
+
+
+async def _whois_lookup(domain: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """Query WHOIS and classify the answer; raises WhoisLookupError on failure."""
+    raw = await whois_client.lookup(domain)
+    if whois_classifier.raw_says_available(domain, raw):
+        return True, None
+    try:
+        return _classify_whois_data(await parse_response_async(domain, raw), domain)
+    except PywhoisError:
+        # python-whois raises when the text is a "no match" answer
+        return True, None
+
+
+async def _secondary_availability(domain: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Answer from RDAP, or from DNS when the domain is delegated.
+    
+    Raises:
+        LookupUnavailable: If neither source is conclusive; an undelegated
+            name may still be registered
+    """
+    try:
+        return await rdap_service.availability(domain)
+    except RDAPLookupError as e:
+        logger.debug(f"RDAP could not answer for {domain}: {str(e)}")
+    if settings.DNS_PRECHECK_ENABLED and await dns_precheck.check(domain) == DnsVerdict.DELEGATED:
+        return False, None
+    raise LookupUnavailable(f"Neither RDAP nor DNS could answer for {domain}")
+
+
+async def is_domain_available_async(domain: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Check if a domain is available without blocking the event loop.
     
+    See `check_availability_async`, which also says how fresh the answer is.
+    
+    Args:
+        domain: The domain name to check (e.g., 'example.com')
+        
+    Returns:
+        Tuple of (is_available, whois_data)
+        
+    Raises:
+        LookupUnavailable: If no source answered in time; nothing is cached
+    """
+    is_available, whois_data, _ = await check_availability_async(domain)
+    return is_available, whois_data
+
+
+async def check_availability_async(
+    domain: str
+) -> Tuple[bool, Optional[Dict[str, Any]], Freshness]:
+    """
+    Check if a domain is available without blocking the event loop.
+    
+    Domains delegated in their TLD zone are answered by the zone file filter
+    or the DNS pre-check; the rest go to the asyncio WHOIS client, so many lookups can be in flight
+    in one worker. Shares the cache and classification rules with
+    `is_domain_available`. Cached answers past their freshness deadline are
+    returned as STALE while a background lookup replaces them.
+    
+    Args:
+        domain: The domain name to check (e.g., 'example.com')
+        
+    Returns:
+        Tuple of (is_available, whois_data, freshness)
+        
+    Raises:
+        LookupUnavailable: If no source answered in time; nothing is cached
+    """
+    domain = normalize_domain(domain)
+    if domain is None:
+        return False, None, Freshness.LIVE
+    
+    cached = await cached_availability_async(domain)
+    if cached is not None:
+        logger.debug(f"Cache hit for domain: {domain} ({cached[1].value})")
+        return (*cached[0], cached[1])
+    
+    verdict, result = zone_filter_answer(domain)
+    if result is not None:
+        return (*result, Freshness.LIVE)
+    
+    stored = await stored_availability_async(domain)
+    if stored is not None:
+        logger.debug(f"Database hit for domain: {domain} ({stored[1].value})")
+        return (*stored[0], stored[1])
+    
+    logger.info(f"Cache miss for domain: {domain}, performing WHOIS lookup")
+    result = await availability_flight.do_async(
+        domain, lambda: _lookup_availability_async(domain, verdict == ZoneVerdict.NOT_IN_ZONE)
+    )
+    return (*result, Freshness.LIVE)
+
+
+async def _lookup_availability_async(
+    domain: str, skip_dns: bool = False
+) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """DNS pre-check + WHOIS lookup behind `is_domain_available_async`, caches the result."""
+    started = time.monotonic()
+    if (
+        settings.DNS_PRECHECK_ENABLED
+        and not skip_dns
+        and await dns_precheck.check(domain) == DnsVerdict.DELEGATED
+    ):
+        # Delegated in the TLD zone, so registered; no need to ask WHOIS
+        result = (False, None)
+    else:
+        result = await whois_availability(domain)
+    
+    await cache_availability_async(domain, result, time.monotonic() - started)
     return result
 
 
+async def refresh_availability_async(domain: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Look a domain up bypassing the cache, and cache the new answer.
+    
+    For callers that must see the current state, such as watch checks; a
+    changed answer is propagated to the other workers by `cache_availability`.
+    
+    Args:
+        domain: The domain name to check (e.g., 'example.com')
+        
+    Returns:
+        Tuple of (is_available, whois_data)
+        
+    Raises:
+        LookupUnavailable: If no source answered in time; nothing is cached
+    """
+    domain = normalize_domain(domain)
+    if domain is None:
+        return False, None
+    return await availability_flight.do_async(domain, lambda: _lookup_availability_async(domain))
+
+
 def get_domain_pricing(domain: str) -> Dict[str, Any]:
     """
     Get pricing information for a domain with caching.
@@ -0,0 +1,186 @@
+"""Stale-while-revalidate and probabilistic early refresh of cached lookups.
+
+Availability entries outlive their freshness deadline (`expires_at`) in the
+cache by a grace period. Within it they are served as stale while a single
+background lookup replaces them, so a popular domain whose entry just
+expired does not send every concurrent request to WHOIS. Before the
+deadline, reads refresh an entry early with a probability that grows as the
+deadline nears and with how long the lookup took (XFetch, Vattani et al.),
+so hot entries are usually replaced before they ever go stale.
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import math
+import random
+import threading
+import time
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from ..core.config import settings
+from ..services.lookup_resilience import lookup_deadline
+from ..services.outbound_scheduler import traffic_source
+
+logger = logging.getLogger(__name__)
+
+
+class Freshness(str, Enum):
+    """How current an availability answer is."""
+    LIVE = "live"  # Looked up for this request
+    FRESH = "fresh"  # From the cache, before its freshness deadline
+    STALE = "stale"  # From the cache past its deadline, a refresh is under way
+
+
+def xfetch_due(expires_at: float, lookup_time: float, beta: float, now: float, rand: float) -> bool:
+    """
+    XFetch test: refresh when now - lookup_time * beta * ln(rand) >= expires_at.
+
+    Args:
+        expires_at: Freshness deadline as a Unix timestamp
+        lookup_time: Seconds the last lookup took
+        beta: Values above 1 favour earlier refreshes
+        now: Current Unix timestamp
+        rand: Uniform sample in (0, 1]
+    """
+    return now - lookup_time * beta * math.log(rand) >= expires_at
+
+
+class Revalidator:
+    """Decides when cached entries are refreshed and runs one refresh per key."""
+
+    def __init__(
+        self,
+        beta: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+        rand: Callable[[], float] = random.random,
+    ):
+        """
+        Initialize the revalidator.
+
+        Args:
+            beta: XFetch beta, 0 disables early refreshes
+            max_workers: Threads running refreshes for blocking callers
+            clock: Wall-clock time source, replaceable in tests
+            rand: Uniform random source, replaceable in tests
+        """
+        self.beta = beta if beta is not None else settings.CACHE_XFETCH_BETA
+        self.max_workers = max_workers or settings.CACHE_REFRESH_WORKERS
+        self.clock = clock
+        self.rand = rand
+        self._lock = threading.Lock()
+        self._refreshing: Set[str] = set()
+        # Strong references, the event loop only keeps weak ones
+        self._tasks: Set[asyncio.Task] = set()
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self.stale_served = 0
+        self.early_refreshes = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    def freshness(self, entry: Dict[str, Any]) -> Freshness:
+        """FRESH or STALE for a cache entry; entries without a deadline are fresh."""
+        expires_at = entry.get("expires_at")
+        if expires_at is None or self.clock() < expires_at.timestamp():
+            return Freshness.FRESH
+        return Freshness.STALE
+
+    def refresh_due(self, entry: Dict[str, Any], freshness: Freshness) -> bool:
+        """Whether this read should refresh the entry."""
+        if freshness == Freshness.STALE:
+            self.stale_served += 1
+            return True
+        expires_at = entry.get("expires_at")
+        if expires_at is None or not self.beta:
+            return False
+        # 1 - random() lies in (0, 1], keeping the logarithm finite
+        due = xfetch_due(
+            expires_at.timestamp(), entry.get("lookup_time") or 0.0, self.beta, self.clock(), 1.0 - self.rand()
+        )
+        if due:
+            self.early_refreshes += 1
+        return due
+
+    def _claim(self, key: str) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+            return True
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def refresh_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Refresh `key` in a background task on the running loop.
+
+        The task does not inherit the request's context: it gets its own
+        lookup deadline and queues as refresh traffic.
+
+        Returns:
+            False if a refresh of `key` is already running
+        """
+        if not self._claim(key):
+            return False
+
+        async def run() -> None:
+            try:
+                with traffic_source("refresh"), lookup_deadline(settings.LOOKUP_DEADLINE):
+                    await fn()
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Background refresh of {key} failed: {str(e)}")
+            finally:
+                self._release(key)
+
+        task = asyncio.get_running_loop().create_task(run(), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    def refresh_sync(self, key: str, fn: Callable[[], Any]) -> bool:
+        """
+        Refresh `key` with a blocking call in the refresh thread pool.
+
+        Returns:
+            False if a refresh of `key` is already running
+        """
+        if not self._claim(key):
+            return False
+
+        def run() -> None:
+            try:
+                fn()
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Background refresh of {key} failed: {str(e)}")
+            finally:
+                self._release(key)
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="cache-refresh"
+                )
+        self._executor.submit(run)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            in_flight = len(self._refreshing)
+        return {
+            "stale_served": self.stale_served,
+            "early_refreshes": self.early_refreshes,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "in_flight": in_flight,
+        }
+
+
+# Shared revalidator instance
+revalidator = Revalidator()
@@ -0,0 +1,129 @@
+"""Single-flight coalescing of concurrent lookups for the same key."""
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs at most one lookup per key at a time.
+
+    The first caller for a key performs the work; callers arriving while it
+    is in flight wait for the same result (or exception) instead of starting
+    their own. In-flight calls are tracked with thread-safe futures, so sync
+    callers in worker threads and async callers on any event loop can share
+    one flight.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize the group.
+
+        Args:
+            name: Label used in logs and stats
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._flights: Dict[str, concurrent.futures.Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def _join(self, key: str):
+        """Return (future, is_leader) for a key, registering a new flight if needed."""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+                logger.debug(f"Coalesced {self.name} lookup for {key}")
+                return future, False
+            future = concurrent.futures.Future()
+            self._flights[key] = future
+            self.executed += 1
+            return future, True
+
+    def _land(self, key: str, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """
+        Run a blocking lookup, sharing it with concurrent callers.
+
+        Args:
+            key: Identity of the lookup, e.g. a normalized domain name
+            fn: Performs the lookup when this caller is the first
+
+        Returns:
+            The result of the single lookup for `key`
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            # Blocking on a flight led by this loop would deadlock it
+            return fn()
+
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._land(key, future)
+        future.set_result(result)
+        return result
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run an async lookup, sharing it with concurrent callers.
+
+        The lookup runs in its own task, so a leader that is cancelled (for
+        example by a client disconnect) does not fail the callers waiting on it.
+
+        Args:
+            key: Identity of the lookup, e.g. a normalized domain name
+            fn: Returns the lookup coroutine when this caller is the first
+
+        Returns:
+            The result of the single lookup for `key`
+        """
+        future, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(fn())
+
+            def settle(task: asyncio.Task) -> None:
+                self._land(key, future)
+                if task.cancelled():
+                    future.set_exception(asyncio.CancelledError())
+                elif task.exception() is not None:
+                    future.set_exception(task.exception())
+                else:
+                    future.set_result(task.result())
+
+            task.add_done_callback(settle)
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def in_flight(self) -> int:
+        """Number of lookups currently running."""
+        with self._lock:
+            return len(self._flights)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts of executed and coalesced lookups."""
+        return {
+            "name": self.name,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight(),
+        }
@@ -0,0 +1,134 @@
+"""Cache TTLs for availability results driven by expiry dates and EPP statuses."""
+import re
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from ..core.config import settings
+
+# Everything but letters, so 'pendingDelete https://icann.org/epp#pendingDelete'
+# and RDAP's 'pending delete' both reduce to 'pendingdelete'
+_NON_LETTERS = re.compile(r"[^a-z]+")
+
+
+@dataclass(frozen=True)
+class TtlPolicy:
+    """How long an availability answer stays in the cache, in seconds."""
+    available: int
+    registered: int
+    min_ttl: int
+    max_ttl: int
+    expiry_fraction: float
+    expired: int
+    status_ttls: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_settings(cls) -> "TtlPolicy":
+        return cls(
+            available=settings.CACHE_TTL_AVAILABLE,
+            registered=settings.CACHE_TTL_REGISTERED,
+            min_ttl=settings.CACHE_TTL_MIN,
+            max_ttl=settings.CACHE_TTL_MAX,
+            expiry_fraction=settings.CACHE_TTL_EXPIRY_FRACTION,
+            expired=settings.CACHE_TTL_EXPIRED,
+            status_ttls=dict(settings.CACHE_TTL_EPP_STATUS),
+        )
+
+    def with_overrides(self, overrides: Dict[str, Any]) -> "TtlPolicy":
+        """Copy of the policy with some fields replaced; status TTLs are merged."""
+        overrides = dict(overrides)
+        if "status_ttls" in overrides:
+            overrides["status_ttls"] = {**self.status_ttls, **overrides["status_ttls"]}
+        return replace(self, **overrides)
+
+    def ttl(
+        self,
+        is_available: bool,
+        whois_data: Optional[Dict[str, Any]],
+        now: Optional[datetime] = None,
+    ) -> int:
+        """
+        TTL for one availability answer.
+
+        Args:
+            is_available: Whether the domain was found available
+            whois_data: Parsed WHOIS/RDAP fields, if the answer carried any
+            now: Current time, for tests
+
+        Returns:
+            Seconds the answer may be served from the cache
+        """
+        if is_available:
+            return self.available
+        if not whois_data:
+            return self.registered
+
+        # Domains on their way to deletion are re-checked within minutes
+        status_ttls = [
+            self.status_ttls[status]
+            for status in _normalized_statuses(whois_data.get("status"))
+            if status in self.status_ttls
+        ]
+        if status_ttls:
+            return min(status_ttls)
+
+        expiration_date = _first_datetime(whois_data.get("expiration_date"))
+        if expiration_date is None:
+            return self.registered
+        seconds_left = (expiration_date - (now or datetime.utcnow())).total_seconds()
+        if seconds_left <= 0:
+            return self.expired
+        # Long TTLs far from expiry, never past the expiry date itself
+        ttl = min(self.max_ttl, max(self.min_ttl, seconds_left * self.expiry_fraction))
+        return int(min(ttl, max(seconds_left, self.min_ttl)))
+
+
+def _normalized_statuses(statuses: Any) -> Iterable[str]:
+    if not statuses:
+        return ()
+    if isinstance(statuses, str):
+        statuses = [statuses]
+    # Drop the ICANN URL that follows the status code
+    return (_NON_LETTERS.sub("", str(s).lower().split("http", 1)[0]) for s in statuses)
+
+
+def _first_datetime(value: Any) -> Optional[datetime]:
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return value.replace(tzinfo=None)
+
+
+class TtlPolicies:
+    """The default TTL policy plus per-TLD overrides from settings."""
+
+    def __init__(
+        self,
+        default: Optional[TtlPolicy] = None,
+        tld_overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        self.default = default or TtlPolicy.from_settings()
+        overrides = tld_overrides if tld_overrides is not None else settings.CACHE_TTL_TLD_OVERRIDES
+        self._policies = {
+            tld.lower().lstrip("."): self.default.with_overrides(values)
+            for tld, values in overrides.items()
+        }
+
+    def policy_for(self, domain: str) -> TtlPolicy:
+        return self._policies.get(domain.lower().rsplit(".", 1)[-1], self.default)
+
+    def ttl_for(
+        self, domain: str, is_available: bool, whois_data: Optional[Dict[str, Any]]
+    ) -> int:
+        """TTL in seconds for an availability answer about `domain`."""
+        return self.policy_for(domain).ttl(is_available, whois_data)
+
+
+# Shared policy table
+ttl_policies = TtlPolicies()
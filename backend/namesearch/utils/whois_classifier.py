@@ -0,0 +1,217 @@
+"""Compiled classifier deciding domain availability and status from WHOIS data."""
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Pattern, Tuple
+
+from ..models.domain import DomainStatus
+
+# Only the start of a raw response is scanned; registries put the
+# "no match" line first, while disclaimers further down may contain
+# the same words
+RAW_HEAD_CHARS = 1024
+
+
+@dataclass(frozen=True)
+class TldRules:
+    """Phrases and statuses that decide a WHOIS answer for one TLD."""
+    available_phrases: Tuple[str, ...]
+    registered_statuses: Tuple[str, ...] = ()
+    # Status returned when no available phrase matched, skipping the generic
+    # fallbacks; None to run them
+    otherwise: Optional[DomainStatus] = None
+
+
+DEFAULT_RULES = TldRules(
+    available_phrases=(
+        "no match",
+        "no data found",
+        "not found",
+        "no entries found",
+        "no object found",
+        "no such domain",
+        "domain not found",
+    ),
+    registered_statuses=(
+        "clientdeleteprohibited",
+        "clienttransferprohibited",
+        "clientupdateprohibited",
+        "serverdeleteprohibited",
+        "servertransferprohibited",
+        "serverupdateprohibited",
+        "active",
+        "registered",
+        "ok",
+        "paid-till",
+    ),
+)
+
+# TLDs whose registries answer differently from the common phrases
+TLD_RULES: Dict[str, TldRules] = {
+    # .ng domains return "Not found" when available, anything else is registered
+    "ng": TldRules(available_phrases=("not found",), otherwise=DomainStatus.REGISTERED),
+    # DENIC answers "Status: free" rather than a "not found" message
+    "de": TldRules(
+        available_phrases=DEFAULT_RULES.available_phrases + ("status: free",),
+        registered_statuses=DEFAULT_RULES.registered_statuses + ("connect",),
+    ),
+}
+
+
+def _alternation(phrases: Iterable[str]) -> str:
+    """
+    Regex matching any of the literal phrases, factored as a trie.
+
+    Sharing prefixes ("no match", "no data found", ...) gives the pattern a
+    literal prefix, which lets `re` skip ahead instead of trying every
+    alternative at every position.
+    """
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" in node:
+            body = f"(?:{body})?" if len(branches) > 1 or len(body) > 1 else f"{body}?"
+        return body
+
+    return emit(trie)
+
+
+def _minimal_phrases(phrases: Iterable[str]) -> Tuple[str, ...]:
+    """Drop phrases that contain another phrase; they can never add a match."""
+    phrases = set(phrases)
+    return tuple(sorted(p for p in phrases if not any(o != p and o in p for o in phrases)))
+
+
+@dataclass
+class _CompiledRules:
+    rules: TldRules
+    available: Pattern[str]
+    registered: Optional[Pattern[str]] = field(default=None)
+
+
+class WhoisClassifier:
+    """
+    Classifies WHOIS answers with one precompiled pattern per TLD.
+
+    Every phrase of a rule table is folded into a single regex, so a
+    response is scanned once instead of once per phrase. Patterns are
+    compiled on first use of a TLD and kept for the life of the process.
+    """
+
+    def __init__(self, default: TldRules = DEFAULT_RULES, tld_rules: Optional[Dict[str, TldRules]] = None):
+        self.default = default
+        self.tld_rules = TLD_RULES if tld_rules is None else tld_rules
+        self._compiled: Dict[str, _CompiledRules] = {}
+        self._default_compiled = self._compile(default)
+
+    @staticmethod
+    def _compile(rules: TldRules) -> _CompiledRules:
+        registered = None
+        if rules.registered_statuses:
+            # A status counts when its first word is a known one, e.g.
+            # "clientTransferProhibited https://icann.org/epp#..."
+            registered = re.compile(rf"^(?:{_alternation(rules.registered_statuses)})(?:\s|$)")
+        available = re.compile(_alternation(_minimal_phrases(rules.available_phrases)))
+        return _CompiledRules(rules, available, registered)
+
+    def rules_for(self, domain: Optional[str]) -> _CompiledRules:
+        tld = (domain or "").lower().rsplit(".", 1)[-1]
+        if tld not in self.tld_rules:
+            return self._default_compiled
+        compiled = self._compiled.get(tld)
+        if compiled is None:
+            compiled = self._compile(self.tld_rules[tld])
+            self._compiled[tld] = compiled
+        return compiled
+
+    def raw_says_available(self, domain: str, raw: str) -> bool:
+        """Whether the start of a raw WHOIS response is a "no such domain" answer."""
+        return self.rules_for(domain).available.search(raw[:RAW_HEAD_CHARS].lower()) is not None
+
+    @staticmethod
+    def _expired(whois_data: Dict[str, Any]) -> bool:
+        exp_date = whois_data.get("expiration_date")
+        if isinstance(exp_date, list):
+            exp_date = exp_date[0] if exp_date else None
+        return isinstance(exp_date, datetime) and exp_date < datetime.now()
+
+    def availability(
+        self, domain: Optional[str], whois_data: Dict[str, Any]
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Decide availability from parsed WHOIS data.
+
+        Args:
+            domain: Domain name, selects the TLD rules
+            whois_data: Parsed WHOIS fields for the domain
+
+        Returns:
+            Tuple of (is_available, whois_data)
+        """
+        # Check if we got any meaningful data
+        if not whois_data:
+            return True, None
+
+        compiled = self.rules_for(domain or whois_data.get("domain_name"))
+        if compiled.available.search(str(whois_data).lower()):
+            return True, whois_data
+        if compiled.rules.otherwise is not None:
+            return compiled.rules.otherwise == DomainStatus.AVAILABLE, whois_data
+
+        # No domain name in response, assume available
+        if not whois_data.get("domain_name"):
+            return True, whois_data
+        if self._expired(whois_data):
+            return True, whois_data
+        # Name servers or a creation date mean the domain is registered
+        if whois_data.get("name_servers") or whois_data.get("creation_date"):
+            return False, whois_data
+        # If we can't determine, assume available
+        return True, whois_data
+
+    def domain_status(self, whois_data: Dict[str, Any]) -> DomainStatus:
+        """
+        Determine the DomainStatus from parsed WHOIS data.
+
+        Args:
+            whois_data: Parsed WHOIS fields, keyed as python-whois names them
+        """
+        domain_name = whois_data.get("domain_name", "")
+        if isinstance(domain_name, list):
+            domain_name = domain_name[0] if domain_name else ""
+        if not domain_name:
+            return DomainStatus.UNKNOWN
+
+        compiled = self.rules_for(domain_name)
+        if compiled.available.search(str(whois_data).lower()):
+            return DomainStatus.AVAILABLE
+        if compiled.rules.otherwise is not None:
+            return compiled.rules.otherwise
+
+        statuses = whois_data.get("status", [])
+        if not isinstance(statuses, list):
+            statuses = [statuses] if statuses else []
+        if compiled.registered is not None and any(
+            compiled.registered.match(str(s).lower()) for s in statuses if s
+        ):
+            return DomainStatus.REGISTERED
+
+        if self._expired(whois_data):
+            return DomainStatus.AVAILABLE
+        if whois_data.get("creation_date") or whois_data.get("name_servers"):
+            return DomainStatus.REGISTERED
+        # Default to unknown if we can't determine status
+        return DomainStatus.UNKNOWN
+
+
+# Shared classifier instance
+whois_classifier = WhoisClassifier()
@@ -0,0 +1,67 @@
+"""Benchmark pooled RDAP lookups against a local fake RDAP server.
+
+Compares the pooled keep-alive client used by RDAPService with opening a
+new connection per lookup.
+
+Usage:
+    python -m scripts.benchmark_rdap [lookups] [concurrency]
+"""
+import asyncio
+import sys
+import tempfile
+import time
+
+import httpx
+
+from namesearch.services.rdap_service import RDAPBootstrap, RDAPService
+from tests.fixtures.fake_rdap import FakeRdapServer
+
+
+async def run_pooled(server: FakeRdapServer, lookups: int, concurrency: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        service = RDAPService(RDAPBootstrap(url=server.bootstrap_url, cache_path=f"{tmp}/dns.json"))
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i: int) -> None:
+            async with semaphore:
+                await service.lookup_domain(f"name{i}.com")
+
+        await service.bootstrap.base_url("com")
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(lookups)))
+        elapsed = time.perf_counter() - start
+        await service.close()
+        return elapsed
+
+
+async def run_unpooled(server: FakeRdapServer, lookups: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            async with httpx.AsyncClient(base_url=server.base_url) as client:
+                await client.get(f"domain/name{i}.com")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(lookups)))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    server = FakeRdapServer(registered=[f"name{i}.com" for i in range(0, lookups, 2)]).start()
+    try:
+        for label, runner in (("pooled", run_pooled), ("new connection", run_unpooled)):
+            connections_before = server.connections
+            elapsed = asyncio.run(runner(server, lookups, concurrency))
+            print(
+                f"{label:>15}: {lookups / elapsed:8.0f} lookups/s "
+                f"({server.connections - connections_before} connections)"
+            )
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Benchmark the compiled WHOIS classifier against the previous phrase scans.
+
+Classifies sample registry answers both ways: the old code lowercased
+str(whois_data) and scanned it once per phrase after python-whois had
+parsed the response; the classifier scans with one compiled pattern and
+answers "no match" responses from the raw text without parsing them.
+
+Usage:
+    python -m scripts.benchmark_whois_classifier [iterations]
+"""
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Tuple
+
+from whois.parser import PywhoisError, WhoisEntry
+
+from namesearch.models.domain import DomainStatus
+from namesearch.utils.whois_classifier import whois_classifier
+
+REGISTERED_COM = """   Domain Name: EXAMPLE.COM
+   Registry Domain ID: 2336799_DOMAIN_COM-VRSN
+   Registrar WHOIS Server: whois.iana.org
+   Registrar URL: http://res-dom.iana.org
+   Updated Date: 2024-08-14T07:01:34Z
+   Creation Date: 1995-08-14T04:00:00Z
+   Registry Expiry Date: 2035-08-13T04:00:00Z
+   Registrar: RESERVED-Internet Assigned Numbers Authority
+   Registrar IANA ID: 376
+   Domain Status: clientDeleteProhibited https://icann.org/epp#clientDeleteProhibited
+   Domain Status: clientTransferProhibited https://icann.org/epp#clientTransferProhibited
+   Domain Status: clientUpdateProhibited https://icann.org/epp#clientUpdateProhibited
+   Name Server: A.IANA-SERVERS.NET
+   Name Server: B.IANA-SERVERS.NET
+   DNSSEC: signedDelegation
+>>> Last update of whois database: 2024-09-01T12:00:00Z <<<
+"""
+
+AVAILABLE_COM = """No match for "FREENAME123.COM".
+>>> Last update of whois database: 2024-09-01T12:00:00Z <<<
+"""
+
+SAMPLES = [
+    ("example.com", REGISTERED_COM),
+    ("freename123.com", AVAILABLE_COM),
+]
+
+AVAILABILITY_INDICATORS = [
+    "no match", "no data found", "not found", "no entries found",
+    "no object found", "no such domain", "domain not found",
+]
+REGISTERED_INDICATORS = [
+    "clientdeleteprohibited", "clienttransferprohibited", "clientupdateprohibited",
+    "serverdeleteprohibited", "servertransferprohibited", "serverupdateprohibited",
+    "active", "registered", "ok", "paid-till",
+]
+
+
+def legacy_status(whois_data: Dict[str, Any]) -> DomainStatus:
+    """WHOISService._determine_domain_status as it was before the classifier."""
+    domain_name = whois_data.get("domain_name", "").lower()
+    if not domain_name:
+        return DomainStatus.UNKNOWN
+    statuses = whois_data.get("status", [])
+    if not isinstance(statuses, list):
+        statuses = [statuses] if statuses else []
+    status_lower = [str(s).lower() for s in statuses if s]
+    whois_str = str(whois_data).lower()
+    if domain_name.endswith(".ng"):
+        return DomainStatus.AVAILABLE if "not found" in whois_str else DomainStatus.REGISTERED
+    if any(indicator in whois_str for indicator in AVAILABILITY_INDICATORS):
+        return DomainStatus.AVAILABLE
+    if any(indicator in status_lower for indicator in REGISTERED_INDICATORS):
+        return DomainStatus.REGISTERED
+    exp_date = whois_data.get("expiration_date")
+    if isinstance(exp_date, list):
+        exp_date = exp_date[0] if exp_date else None
+    if exp_date and isinstance(exp_date, datetime) and exp_date < datetime.now():
+        return DomainStatus.AVAILABLE
+    if whois_data.get("creation_date") or whois_data.get("name_servers"):
+        return DomainStatus.REGISTERED
+    return DomainStatus.UNKNOWN
+
+
+def legacy_classify(domain: str, raw: str) -> DomainStatus:
+    try:
+        return legacy_status(WhoisEntry.load(domain, raw))
+    except PywhoisError:
+        return DomainStatus.AVAILABLE
+
+
+def compiled_classify(domain: str, raw: str) -> DomainStatus:
+    if whois_classifier.raw_says_available(domain, raw):
+        return DomainStatus.AVAILABLE
+    try:
+        return whois_classifier.domain_status(WhoisEntry.load(domain, raw))
+    except PywhoisError:
+        return DomainStatus.AVAILABLE
+
+
+def parsed_only(classify: Callable[[Dict[str, Any]], DomainStatus]) -> Callable[[str, str], DomainStatus]:
+    """Time only the classification of an already parsed response."""
+    parsed = {domain: dict(WhoisEntry.load(domain, raw)) for domain, raw in SAMPLES[:1]}
+    return lambda domain, raw: classify(parsed[domain])
+
+
+def run(classify: Callable[[str, str], DomainStatus], samples, iterations: int) -> Tuple[float, list]:
+    results = [classify(domain, raw) for domain, raw in samples]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for domain, raw in samples:
+            classify(domain, raw)
+    return (time.perf_counter() - start) / (iterations * len(samples)) * 1e6, results
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cases = [
+        ("end to end, raw response", SAMPLES, legacy_classify, compiled_classify),
+        ("classification of parsed data", SAMPLES[:1],
+         parsed_only(legacy_status), parsed_only(whois_classifier.domain_status)),
+    ]
+    for name, samples, legacy, compiled in cases:
+        legacy_us, legacy_results = run(legacy, samples, iterations)
+        compiled_us, compiled_results = run(compiled, samples, iterations)
+        assert legacy_results == compiled_results, (legacy_results, compiled_results)
+        print(f"{name}:")
+        print(f"  previous code: {legacy_us:8.1f} us per response")
+        print(f"  classifier:    {compiled_us:8.1f} us per response ({legacy_us / compiled_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
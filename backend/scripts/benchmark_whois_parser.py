@@ -0,0 +1,39 @@
+"""Benchmark the streaming WHOIS parser against python-whois.
+
+Usage:
+    python -m scripts.benchmark_whois_parser [iterations]
+"""
+import sys
+import time
+
+from whois.parser import WhoisEntry
+
+from namesearch.services.whois_parser import parse_whois
+from scripts.benchmark_whois_classifier import REGISTERED_COM
+
+# Registry answers end with a long legal notice that python-whois still scans
+NOTICE = "\n".join(
+    "NOTICE: The expiration date displayed in this record is the date the registrar's "
+    "sponsorship of the domain name registration in the registry is currently set to expire."
+    for _ in range(30)
+)
+RESPONSE = REGISTERED_COM + NOTICE
+
+
+def timed(parse, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        parse("example.com", RESPONSE)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    legacy_us = timed(WhoisEntry.load, iterations)
+    streaming_us = timed(parse_whois, iterations)
+    print(f"python-whois:     {legacy_us:8.1f} us per response")
+    print(f"streaming parser: {streaming_us:8.1f} us per response ({legacy_us / streaming_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Rebuild the TLD -> WHOIS server routing table from IANA root zone data.
+
+Fetches the list of TLDs from IANA, asks whois.iana.org for the WHOIS
+server of each and writes namesearch/resources/whois_servers.json (or the given
+path). TLDs without a WHOIS server are left out and keep going through IANA.
+
+Usage:
+    python -m scripts.build_whois_routes [output path] [concurrency]
+"""
+import asyncio
+import datetime
+import json
+import re
+import sys
+
+import httpx
+
+from namesearch.services.outbound_scheduler import OutboundScheduler
+from namesearch.services.whois_client import (
+    IANA_WHOIS_SERVER, WHOIS_ROUTES_PATH, AsyncWhoisClient, WhoisLookupError
+)
+
+TLD_LIST_URL = "https://data.iana.org/TLD/tlds-alpha-by-domain.txt"
+WHOIS_LINE = re.compile(r"^whois:[ \t]*(\S+)", re.IGNORECASE | re.MULTILINE)
+
+
+async def fetch_tlds() -> list:
+    async with httpx.AsyncClient(timeout=30) as client:
+        response = await client.get(TLD_LIST_URL)
+        response.raise_for_status()
+    return [
+        line.strip().lower()
+        for line in response.text.splitlines()
+        if line.strip() and not line.startswith("#")
+    ]
+
+
+async def build(concurrency: int) -> dict:
+    # IANA is queried for every TLD, so keep well within its limits
+    client = AsyncWhoisClient(scheduler=OutboundScheduler(default_rate=concurrency, default_burst=concurrency))
+    semaphore = asyncio.Semaphore(concurrency)
+    servers = {}
+
+    async def one(tld: str) -> None:
+        async with semaphore:
+            try:
+                text = await client.query_server(IANA_WHOIS_SERVER, tld)
+            except WhoisLookupError as e:
+                print(f"  .{tld}: {e}", file=sys.stderr)
+                return
+        match = WHOIS_LINE.search(text)
+        if match:
+            servers[tld] = match.group(1).strip(".").lower()
+
+    tlds = await fetch_tlds()
+    await asyncio.gather(*(one(tld) for tld in tlds))
+    print(f"{len(servers)} of {len(tlds)} TLDs have a WHOIS server")
+    return dict(sorted(servers.items()))
+
+
+def main() -> None:
+    out_path = sys.argv[1] if len(sys.argv) > 1 else WHOIS_ROUTES_PATH
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    servers = asyncio.run(build(concurrency))
+    data = {
+        "source": "https://www.iana.org/domains/root/db",
+        "generated": datetime.date.today().isoformat(),
+        "servers": servers,
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Build the Bloom filter of registered domains for a TLD from its zone file.
+
+The filter is written to ZONE_FILTER_DIR/<tld>.bloom, where running workers
+pick it up within ZONE_FILTER_RELOAD_INTERVAL seconds. Gzipped zone files
+(as downloaded from ICANN CZDS) are read directly.
+
+Usage:
+    python -m scripts.build_zone_filter <zone file> <tld> [expected names]
+"""
+import gzip
+import logging
+import sys
+import time
+
+from namesearch.core.config import settings
+from namesearch.services.zone_filter import ZoneFilterStore, build_zone_filter
+
+
+def main() -> None:
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO)
+    zone_path, tld = sys.argv[1], sys.argv[2].lower().strip(".")
+    expected = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    opener = gzip.open if zone_path.endswith(".gz") else open
+    out_path = ZoneFilterStore().path_for(tld)
+    start = time.perf_counter()
+    with opener(zone_path, "rt", encoding="ascii", errors="replace") as zone:
+        count = build_zone_filter(zone, tld, out_path, expected_items=expected)
+    print(
+        f"{count} .{tld} names -> {out_path} "
+        f"(fp rate {settings.ZONE_FILTER_FP_RATE}, {time.perf_counter() - start:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""Tests for validation of domain search requests."""
+from fastapi.testclient import TestClient
+
+from namesearch.main import app
+
+
+def test_advanced_filters_without_query_are_rejected():
+    response = TestClient(app).post(
+        "/api/v1/domains/search", json={"query": "", "only_available": True, "min_length": 3}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == (
+        "Query must not be empty; advanced filters (min_length, only_available) need a query"
+    )
@@ -0,0 +1,71 @@
+"""Tests for the WebSocket search session."""
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from namesearch.main import app
+from namesearch.services.bulk_checker import AvailabilityResult
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Answer lookups without the network; '.slow' domains take a while."""
+    started, cancelled = [], []
+
+    async def check_one(self, domain):
+        started.append(domain)
+        try:
+            await asyncio.sleep(1.0 if domain.endswith(".slow") else 0)
+        except asyncio.CancelledError:
+            cancelled.append(domain)
+            raise
+        return AvailabilityResult(domain=domain, is_available=True)
+
+    monkeypatch.setattr("namesearch.services.bulk_checker.BulkAvailabilityChecker.check_one", check_one)
+    return started, cancelled
+
+
+def _receive_search(ws):
+    events = []
+    while not events or events[-1]["event"] not in ("summary", "error"):
+        events.append(ws.receive_json())
+    return events
+
+
+def test_pushes_results_then_summary(lookups):
+    with TestClient(app).websocket_connect("/api/v1/domains/search/ws") as ws:
+        ws.send_json({"id": "q1", "query": "brand", "tlds": ["com", "io"]})
+        events = _receive_search(ws)
+
+    assert [e["event"] for e in events] == ["result", "result", "summary"]
+    assert all(e["id"] == "q1" for e in events)
+    assert {e["data"]["domain"] for e in events[:2]} == {"brand.com", "brand.io"}
+    assert events[-1]["data"]["available"] == 2
+
+
+def test_new_query_cancels_superseded_lookups(lookups):
+    started, cancelled = lookups
+    with TestClient(app).websocket_connect("/api/v1/domains/search/ws") as ws:
+        ws.send_json({"id": 1, "query": "bran", "tlds": ["slow"]})
+        deadline = time.monotonic() + 5
+        while not started and time.monotonic() < deadline:
+            time.sleep(0.01)
+        ws.send_json({"id": 2, "query": "brand", "tlds": ["com"]})
+        events = _receive_search(ws)
+
+    assert cancelled == ["bran.slow"]
+    assert all(e["id"] == 2 for e in events)
+    assert events[-1]["data"]["total"] == 1
+
+
+def test_invalid_update_keeps_session_open(lookups):
+    with TestClient(app).websocket_connect("/api/v1/domains/search/ws") as ws:
+        ws.send_json({"id": 1, "query": ""})
+        error = ws.receive_json()
+        ws.send_json({"id": 2, "query": "brand", "tlds": ["com"]})
+        events = _receive_search(ws)
+
+    assert error == {"event": "error", "id": 1, "detail": "Query must not be empty"}
+    assert events[-1]["event"] == "summary"
@@ -0,0 +1,65 @@
+"""Tests for the public bulk WHOIS search."""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from namesearch.core.config import settings
+from namesearch.main import app
+from namesearch.services.bulk_checker import AvailabilityResult
+from namesearch.utils.rate_limiter import strict_limiter
+
+
+@pytest.fixture(autouse=True)
+def lookups(monkeypatch):
+    """Answer lookups without the network; '.slow' domains miss the deadline."""
+    async def check_one(self, domain):
+        await asyncio.sleep(1.0 if domain.endswith(".slow") else 0)
+        return AvailabilityResult(domain=domain, is_available=True)
+
+    monkeypatch.setattr("namesearch.services.bulk_checker.BulkAvailabilityChecker.check_one", check_one)
+    monkeypatch.setattr(settings, "LOOKUP_DEADLINE", 0.1)
+    strict_limiter.requests_log.clear()
+    yield
+    strict_limiter.requests_log.clear()
+
+
+def test_unanswered_domains_are_pending():
+    response = TestClient(app).post(
+        "/api/v1/domains/whois/search", json={"domain_names": ["fast.com", "late.slow"]}
+    )
+
+    assert response.status_code == 200
+    results = response.json()
+    assert results["fast.com"]["available"] is True
+    assert results["late.slow"]["pending"] is True
+
+
+def test_non_string_domains_are_rejected():
+    response = TestClient(app).post(
+        "/api/v1/domains/whois/search", json={"domain_names": ["fast.com", None, 5, ["a.com"]]}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "domain_names must be a list of strings"
+
+
+def test_large_lists_are_sent_to_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "WHOIS_SEARCH_MAX_DOMAINS", 2)
+    response = TestClient(app).post(
+        "/api/v1/domains/whois/search", json={"domain_names": ["a.com", "b.com", "c.com"]}
+    )
+
+    assert response.status_code == 400
+    assert "/searches/jobs" in response.json()["detail"]
+
+
+def test_requests_are_rate_limited_per_client():
+    client = TestClient(app)
+    codes = [
+        client.post("/api/v1/domains/whois/search", json={"domain_names": ["a.com"]}).status_code
+        for _ in range(strict_limiter.requests + 1)
+    ]
+
+    assert codes[:-1] == [200] * strict_limiter.requests
+    assert codes[-1] == 429
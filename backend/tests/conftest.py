@@ -3,16 +3,21 @@ import os
 from typing import Generator
 
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
 
+from namesearch import models
 from namesearch.core.config import settings
 from namesearch.db.base import Base
 from namesearch.db.session import get_db
 from namesearch.main import app
 from namesearch.models.user import User
 from namesearch.core.security import get_password_hash
+from tests.fixtures.fake_dns import start_fake_dns_server
+from tests.fixtures.fake_rdap import FakeRdapServer
 
 # Use an in-memory SQLite database for tests
 TEST_SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -47,6 +52,17 @@ def db(db_engine):
     connection.close()
 
 
+@pytest.fixture
+def session_factory():
+    """Sessions on a fresh in-memory database, shareable across threads."""
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    models.Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
 @pytest.fixture(scope="function")
 def client(db: Session) -> Generator:
     """Create a test client for the FastAPI application using the test DB session."""
@@ -134,3 +150,19 @@ def inactive_user_token_headers(inactive_user: User) -> dict[str, str]:
     
     access_token = create_access_token(subject=inactive_user.id)
     return {"Authorization": f"Bearer {access_token}"}
+
+
+@pytest_asyncio.fixture
+async def fake_dns_server():
+    """Start a local nameserver that knows example.com and taken.io as registered."""
+    server = await start_fake_dns_server(registered=["example.com", "taken.io"])
+    yield server
+    server.transport.close()
+
+
+@pytest.fixture
+def fake_rdap_server():
+    """Start a local RDAP server that knows example.com as registered."""
+    server = FakeRdapServer(registered=["example.com"]).start()
+    yield server
+    server.stop()
@@ -0,0 +1,75 @@
+"""Local stand-in for root and TLD nameservers used by the DNS pre-check tests."""
+import asyncio
+import struct
+from typing import Iterable, List, Optional, Set
+
+from namesearch.services.dns_precheck import CLASS_IN, TYPE_A, TYPE_NS, _read_name
+
+
+def _encode_name(name: str) -> bytes:
+    return b"".join(
+        bytes([len(label)]) + label.encode("ascii") for label in name.strip(".").split(".") if label
+    ) + b"\x00"
+
+
+def _record(owner: str, rtype: int, rdata: bytes) -> bytes:
+    return _encode_name(owner) + struct.pack("!HHIH", rtype, CLASS_IN, 3600, len(rdata)) + rdata
+
+
+class FakeDnsServer(asyncio.DatagramProtocol):
+    """
+    Answers NS queries the way root and TLD servers do.
+
+    Single-label names get a referral with glue pointing back at this server,
+    registered domains get a delegation and everything else is NXDOMAIN.
+    Answers for names in `truncate` are cut off inside the question.
+    """
+
+    def __init__(self, registered: Iterable[str], drop: Iterable[str] = ()):
+        self.registered: Set[str] = {d.lower() for d in registered}
+        self.drop: Set[str] = {d.lower() for d in drop}
+        self.truncate: Set[str] = set()
+        self.queries: List[str] = []
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.port: int = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.port = transport.get_extra_info("sockname")[1]
+
+    def datagram_received(self, data, addr):
+        query_id = struct.unpack("!H", data[:2])[0]
+        qname, offset = _read_name(data, 12)
+        question = data[12:offset + 4]
+        self.queries.append(qname)
+        if qname in self.drop:
+            return
+
+        authority: List[bytes] = []
+        additional: List[bytes] = []
+        rcode = 0
+        if "." not in qname:
+            ns_name = f"ns1.nic.{qname}"
+            authority.append(_record(qname, TYPE_NS, _encode_name(ns_name)))
+            additional.append(_record(ns_name, TYPE_A, bytes([127, 0, 0, 1])))
+        elif qname in self.registered:
+            authority.append(_record(qname, TYPE_NS, _encode_name(f"ns1.{qname}")))
+        else:
+            rcode = 3
+
+        header = struct.pack(
+            "!HHHHHH", query_id, 0x8000 | rcode, 1, 0, len(authority), len(additional)
+        )
+        packet = header + question + b"".join(authority + additional)
+        if qname in self.truncate:
+            packet = packet[:16]
+        self.transport.sendto(packet, addr)
+
+
+async def start_fake_dns_server(registered: Iterable[str], drop: Iterable[str] = ()) -> FakeDnsServer:
+    """Start a fake nameserver on an ephemeral localhost port."""
+    loop = asyncio.get_running_loop()
+    _, server = await loop.create_datagram_endpoint(
+        lambda: FakeDnsServer(registered, drop), local_addr=("127.0.0.1", 0)
+    )
+    return server
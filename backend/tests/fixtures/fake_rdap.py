@@ -0,0 +1,100 @@
+"""Local stand-in RDAP server for tests and benchmarks."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Optional
+
+
+def rdap_domain(domain: str) -> Dict[str, Any]:
+    """Build a minimal but realistic RDAP domain object."""
+    return {
+        "objectClassName": "domain",
+        "ldhName": domain.upper(),
+        "status": ["client transfer prohibited"],
+        "port43": "whois.example-registrar.test",
+        "events": [
+            {"eventAction": "registration", "eventDate": "1995-08-14T04:00:00Z"},
+            {"eventAction": "expiration", "eventDate": "2031-08-13T04:00:00Z"},
+            {"eventAction": "last changed", "eventDate": "2024-08-14T07:01:34Z"},
+        ],
+        "nameservers": [
+            {"objectClassName": "nameserver", "ldhName": "A.IANA-SERVERS.NET"},
+            {"objectClassName": "nameserver", "ldhName": "B.IANA-SERVERS.NET"},
+        ],
+        "entities": [
+            {
+                "objectClassName": "entity",
+                "roles": ["registrar"],
+                "vcardArray": ["vcard", [["version", {}, "text", "4.0"], ["fn", {}, "text", "Example Registrar, Inc."]]],
+            }
+        ],
+        "secureDNS": {"delegationSigned": True},
+    }
+
+
+class FakeRdapServer(ThreadingHTTPServer):
+    """
+    HTTP/1.1 keep-alive server answering RDAP domain queries.
+
+    It also serves an IANA-style bootstrap file at /dns.json that maps the
+    given TLDs to itself, and counts TCP connections so tests can check
+    that clients reuse them.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, registered: Iterable[str], tlds: Iterable[str] = ("com", "net", "org")):
+        self.registered = {d.lower() for d in registered}
+        self.tlds = list(tlds)
+        self.connections = 0
+        self.requests = 0
+        self._thread: Optional[threading.Thread] = None
+        super().__init__(("127.0.0.1", 0), _RdapHandler)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    @property
+    def bootstrap_url(self) -> str:
+        return f"{self.base_url}dns.json"
+
+    def get_request(self):
+        self.connections += 1
+        return super().get_request()
+
+    def start(self) -> "FakeRdapServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _RdapHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, code: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/rdap+json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server: FakeRdapServer = self.server
+        server.requests += 1
+        if self.path == "/dns.json":
+            self._send(200, {"version": "1.0", "services": [[server.tlds, [server.base_url]]]})
+            return
+        domain = self.path.rsplit("/", 1)[-1].lower()
+        if self.path.startswith("/domain/") and domain in server.registered:
+            self._send(200, rdap_domain(domain))
+        else:
+            self._send(404, {"errorCode": 404, "title": "Not Found"})
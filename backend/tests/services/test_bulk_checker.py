@@ -0,0 +1,98 @@
+"""Tests for the bulk availability checker."""
+import asyncio
+from collections import Counter
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from namesearch.services.bulk_checker import BulkAvailabilityChecker
+from namesearch.services.dns_precheck import DnsVerdict
+from namesearch.utils.cache import clear_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def _precheck(delegated=()):
+    precheck = AsyncMock()
+    precheck.check.side_effect = lambda d: DnsVerdict.DELEGATED if d in delegated else DnsVerdict.NXDOMAIN
+    return precheck
+
+
+@pytest.mark.asyncio
+async def test_limits_concurrency_per_server():
+    in_flight = Counter()
+    peak = Counter()
+
+    async def fake_whois(domain):
+        tld = domain.rsplit(".", 1)[-1]
+        in_flight[tld] += 1
+        peak[tld] = max(peak[tld], in_flight[tld])
+        await asyncio.sleep(0.01)
+        in_flight[tld] -= 1
+        return True, None
+
+    checker = BulkAvailabilityChecker(per_server_limit=3, server_limits={"whois.nic.io": 1}, precheck=_precheck())
+    domains = [f"name{i}.{tld}" for i in range(20) for tld in ("com", "io")]
+    with patch("namesearch.services.bulk_checker.whois_availability", side_effect=fake_whois):
+        results = [r async for r in checker.check(domains)]
+
+    assert len(results) == 40
+    assert all(r.is_available and r.source == "whois" for r in results)
+    assert peak["com"] == 3
+    assert peak["io"] == 1
+
+
+@pytest.mark.asyncio
+async def test_dns_delegated_and_invalid_skip_whois():
+    whois = AsyncMock(return_value=(True, None))
+    checker = BulkAvailabilityChecker(precheck=_precheck(delegated={"taken.com"}))
+    with patch("namesearch.services.bulk_checker.whois_availability", whois):
+        results = {r.domain: r async for r in checker.check(["taken.com", "not a domain", "free.com"])}
+
+    assert results["taken.com"].source == "dns"
+    assert results["taken.com"].is_available is False
+    assert results["not a domain"].error == "Invalid domain format"
+    assert results["free.com"].is_available is True
+    whois.assert_awaited_once_with("free.com")
+
+
+@pytest.mark.asyncio
+async def test_second_check_is_served_from_cache():
+    whois = AsyncMock(return_value=(True, None))
+    checker = BulkAvailabilityChecker(precheck=_precheck())
+    with patch("namesearch.services.bulk_checker.whois_availability", whois):
+        first = await checker.check_one("cached.com")
+        second = await checker.check_one("cached.com")
+
+    assert first.source == "whois"
+    assert second.source == "cache"
+    assert whois.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_checks_of_a_domain_share_one_lookup():
+    async def slow_whois(domain):
+        await asyncio.sleep(0.05)
+        return True, None
+
+    whois = AsyncMock(side_effect=slow_whois)
+    checker = BulkAvailabilityChecker(precheck=_precheck())
+    with patch("namesearch.services.bulk_checker.whois_availability", whois):
+        first, second = await asyncio.gather(checker.check_one("x.com"), checker.check_one("x.com"))
+
+    assert first.is_available and second.is_available
+    assert sorted([first.source, second.source]) == ["flight", "whois"]
+    assert whois.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_non_string_domains_are_invalid():
+    checker = BulkAvailabilityChecker(precheck=_precheck())
+    results = [await checker.check_one(domain) for domain in (None, 5)]
+
+    assert [(r.source, r.error) for r in results] == [("invalid", "Invalid domain format")] * 2
@@ -0,0 +1,92 @@
+"""Tests for warming the availability cache from the domains table."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from namesearch.models import Domain, Search, SearchResult, User
+from namesearch.models.domain import DomainStatus, TLDType
+from namesearch.services.cache_warmer import CacheWarmer
+from namesearch.services.whois_archive import record_whois
+from namesearch.utils.cache import cache_domain, clear_cache, get_cached_domain
+from namesearch.utils.revalidation import Freshness, revalidator
+
+
+@pytest.fixture
+def session_factory(session_factory):
+    db = session_factory()
+    db.add(User(id=1, email="searcher@example.com", hashed_password="x"))
+    db.commit()
+    db.close()
+    clear_cache()
+    yield session_factory
+    clear_cache()
+
+
+def _domain(db, name, available, updated_ago, searches=0):
+    label, tld = name.split(".")
+    row = Domain(
+        domain_name_full=name,
+        name_part=label,
+        tld_part=tld,
+        name_part_length=len(label),
+        tld_type=TLDType.GTLD,
+        status=DomainStatus.AVAILABLE if available else DomainStatus.REGISTERED,
+        is_available=available,
+        whois_last_updated=datetime.utcnow() - updated_ago,
+    )
+    db.add(row)
+    db.flush()
+    if not available:
+        record_whois(db, row, {"domain_name": name.upper(), "registrar": "Example Registrar"})
+    for _ in range(searches):
+        search = Search(query=label, search_type="domain")
+        db.add(search)
+        db.flush()
+        db.add(SearchResult(user_id=1, search_id=search.id, domain_id=row.id))
+    db.commit()
+    return row
+
+
+def test_recent_rows_are_loaded_with_their_remaining_ttl(session_factory):
+    db = session_factory()
+    _domain(db, "free.com", True, timedelta(minutes=10))
+    _domain(db, "taken.com", False, timedelta(hours=2))
+    _domain(db, "ancient.com", True, timedelta(days=30))
+    db.close()
+
+    report = CacheWarmer(session_factory).warm(batch_size=2)
+    assert (report.scanned, report.warmed, report.expired) == (3, 2, 1)
+
+    assert get_cached_domain("free.com")["is_available"] is True
+    taken = get_cached_domain("taken.com")
+    assert taken["is_available"] is False
+    assert taken["whois_data"]["registrar"] == "Example Registrar"
+    # One hour of freshness for available names, ten minutes of it used up
+    assert revalidator.freshness(get_cached_domain("free.com")) == Freshness.FRESH
+    remaining = get_cached_domain("free.com")["expires_at"] - datetime.now()
+    assert timedelta(minutes=49) < remaining <= timedelta(minutes=50)
+    assert get_cached_domain("ancient.com") is None
+
+
+def test_most_searched_domains_come_first(session_factory):
+    db = session_factory()
+    _domain(db, "quiet.com", True, timedelta(minutes=1))
+    _domain(db, "popular.com", True, timedelta(minutes=30), searches=3)
+    _domain(db, "known.com", True, timedelta(minutes=5), searches=1)
+    db.close()
+
+    report = CacheWarmer(session_factory).warm(limit=2)
+    assert report.warmed == 2
+    assert get_cached_domain("popular.com") and get_cached_domain("known.com")
+    assert get_cached_domain("quiet.com") is None
+
+
+def test_cached_answers_are_not_overwritten(session_factory):
+    db = session_factory()
+    _domain(db, "changed.com", True, timedelta(minutes=1))
+    db.close()
+    cache_domain("changed.com", {"is_available": False, "whois_data": None, "expires_at": None}, ttl=600)
+
+    report = CacheWarmer(session_factory).warm()
+    assert report.already_cached == 1
+    assert get_cached_domain("changed.com")["is_available"] is False
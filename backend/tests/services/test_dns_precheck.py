@@ -0,0 +1,77 @@
+"""Tests for the DNS availability pre-check engine."""
+import pytest
+
+from namesearch.services.dns_precheck import (
+    DnsPrecheckEngine, DnsPrecheckError, DnsVerdict, build_query, parse_response
+)
+
+
+def _engine(server, **kwargs) -> DnsPrecheckEngine:
+    return DnsPrecheckEngine(
+        root_servers=["127.0.0.1"], tld_nameservers={}, port=server.port, timeout=0.2, **kwargs
+    )
+
+
+def test_build_query_round_trips():
+    query_id, rcode, records = parse_response(build_query(1234, "example.com"))
+    assert query_id == 1234
+    assert rcode == 0
+    assert records == []
+
+
+@pytest.mark.parametrize("packet", [
+    build_query(1, "example.com")[:8],  # inside the header
+    build_query(1, "example.com")[:16],  # inside a label
+    build_query(1, "example.com")[:-5],  # before the terminating label
+    build_query(1, "example.com")[:12] + b"\xc0",  # half a pointer
+    build_query(1, "example.com")[:12] + b"\xc0\x0c",  # pointer to itself
+])
+def test_malformed_packets_raise_precheck_error(packet):
+    with pytest.raises(DnsPrecheckError):
+        parse_response(packet)
+
+
+@pytest.mark.asyncio
+async def test_check_classifies_delegated_and_nxdomain(fake_dns_server):
+    engine = _engine(fake_dns_server)
+    try:
+        assert await engine.check("example.com") == DnsVerdict.DELEGATED
+        assert await engine.check("free-name-123.com") == DnsVerdict.NXDOMAIN
+    finally:
+        engine.close()
+
+    # The TLD servers were discovered through a root referral exactly once
+    assert fake_dns_server.queries.count("com") == 1
+
+
+@pytest.mark.asyncio
+async def test_triage_pipelines_many_names(fake_dns_server):
+    engine = _engine(fake_dns_server)
+    candidates = [f"candidate{i}.io" for i in range(200)] + ["taken.io"]
+    try:
+        verdicts = await engine.triage(candidates)
+    finally:
+        engine.close()
+
+    assert verdicts["taken.io"] == DnsVerdict.DELEGATED
+    assert sum(v == DnsVerdict.NXDOMAIN for v in verdicts.values()) == 200
+
+
+@pytest.mark.asyncio
+async def test_unanswered_queries_are_unknown(fake_dns_server):
+    fake_dns_server.drop.add("slow.com")
+    engine = _engine(fake_dns_server, retries=1)
+    try:
+        assert await engine.check("slow.com") == DnsVerdict.UNKNOWN
+    finally:
+        engine.close()
+
+
+@pytest.mark.asyncio
+async def test_truncated_answers_are_unknown(fake_dns_server):
+    fake_dns_server.truncate.add("cut.com")
+    engine = _engine(fake_dns_server)
+    try:
+        assert await engine.check("cut.com") == DnsVerdict.UNKNOWN
+    finally:
+        engine.close()
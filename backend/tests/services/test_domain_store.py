@@ -0,0 +1,115 @@
+"""Tests for the domains table as the durable availability cache tier."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from namesearch.models import Base, Domain
+from namesearch.models.domain import DomainStatus, TLDType
+from namesearch.services import domain_store
+from namesearch.services.domain_store import DomainStore, new_domain_row, tld_type
+from namesearch.utils import domain_checker
+from namesearch.utils.cache import clear_cache
+from namesearch.utils.revalidation import Freshness
+
+
+@pytest.fixture
+def store(session_factory):
+    store = DomainStore(session_factory, batch_size=2, flush_interval=60)
+    clear_cache()
+    yield store
+    store.close()
+    clear_cache()
+
+
+def _row(store, name):
+    db = store.session_factory()
+    try:
+        return db.query(Domain).filter(Domain.domain_name_full == name).first()
+    finally:
+        db.close()
+
+
+def test_answers_are_written_back_in_batches(store):
+    checked_at = datetime.utcnow() - timedelta(minutes=5)
+    store.enqueue("taken.com", (False, {"domain_name": "TAKEN.COM", "registrar": "Example Registrar"}), checked_at)
+    store.enqueue("free.io", (True, None), checked_at)
+    store.enqueue("free.io", (False, None), checked_at)  # The latest answer wins
+    assert store.flush() == 2
+
+    taken = _row(store, "taken.com")
+    assert (taken.status, taken.is_available, taken.registrar) == (DomainStatus.REGISTERED, False, "Example Registrar")
+    assert taken.tld_type == TLDType.GTLD and taken.whois_last_updated == checked_at
+    assert _row(store, "free.io").status == DomainStatus.REGISTERED
+
+    store.enqueue("free.io", (True, None))
+    assert store.flush() == 1
+    assert _row(store, "free.io").is_available is True
+    # Older answers do not overwrite newer rows
+    store.enqueue("free.io", (False, None), checked_at)
+    store.flush()
+    assert _row(store, "free.io").is_available is True
+
+
+def test_row_inserted_by_another_worker_does_not_fail_the_batch(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'domains.db'}")
+    Base.metadata.create_all(bind=engine)
+    store = DomainStore(sessionmaker(bind=engine), batch_size=10, flush_interval=60)
+
+    def raced_row(domain):
+        if domain == "raced.com":
+            # Another worker commits the same new domain first
+            other = store.session_factory()
+            other.add(new_domain_row(domain))
+            other.commit()
+            other.close()
+        return new_domain_row(domain)
+
+    monkeypatch.setattr(domain_store, "new_domain_row", raced_row)
+    try:
+        store.enqueue("raced.com", (False, None))
+        store.enqueue("free.com", (True, None))
+        assert store.flush() == 2
+
+        assert _row(store, "raced.com").status == DomainStatus.REGISTERED
+        assert _row(store, "free.com").is_available is True
+        assert store.stats()["dropped"] == 0
+    finally:
+        store.close()
+        engine.dispose()
+
+
+def test_lookup_returns_stored_answer_and_check_time(store):
+    checked_at = datetime.utcnow() - timedelta(hours=1)
+    store.enqueue("taken.com", (False, {"domain_name": "TAKEN.COM", "registrar": "Example Registrar"}), checked_at)
+    store.flush()
+
+    (is_available, whois_data), stored_at = store.lookup("taken.com")
+    assert is_available is False and whois_data["registrar"] == "Example Registrar"
+    assert stored_at == checked_at
+    assert store.lookup("unknown.com") is None
+    assert store.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lookups_read_through_the_table(store, monkeypatch):
+    async def network(domain, skip_dns=False):
+        raise AssertionError(f"{domain} went to the network")
+
+    monkeypatch.setattr(domain_checker, "domain_store", store)
+    monkeypatch.setattr(domain_checker, "_lookup_availability_async", network)
+    monkeypatch.setattr(domain_checker.settings, "ZONE_FILTER_ENABLED", False)
+    store.enqueue("recent.com", (True, None), datetime.utcnow() - timedelta(minutes=1))
+    store.flush()
+
+    assert await domain_checker.check_availability_async("recent.com") == (True, None, Freshness.FRESH)
+    # Promoted into the cache, so the table is read once
+    await domain_checker.check_availability_async("recent.com")
+    assert store.stats()["hits"] == 1
+
+
+def test_tld_types():
+    assert tld_type("com") == TLDType.GTLD
+    assert tld_type("de") == TLDType.CCTLD
+    assert tld_type("app") == TLDType.NGTDLD
@@ -0,0 +1,137 @@
+"""Tests for circuit breakers, hedged lookups and request deadlines."""
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from namesearch.services.lookup_resilience import (
+    CircuitBreaker, CircuitState, LookupGuard, LookupUnavailable, lookup_deadline
+)
+from namesearch.services.rdap_service import RDAPLookupError
+from namesearch.services.whois_client import WhoisLookupError
+from namesearch.utils import domain_checker
+from namesearch.utils.cache import clear_cache, get_cached_domain
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _guard(**kwargs):
+    options = dict(failure_threshold=2, reset_timeout=10, hedge_min_delay=0.01, hedge_max_delay=0.05)
+    options.update(kwargs)
+    return LookupGuard(**options)
+
+
+async def _answer(value, delay=0.0):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def _fail(delay=0.0):
+    await asyncio.sleep(delay)
+    raise WhoisLookupError("connection refused")
+
+
+def test_breaker_opens_then_probes_once():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()  # the single half-open probe
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_probe_is_released():
+    clock = FakeClock()
+    guard = _guard()
+    breaker = guard.breaker("whois.flaky")
+    breaker.clock = clock
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 10
+
+    # The probe loses the race to the secondary and is cancelled
+    result = await guard.call("whois.flaky", lambda: _answer("whois", 1.0), lambda: _answer("rdap"))
+    await asyncio.sleep(0.01)  # Lets the cancelled probe's callback run
+
+    assert result == "rdap"
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_by_secondary():
+    guard = _guard()
+    started = time.monotonic()
+    result = await guard.call("whois.slow", lambda: _answer("whois", 1.0), lambda: _answer("rdap"))
+
+    assert result == "rdap"
+    assert time.monotonic() - started < 0.5
+    assert guard.hedged == 1 and guard.hedge_wins == 1
+    # Losing the race is not held against the server
+    assert guard.breaker("whois.slow").failures == 0
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    guard = _guard()
+    secondary = AsyncMock(return_value="rdap")
+    assert await guard.call("whois.fast", lambda: _answer("whois"), secondary) == "whois"
+    secondary.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_to_secondary():
+    guard = _guard()
+    for _ in range(2):
+        with pytest.raises(LookupUnavailable):
+            await guard.call("whois.down", _fail)
+    assert guard.breaker("whois.down").state == CircuitState.OPEN
+
+    primary = AsyncMock()
+    assert await guard.call("whois.down", primary, lambda: _answer("rdap")) == "rdap"
+    primary.assert_not_called()
+    with pytest.raises(LookupUnavailable):
+        await guard.call("whois.down", primary)
+    assert guard.short_circuited == 2
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_the_whole_lookup():
+    guard = _guard()
+    started = time.monotonic()
+    with lookup_deadline(0.1), pytest.raises(LookupUnavailable):
+        await guard.call("whois.slow", lambda: _answer("whois", 1.0), lambda: _answer("rdap", 1.0))
+    assert time.monotonic() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_failed_lookup_is_unknown_not_registered():
+    clear_cache()
+    with patch.object(domain_checker.settings, "DNS_PRECHECK_ENABLED", False), \
+            patch.object(domain_checker.whois_client, "lookup", side_effect=WhoisLookupError("timed out")), \
+            patch.object(domain_checker.rdap_service, "availability", side_effect=RDAPLookupError("no RDAP")):
+        with pytest.raises(LookupUnavailable):
+            await domain_checker.is_domain_available_async("unreachable.com")
+
+    assert get_cached_domain("unreachable.com") is None
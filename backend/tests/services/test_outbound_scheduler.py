@@ -0,0 +1,74 @@
+"""Tests for the outbound WHOIS/RDAP scheduler."""
+import asyncio
+import time
+
+import pytest
+
+from namesearch.services.outbound_scheduler import OutboundScheduler, traffic_source
+
+
+@pytest.mark.asyncio
+async def test_burst_is_granted_immediately_then_rate_limited():
+    scheduler = OutboundScheduler(default_rate=20, default_burst=3, tld_rates={}, tld_bursts={})
+
+    start = time.monotonic()
+    await asyncio.gather(*(scheduler.acquire("whois.example") for _ in range(3)))
+    assert time.monotonic() - start < 0.05
+
+    await asyncio.gather(*(scheduler.acquire("whois.example") for _ in range(4)))
+    # Four more tokens at 20/s take about 200ms to refill
+    assert time.monotonic() - start >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_tld_budget_and_queue_depth():
+    scheduler = OutboundScheduler(default_rate=100, default_burst=100, tld_rates={"de": 5}, tld_bursts={"de": 1})
+
+    await scheduler.acquire("whois.denic.de", "de")
+    waiters = [asyncio.ensure_future(scheduler.acquire("whois.denic.de", "de")) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert scheduler.queue_depth("whois.denic.de") == 3
+    assert scheduler.queue_depth() == 3
+
+    # Other servers are not held up by the .de queue
+    await asyncio.wait_for(scheduler.acquire("whois.nic.io", "io"), 0.05)
+
+    await asyncio.gather(*waiters)
+    assert scheduler.queue_depth() == 0
+    stats = {entry["server"]: entry for entry in scheduler.stats()}
+    assert stats["whois.denic.de"]["rate"] == 5
+    assert stats["whois.denic.de"]["granted"] == 4
+
+
+@pytest.mark.asyncio
+async def test_sources_are_served_round_robin():
+    scheduler = OutboundScheduler(default_rate=50, default_burst=1, tld_rates={}, tld_bursts={})
+    await scheduler.acquire("whois.example")
+    order = []
+
+    async def lookup(source):
+        with traffic_source(source):
+            await scheduler.acquire("whois.example")
+        order.append(source)
+
+    # The monitor floods the queue before one interactive search arrives
+    tasks = [asyncio.ensure_future(lookup("monitor")) for _ in range(5)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.ensure_future(lookup("search")))
+    await asyncio.gather(*tasks)
+
+    assert order.index("search") <= 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_consume_a_token():
+    scheduler = OutboundScheduler(default_rate=20, default_burst=1, tld_rates={}, tld_bursts={})
+    await scheduler.acquire("whois.example")
+
+    cancelled = asyncio.ensure_future(scheduler.acquire("whois.example"))
+    waiting = asyncio.ensure_future(scheduler.acquire("whois.example"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    await asyncio.wait_for(waiting, 0.1)
+    assert scheduler.queue_depth() == 0
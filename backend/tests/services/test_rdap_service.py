@@ -0,0 +1,64 @@
+"""Tests for the RDAP lookup service."""
+import pytest
+
+from namesearch.models.domain import DomainStatus
+from namesearch.services.rdap_service import RDAPBootstrap, RDAPService
+
+
+@pytest.fixture
+def rdap(fake_rdap_server, tmp_path):
+    bootstrap = RDAPBootstrap(
+        url=fake_rdap_server.bootstrap_url, cache_path=str(tmp_path / "dns.json"), max_age=3600
+    )
+    return RDAPService(bootstrap=bootstrap)
+
+
+@pytest.mark.asyncio
+async def test_lookup_registered_domain(rdap):
+    try:
+        data = await rdap.lookup_domain("example.com")
+    finally:
+        await rdap.close()
+
+    assert data["status"] == DomainStatus.REGISTERED
+    assert data["domain_name"] == "example.com"
+    assert data["registrar"] == "Example Registrar, Inc."
+    assert data["name_servers"] == ["a.iana-servers.net", "b.iana-servers.net"]
+    assert data["expiration_date"].year == 2031
+    assert data["dnssec"] is True
+
+
+@pytest.mark.asyncio
+async def test_lookup_unregistered_domain(rdap):
+    try:
+        data = await rdap.lookup_domain("free-name-123.com")
+    finally:
+        await rdap.close()
+
+    assert data["status"] == DomainStatus.AVAILABLE
+    assert data["is_available"] is True
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused(rdap, fake_rdap_server):
+    try:
+        for i in range(10):
+            await rdap.lookup_domain(f"name{i}.com")
+    finally:
+        await rdap.close()
+
+    # One connection for the bootstrap file, one kept alive for the lookups
+    assert fake_rdap_server.requests == 11
+    assert fake_rdap_server.connections == 2
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_is_cached_on_disk(fake_rdap_server, tmp_path):
+    cache_path = tmp_path / "dns.json"
+    first = RDAPBootstrap(url=fake_rdap_server.bootstrap_url, cache_path=str(cache_path))
+    assert await first.base_url("com") == fake_rdap_server.base_url
+    assert cache_path.exists()
+
+    second = RDAPBootstrap(url="http://127.0.0.1:9/unreachable.json", cache_path=str(cache_path))
+    assert await second.base_url("net") == fake_rdap_server.base_url
+    assert await second.base_url("xyz") is None
@@ -0,0 +1,172 @@
+"""Tests for background bulk search jobs."""
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from namesearch.models import Base, Domain
+from namesearch.models.domain import DomainStatus, SearchResult, SearchStatus
+from namesearch.services import domain_store
+from namesearch.services.bulk_checker import AvailabilityResult
+from namesearch.services.search_jobs import SearchJobRunner, normalize_job_domains
+
+
+class FakeChecker:
+    def __init__(self, taken=(), failing=(), delay=0.0, crashing=()):
+        self.taken = set(taken)
+        self.failing = set(failing)
+        self.crashing = set(crashing)
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+
+    async def check_one(self, domain):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if domain in self.crashing:
+            raise OSError("cache unreachable")
+        if domain in self.failing:
+            return AvailabilityResult(domain=domain, is_available=False, error="timed out")
+        return AvailabilityResult(domain=domain, is_available=domain not in self.taken)
+
+
+async def _finish(runner):
+    await asyncio.gather(*runner._tasks.values())
+
+
+def test_normalize_job_domains():
+    domains, invalid = normalize_job_domains(["Example.com", "www.example.com", "bad name", "b.io"])
+
+    assert domains == ["example.com", "b.io"]
+    assert invalid == ["bad name"]
+
+
+@pytest.mark.asyncio
+async def test_job_writes_results_and_counters_in_batches(session_factory):
+    checker = FakeChecker(taken={"d1.com", "d2.com"}, failing={"d3.com"}, delay=0.001)
+    runner = SearchJobRunner(session_factory, checker=checker, concurrency=4, batch_size=3)
+    domains = [f"d{i}.com" for i in range(10)]
+    db = session_factory()
+    try:
+        search = runner.submit(db, user_id=1, domains=domains)
+        assert search.status == SearchStatus.PENDING
+    finally:
+        db.close()
+    await _finish(runner)
+
+    progress = runner.progress(search.id)
+    assert progress["status"] == "completed" and progress["completed_at"] is not None
+    assert (progress["total"], progress["checked"]) == (10, 10)
+    assert (progress["available"], progress["taken"]) == (7, 2)
+    assert checker.peak == 4
+
+    db = session_factory()
+    try:
+        assert db.query(SearchResult).filter(SearchResult.search_id == search.id).count() == 10
+        rows = {row.domain_name_full: row for row in db.query(Domain)}
+        assert rows["d1.com"].status == DomainStatus.REGISTERED
+        assert rows["d3.com"].status == DomainStatus.UNKNOWN
+        assert rows["d0.com"].is_available and rows["d0.com"].price is not None
+        # Left for the domain store's write-back to set
+        assert rows["d0.com"].whois_last_updated is None
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_domain_added_by_the_store_meanwhile_does_not_fail_the_job(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    new_domain_row = domain_store.new_domain_row
+
+    def raced_row(domain):
+        if domain == "raced.com":
+            # The domain store's writer commits the same new domain first
+            other = session_factory()
+            other.add(new_domain_row(domain))
+            other.commit()
+            other.close()
+        return new_domain_row(domain)
+
+    monkeypatch.setattr(domain_store, "new_domain_row", raced_row)
+    runner = SearchJobRunner(session_factory, checker=FakeChecker(), concurrency=2, batch_size=10)
+    db = session_factory()
+    try:
+        search = runner.submit(db, user_id=1, domains=["raced.com", "free.com"])
+    finally:
+        db.close()
+    await _finish(runner)
+
+    progress = runner.progress(search.id)
+    assert progress["status"] == "completed"
+    assert (progress["checked"], progress["available"]) == (2, 2)
+    db = session_factory()
+    try:
+        assert db.query(SearchResult).filter(SearchResult.search_id == search.id).count() == 2
+    finally:
+        db.close()
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_lookup_that_raises_is_recorded_as_unknown(session_factory):
+    runner = SearchJobRunner(session_factory, checker=FakeChecker(crashing={"d1.com"}), concurrency=2)
+    db = session_factory()
+    try:
+        search = runner.submit(db, user_id=1, domains=["d0.com", "d1.com", "d2.com"])
+    finally:
+        db.close()
+    await asyncio.wait_for(_finish(runner), 5)
+
+    progress = runner.progress(search.id)
+    assert progress["status"] == "completed"
+    assert (progress["checked"], progress["available"], progress["taken"]) == (3, 2, 0)
+
+
+@pytest.mark.asyncio
+async def test_stopped_job_is_marked_failed(session_factory):
+    runner = SearchJobRunner(session_factory, checker=FakeChecker(delay=10), concurrency=2)
+    db = session_factory()
+    try:
+        search = runner.submit(db, user_id=1, domains=["slow.com", "slower.com"])
+    finally:
+        db.close()
+    await asyncio.sleep(0.05)
+    assert runner.progress(search.id)["status"] == "in_progress"
+
+    await runner.stop()
+
+    progress = runner.progress(search.id)
+    assert progress["status"] == "failed"
+    assert progress["error"] == "Interrupted before it finished"
+    assert runner.stats() == {"running": 0}
+
+
+@pytest.mark.asyncio
+async def test_interrupted_status_is_written_off_the_loop(session_factory, monkeypatch):
+    runner = SearchJobRunner(session_factory, checker=FakeChecker(delay=10), concurrency=1)
+    writers = []
+    set_status = runner._set_status
+
+    def recording_set_status(*args):
+        writers.append(threading.current_thread())
+        set_status(*args)
+
+    monkeypatch.setattr(runner, "_set_status", recording_set_status)
+    db = session_factory()
+    try:
+        search = runner.submit(db, user_id=1, domains=["slow.com"])
+    finally:
+        db.close()
+    await asyncio.sleep(0.05)
+    await runner.stop()
+
+    assert runner.progress(search.id)["status"] == "failed"
+    assert threading.main_thread() not in writers
@@ -0,0 +1,160 @@
+"""Tests for the domain search pipeline."""
+import asyncio
+
+import pytest
+
+from namesearch.core.config import settings
+from namesearch.services.bulk_checker import AvailabilityResult
+from namesearch.services.lookup_resilience import lookup_deadline, time_left
+from namesearch.services.outbound_scheduler import outbound_source, traffic_source
+from namesearch.services.search_pipeline import SearchPipeline, SearchQueryError, plan_search
+from namesearch.utils.revalidation import Freshness
+
+
+class FakeChecker:
+    """Answers from a table, tracking how many lookups run at once."""
+
+    def __init__(self, taken=(), failing=(), delays=None):
+        self.taken = set(taken)
+        self.failing = set(failing)
+        self.delays = delays or {}
+        self.in_flight = 0
+        self.peak = 0
+        self.checked = []
+
+    async def check_one(self, domain):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        self.checked.append(domain)
+        try:
+            await asyncio.sleep(self.delays.get(domain, 0.01))
+        finally:
+            self.in_flight -= 1
+        if domain in self.failing:
+            return AvailabilityResult(domain=domain, is_available=False, error="timed out")
+        if domain in self.taken:
+            return AvailabilityResult(
+                domain=domain, is_available=False, whois_data={"registrar": "Example"},
+                source="cache", freshness=Freshness.FRESH,
+            )
+        return AvailabilityResult(domain=domain, is_available=True)
+
+
+def test_plan_normalizes_query_and_tlds():
+    plan = plan_search("  https://www.Example.IO/path ", ["com", ".io", "COM", ""], 20)
+
+    assert plan.name == "example"
+    assert plan.domains == ["example.io", "example.com"]
+
+
+def test_plan_caps_tlds_at_limit():
+    assert plan_search("name", ["com", "net", "org"], 2).domains == ["name.com", "name.net"]
+
+
+@pytest.mark.parametrize("query,tlds", [
+    ("not a name", ["com"]),
+    ("-dash", ["com"]),
+    ("name", ["c_m"]),
+    ("name", []),
+])
+def test_plan_rejects_invalid_input(query, tlds):
+    with pytest.raises(SearchQueryError):
+        plan_search(query, tlds, 20)
+
+
+@pytest.mark.asyncio
+async def test_run_aggregates_in_plan_order():
+    checker = FakeChecker(
+        taken={"brand.com"}, failing={"brand.net"}, delays={"brand.com": 0.05}
+    )
+    pipeline = SearchPipeline(checker=checker)
+    response = await pipeline.run(plan_search("brand", ["com", "ai", "net"], 20))
+
+    assert [r["domain"] for r in response["results"]] == ["brand.com", "brand.ai", "brand.net"]
+    com, ai, net = response["results"]
+    assert com["status"] == "registered" and com["freshness"] == "fresh"
+    assert com["whois_data"] is None
+    assert ai["is_available"] is True and ai["price"] is not None and ai["freshness"] == "live"
+    assert net["status"] == "unknown" and net["is_available"] is False
+    assert response["total"] == 3
+    assert response["available"] == 1
+    assert response["taken"] == 1
+    assert response["premium"] == (1 if ai["is_premium"] else 0)
+
+
+@pytest.mark.asyncio
+async def test_include_whois_returns_whois_of_taken_domains():
+    pipeline = SearchPipeline(checker=FakeChecker(taken={"brand.com"}))
+    response = await pipeline.run(plan_search("brand", ["com"], 20), include_whois=True)
+
+    assert response["results"][0]["whois_data"] == {"registrar": "Example"}
+
+
+@pytest.mark.asyncio
+async def test_lookups_stay_within_request_budget():
+    checker = FakeChecker()
+    pipeline = SearchPipeline(checker=checker, concurrency=3)
+    tlds = ["com", "net", "org", "io", "ai", "co", "app", "dev", "tech"]
+    response = await pipeline.run(plan_search("budget", tlds, 20))
+
+    assert response["total"] == 9
+    assert checker.peak == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_fastest_lookup_first():
+    checker = FakeChecker(taken={"fast.io"}, delays={"fast.com": 0.1, "fast.io": 0.0})
+    pipeline = SearchPipeline(checker=checker)
+    results = [r async for r in pipeline.stream(plan_search("fast", ["com", "io"], 20))]
+
+    assert [r["domain"] for r in results] == ["fast.io", "fast.com"]
+    assert results[1]["price"] is not None
+
+
+@pytest.mark.asyncio
+async def test_deadline_returns_partial_results_and_finishes_in_background():
+    checker = FakeChecker(delays={"late.com": 0.2})
+    pipeline = SearchPipeline(checker=checker)
+    response = await pipeline.run(plan_search("late", ["com", "io"], 20), deadline=0.05)
+
+    com, io = response["results"]
+    assert com["pending"] is True and com["status"] == "unknown" and com["is_available"] is False
+    assert io["pending"] is False and io["is_available"] is True
+    assert (response["total"], response["available"], response["pending"]) == (2, 1, 1)
+    assert pipeline.stats() == {"background_lookups": 1}
+
+    await asyncio.sleep(0.3)
+    assert checker.in_flight == 0
+    assert pipeline.stats() == {"background_lookups": 0}
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_pending_domains_after_deadline():
+    checker = FakeChecker(delays={"late.com": 0.2})
+    pipeline = SearchPipeline(checker=checker)
+    results = [r async for r in pipeline.stream(plan_search("late", ["com", "io"], 20), deadline=0.05)]
+
+    assert [(r["domain"], r["pending"]) for r in results] == [("late.io", False), ("late.com", True)]
+    await asyncio.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_background_lookups_get_their_own_deadline():
+    seen = {}
+
+    class BudgetChecker(FakeChecker):
+        async def check_one(self, domain):
+            await asyncio.sleep(self.delays.get(domain, 0.01))
+            # After the request's deadline has passed
+            seen[domain] = (time_left(), outbound_source.get())
+            return AvailabilityResult(domain=domain, is_available=True)
+
+    pipeline = SearchPipeline(checker=BudgetChecker(delays={"late.com": 0.1}))
+    with traffic_source("ws"), lookup_deadline(0.05):
+        response = await pipeline.run(plan_search("late", ["com"], 20), deadline=0.05)
+    assert response["pending"] == 1
+
+    await asyncio.sleep(0.2)
+    remaining, source = seen["late.com"]
+    assert remaining > settings.LOOKUP_DEADLINE - 1
+    assert source == "ws"
@@ -0,0 +1,104 @@
+"""Tests for the content-addressed WHOIS archive."""
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from namesearch.models import Base, DomainWatch, User, WhoisArchive
+from namesearch.services.whois_archive import (
+    compress, decompress, encode_whois, load_whois, record_whois
+)
+from namesearch.services.whois_parser import parse_response
+from tests.services.test_whois_parser import VERISIGN
+
+# What WHOISService.lookup_domain returns: parsed fields plus the raw answer
+LOOKUP = {**parse_response("example.com", VERISIGN), "raw": VERISIGN}
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(id=1, email="watcher@example.com", hashed_password="x"))
+    db.commit()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def _watch(db, domain="example.com"):
+    watch = DomainWatch(user_id=1, domain=domain)
+    db.add(watch)
+    db.commit()
+    return watch
+
+
+def test_volatile_lines_do_not_change_the_hash():
+    later = VERISIGN.replace("2024-09-01T12:00:00Z", "2024-09-02T08:30:00Z")
+    assert encode_whois({"raw": VERISIGN})[0] == encode_whois({"raw": later})[0]
+    changed = VERISIGN.replace("2025-08-13", "2026-08-13")
+    assert encode_whois({"raw": VERISIGN})[0] != encode_whois({"raw": changed})[0]
+
+
+def test_unchanged_answer_is_not_rewritten(session):
+    first, second = _watch(session), _watch(session)
+
+    assert record_whois(session, first, LOOKUP)
+    assert record_whois(session, second, LOOKUP)
+    session.commit()
+    assert session.query(WhoisArchive).count() == 1
+    assert first.registrar == "RESERVED-Internet Assigned Numbers Authority"
+    assert first.expiration_date == datetime(2025, 8, 13, 4, 0)
+
+    assert not record_whois(session, first, {**LOOKUP, "raw": VERISIGN.replace("\n", "\r\n")})
+    assert not session.dirty
+
+    entry = session.get(WhoisArchive, first.whois_hash)
+    assert len(entry.payload) < entry.size
+
+
+def test_watch_exposes_parsed_whois_data(session):
+    watch = _watch(session)
+    record_whois(session, watch, LOOKUP)
+    session.commit()
+
+    data = watch.whois_data
+    assert data["domain_name"] == "example.com"
+    assert data["name_servers"] == ["a.iana-servers.net", "b.iana-servers.net"]
+    assert data["status"] == "registered"
+    assert "Last update of whois database" not in data["raw"]
+
+
+def test_whois_data_is_parsed_once_per_answer(session):
+    watch = _watch(session)
+    record_whois(session, watch, LOOKUP)
+    session.commit()
+
+    with patch("namesearch.services.whois_archive.parse_response", wraps=parse_response) as parse:
+        assert watch.whois_data is watch.whois_data
+        assert parse.call_count == 1
+
+        record_whois(session, watch, {**LOOKUP, "raw": VERISIGN.replace("2025-08-13", "2026-08-13")})
+        session.commit()
+        assert watch.whois_data["expiration_date"] == datetime(2026, 8, 13, 4, 0)
+        assert parse.call_count == 2
+
+
+def test_parsed_fields_round_trip_as_json():
+    whois_data = {"domain_name": "example.io", "creation_date": datetime(2020, 1, 2, 3, 4), "name_servers": ["ns1.host"]}
+    content_hash, content_type, content = encode_whois(whois_data)
+    entry = WhoisArchive(
+        content_hash=content_hash, codec="zlib", content_type=content_type,
+        size=len(content), payload=compress(content, "zlib"),
+    )
+    assert content_type == "json"
+    assert load_whois(entry, "example.io") == whois_data
+
+
+def test_unknown_codec_is_rejected():
+    assert decompress(compress(b"whois", "zlib"), "zlib") == b"whois"
+    with pytest.raises(ValueError):
+        compress(b"whois", "lz4")
@@ -0,0 +1,114 @@
+"""Tests for the asyncio WHOIS client."""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from namesearch.services.dns_precheck import DnsVerdict
+from namesearch.services.whois_client import AsyncWhoisClient, WhoisLookupError
+from namesearch.utils.cache import clear_cache
+from namesearch.utils.domain_checker import is_domain_available_async
+
+REGISTRY_RESPONSE = """Domain Name: EXAMPLE.COM
+Registrar WHOIS Server: localhost
+Creation Date: 1995-08-14T04:00:00Z
+Name Server: A.IANA-SERVERS.NET
+"""
+
+REGISTRAR_RESPONSE = """Domain Name: example.com
+Registrar: Example Registrar, Inc.
+Name Server: a.iana-servers.net
+"""
+
+
+async def _start_server(responses):
+    """Start a local WHOIS server answering with the given texts in order."""
+    queries = []
+
+    async def handle(reader, writer):
+        queries.append((await reader.readline()).decode().strip())
+        writer.write(responses[min(len(queries), len(responses)) - 1].encode())
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1], queries
+
+
+@pytest.mark.asyncio
+async def test_query_server_reads_full_response():
+    server, port, queries = await _start_server([REGISTRY_RESPONSE])
+    async with server:
+        client = AsyncWhoisClient(port=port)
+        text = await client.query_server("127.0.0.1", "example.com")
+
+    assert text == REGISTRY_RESPONSE
+    assert queries == ["example.com"]
+
+
+@pytest.mark.asyncio
+async def test_lookup_follows_registrar_referral():
+    server, port, queries = await _start_server([REGISTRY_RESPONSE, REGISTRAR_RESPONSE])
+    async with server:
+        client = AsyncWhoisClient(port=port)
+        text = await client.lookup("example.com", server="127.0.0.1")
+
+    assert len(queries) == 2
+    assert "Example Registrar, Inc." in text
+    assert text.startswith("Domain Name: EXAMPLE.COM")
+
+
+@pytest.mark.asyncio
+async def test_query_server_times_out():
+    async def handle(reader, writer):
+        await asyncio.sleep(5)
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    async with server:
+        client = AsyncWhoisClient(timeout=0.1, port=server.sockets[0].getsockname()[1])
+        with pytest.raises(WhoisLookupError):
+            await client.query_server("127.0.0.1", "example.com")
+
+
+def test_find_referral_ignores_current_server():
+    text = "refer: whois.verisign-grs.com\nwhois: whois.verisign-grs.com\n"
+    assert AsyncWhoisClient.find_referral(text, "whois.iana.org") == "whois.verisign-grs.com"
+    assert AsyncWhoisClient.find_referral(text, "whois.verisign-grs.com") is None
+
+
+@pytest.mark.asyncio
+async def test_is_domain_available_async_no_match():
+    clear_cache()
+    with patch("namesearch.utils.domain_checker.dns_precheck.check",
+               AsyncMock(return_value=DnsVerdict.NXDOMAIN)), \
+            patch("namesearch.utils.domain_checker.whois_client.lookup",
+                  AsyncMock(return_value='No match for "FREENAME123.COM".')):
+        is_available, whois_data = await is_domain_available_async("freename123.com")
+
+    assert is_available is True
+    assert whois_data is None
+
+
+def test_shipped_routing_table_covers_common_tlds():
+    client = AsyncWhoisClient()
+    assert client.route("example.com") == "whois.verisign-grs.com"
+    assert client.route("example.io") == "whois.nic.io"
+    assert client.route("example.invalid-tld") is None
+
+
+def test_route_prefers_longest_suffix():
+    client = AsyncWhoisClient(routes={"uk": "whois.nic.uk", "ac.uk": "whois.ja.net"})
+    assert client.route("ox.ac.uk") == "whois.ja.net"
+    assert client.route("example.co.uk") == "whois.nic.uk"
+
+
+@pytest.mark.asyncio
+async def test_lookup_goes_straight_to_routed_server():
+    server, port, queries = await _start_server([REGISTRY_RESPONSE.replace("localhost", "127.0.0.1")])
+    async with server:
+        client = AsyncWhoisClient(port=port, routes={"com": "127.0.0.1"}, max_referrals=0)
+        text = await client.lookup("example.com")
+
+    # One round trip, no IANA hop
+    assert queries == ["example.com"]
+    assert text.startswith("Domain Name: EXAMPLE.COM")
@@ -0,0 +1,102 @@
+"""Tests for the streaming WHOIS parser."""
+import pickle
+from datetime import datetime
+
+from namesearch.services.whois_parser import WhoisRecord, parse_response, parse_whois
+
+VERISIGN = """   Domain Name: EXAMPLE.COM
+   Registry Domain ID: 2336799_DOMAIN_COM-VRSN
+   Registrar WHOIS Server: whois.iana.org
+   Updated Date: 2024-08-14T07:01:34Z
+   Creation Date: 1995-08-14T04:00:00Z
+   Registry Expiry Date: 2025-08-13T04:00:00Z
+   Registrar: RESERVED-Internet Assigned Numbers Authority
+   Registrar Abuse Contact Email: abuse@example.net
+   Domain Status: clientDeleteProhibited https://icann.org/epp#clientDeleteProhibited
+   Domain Status: clientTransferProhibited https://icann.org/epp#clientTransferProhibited
+   Name Server: A.IANA-SERVERS.NET
+   Name Server: B.IANA-SERVERS.NET
+   DNSSEC: signedDelegation
+   URL of the ICANN Whois Inaccuracy Complaint Form: https://www.icann.org/wicf/
+>>> Last update of whois database: 2024-09-01T12:00:00Z <<<
+
+Domain Name: example.com
+Registrar: Should Not Be Read, Inc.
+"""
+
+NOMINET = """
+    Domain name:
+        example.co.uk
+
+    Registrar:
+        Example Registrar Ltd [Tag = EXAMPLE]
+        URL: https://registrar.example
+
+    Relevant dates:
+        Registered on: 26-Aug-1996
+        Expiry date:  26-Aug-2030
+        Last updated:  10-Jan-2024
+
+    Registration status:
+        Registered until expiry date.
+
+    Name servers:
+        ns1.example.net
+        ns2.example.net    2001:db8::1
+
+    WHOIS lookup made at 12:00:00 01-Sep-2024
+"""
+
+JPRS = """[ JPRS database provides information on network administration. ]
+a. [Domain Name]                EXAMPLE.JP
+p. [Name Server]                ns1.example.jp
+p. [Name Server]                ns2.example.jp
+[Created on]                    2001/01/23
+[Expires on]                    2030/01/31
+[Status]                        Active
+[Last Updated]                  2024/02/01 01:05:04 (JST)
+"""
+
+
+def test_parses_icann_format_and_stops_after_needed_fields():
+    record = parse_whois("example.com", VERISIGN)
+
+    assert record.domain_name == "example.com"
+    assert record.registrar == "RESERVED-Internet Assigned Numbers Authority"
+    assert record.creation_date == datetime(1995, 8, 14, 4, 0)
+    assert record.expiration_date == datetime(2025, 8, 13, 4, 0)
+    assert record.name_servers == ["a.iana-servers.net", "b.iana-servers.net"]
+    assert len(record.status) == 2
+    assert record.emails == ["abuse@example.net"]
+    assert record.dnssec == "signedDelegation"
+
+
+def test_parses_nominet_blocks():
+    record = parse_whois("example.co.uk", NOMINET)
+
+    assert record.domain_name == "example.co.uk"
+    assert record.registrar.startswith("Example Registrar Ltd")
+    assert record.creation_date == datetime(1996, 8, 26)
+    assert record.name_servers == ["ns1.example.net", "ns2.example.net"]
+    assert record.status == ["Registered until expiry date."]
+
+
+def test_parses_jprs_brackets():
+    record = parse_whois("example.jp", JPRS)
+
+    assert record.creation_date == datetime(2001, 1, 23)
+    assert record.updated_date == datetime(2024, 2, 1, 1, 5, 4)
+    assert record.status == ["Active"]
+
+
+def test_record_uses_slots_and_pickles():
+    record = parse_whois("example.com", VERISIGN)
+    assert not hasattr(record, "__dict__")
+    assert pickle.loads(pickle.dumps(record)).as_dict() == record.as_dict()
+    assert record.get("org", "none") == "none"
+
+
+def test_parse_response_returns_service_field_set():
+    data = parse_response("example.com", VERISIGN)
+    assert set(data) == set(WhoisRecord.__slots__)
+    assert data["registrar"] == "RESERVED-Internet Assigned Numbers Authority"
@@ -0,0 +1,84 @@
+"""Tests for the zone file Bloom filter."""
+import io
+import os
+from unittest.mock import patch
+
+import pytest
+
+from namesearch.services.zone_filter import (
+    ZoneFilter, ZoneFilterStore, ZoneVerdict, build_zone_filter, iter_zone_domains
+)
+from namesearch.utils import domain_checker
+from namesearch.utils.cache import clear_cache
+
+VERISIGN_STYLE = """\
+; .com zone dump
+$ORIGIN COM.
+$TTL 900
+@ IN SOA a.gtld-servers.net. nstld.verisign-grs.com. 1 1800 900 604800 86400
+EXAMPLE NS NS1.EXAMPLE
+EXAMPLE NS NS2.EXAMPLE
+ NS NS3.EXAMPLE
+NS1.EXAMPLE A 192.0.2.1
+GOOGLE 172800 IN NS NS1.GOOGLE
+"""
+
+CZDS_STYLE = """\
+io.\t3600\tin\tsoa\ta0.nic.io. noc.afilias-nst.info. 1 10800 3600 2764800 900
+io.\t172800\tin\tns\ta0.nic.io.
+taken.io.\t3600\tin\tns\tns1.taken.io.
+ns1.taken.io.\t3600\tin\ta\t192.0.2.2
+startup.io.\t3600\tin\tns\tns1.host.net.
+"""
+
+
+def test_iter_zone_domains_handles_both_formats():
+    assert list(iter_zone_domains(io.StringIO(VERISIGN_STYLE), "com")) == ["example.com", "google.com"]
+    assert list(iter_zone_domains(io.StringIO(CZDS_STYLE), "io")) == ["taken.io", "startup.io"]
+
+
+def test_filter_has_no_false_negatives(tmp_path):
+    names = [f"name{i}.com" for i in range(5000)]
+    zone = io.StringIO("".join(f"{name}. 3600 IN NS ns1.host.net.\n" for name in names))
+    path = str(tmp_path / "com.bloom")
+
+    assert build_zone_filter(zone, "com", path, fp_rate=0.01) == 5000
+
+    zone_filter = ZoneFilter(path)
+    assert zone_filter.tld == "com"
+    assert all(name in zone_filter for name in names)
+    false_positives = sum(f"other{i}.com" in zone_filter for i in range(5000))
+    assert false_positives < 150
+
+
+def test_store_reloads_replaced_snapshot(tmp_path):
+    store = ZoneFilterStore(directory=str(tmp_path), reload_interval=0)
+    assert store.check("example.com") == ZoneVerdict.NO_FILTER
+
+    build_zone_filter(io.StringIO(VERISIGN_STYLE), "com", store.path_for("com"))
+    assert store.check("example.com") == ZoneVerdict.IN_ZONE
+    assert store.check("brand-new-name.com") == ZoneVerdict.NOT_IN_ZONE
+
+    build_zone_filter(io.StringIO("brand-new-name.com. IN NS ns1.host.net.\n"), "com", store.path_for("com"))
+    assert store.check("brand-new-name.com") == ZoneVerdict.IN_ZONE
+    assert not os.path.exists(store.path_for("com") + ".tmp")
+
+
+@pytest.mark.asyncio
+async def test_availability_check_consults_filter_first(tmp_path):
+    clear_cache()
+    store = ZoneFilterStore(directory=str(tmp_path), reload_interval=0)
+    build_zone_filter(io.StringIO(VERISIGN_STYLE), "com", store.path_for("com"))
+
+    async def fake_whois(domain):
+        return True, None
+
+    with patch.object(domain_checker, "zone_filters", store), \
+            patch.object(domain_checker, "whois_availability", fake_whois), \
+            patch.object(domain_checker, "dns_precheck") as precheck:
+        assert await domain_checker.is_domain_available_async("example.com") == (False, None)
+        assert await domain_checker.is_domain_available_async("free-name.com") == (True, None)
+
+    clear_cache()
+    # Neither answer needed the DNS pre-check
+    precheck.check.assert_not_called()
@@ -0,0 +1,71 @@
+"""Tests for the bounded LRU+TTL domain cache."""
+from concurrent.futures import ThreadPoolExecutor
+
+from namesearch.utils.cache import TTLCache, cache_domain, clear_cache, get_cached_domain
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_without_being_read():
+    clock = FakeClock()
+    cache = TTLCache(max_entries=100, max_bytes=10 ** 6, shards=1, clock=clock)
+    cache.set("old.com", {"is_available": True}, ttl=10)
+    cache.set("default.com", {"is_available": False})
+    assert cache.get("old.com") == {"is_available": True}
+
+    clock.now = 11
+    cache.set("new.com", {"is_available": True}, ttl=10)
+    assert len(cache) == 2  # old.com was dropped by the write
+    assert cache.stats()["expirations"] == 1
+    assert cache.get("default.com") is not None
+
+    clock.now = 3601
+    assert cache.purge_expired() == 2
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(max_entries=3, max_bytes=10 ** 6, shards=1)
+    for name in ("a.com", "b.com", "c.com"):
+        cache.set(name, {"is_available": True})
+    cache.get("a.com")
+    cache.set("d.com", {"is_available": True})
+
+    assert cache.get("b.com") is None
+    assert all(cache.get(name) for name in ("a.com", "c.com", "d.com"))
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_is_enforced():
+    cache = TTLCache(max_entries=1000, max_bytes=20_000, shards=1)
+    for i in range(100):
+        cache.set(f"name{i}.com", {"raw": "x" * 1000})
+    assert cache.stats()["bytes"] <= 20_000
+    assert 0 < len(cache) < 20
+
+
+def test_concurrent_writers_stay_within_bounds():
+    cache = TTLCache(max_entries=64, max_bytes=10 ** 6, shards=4)
+
+    def write(worker):
+        for i in range(500):
+            cache.set(f"w{worker}-{i}.com", {"is_available": i % 2 == 0})
+            cache.get(f"w{worker}-{i - 1}.com")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(write, range(8)))
+    assert len(cache) <= 64
+
+
+def test_module_api_is_case_insensitive():
+    clear_cache()
+    cache_domain("Example.COM", {"is_available": False}, ttl=60)
+    assert get_cached_domain("example.com") == {"is_available": False}
+    clear_cache()
+    assert get_cached_domain("example.com") is None
@@ -0,0 +1,94 @@
+"""Tests for cross-worker cache invalidation over Redis pub/sub."""
+import asyncio
+
+import pytest
+
+from namesearch.core.config import settings
+from namesearch.utils import domain_checker
+from namesearch.utils.cache import RedisCacheTier, TieredCache, TTLCache, clear_cache
+from namesearch.utils.cache_invalidation import InvalidationBus
+
+fakeredis = pytest.importorskip("fakeredis")
+
+ANSWER = {"is_available": True, "whois_data": None, "expires_at": None, "lookup_time": 0.0}
+
+
+def _worker(server):
+    tier = RedisCacheTier(client=fakeredis.FakeRedis(server=server), prefix="test:")
+    cache = TieredCache(TTLCache(max_entries=100, max_bytes=10 ** 6), tier)
+    bus = InvalidationBus(
+        cache,
+        channel="test:invalidate",
+        async_client_factory=lambda: fakeredis.FakeAsyncRedis(server=server),
+        retry_after=0.01,
+        ping_interval=0.01,
+    )
+    return cache, bus
+
+
+async def _wait_for(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.asyncio
+async def test_change_published_by_one_worker_evicts_the_others():
+    server = fakeredis.FakeServer()
+    cache_a, bus_a = _worker(server)
+    cache_b, bus_b = _worker(server)
+    bus_a.start()
+    bus_b.start()
+    try:
+        await _wait_for(lambda: bus_a.subscribed and bus_b.subscribed)
+        assert cache_b.l1_max_ttl == settings.CACHE_L1_MAX_TTL_SUBSCRIBED
+
+        cache_a.set("example.com", ANSWER, ttl=600)
+        assert cache_b.get("example.com") == ANSWER  # now in B's L1
+
+        taken = {**ANSWER, "is_available": False}
+        cache_a.set("example.com", taken, ttl=600)
+        assert bus_a.publish(["example.com"])
+        await _wait_for(lambda: bus_b.evicted == 1)
+
+        assert cache_b.get("example.com") == taken
+        # The publisher ignores its own message and keeps its fresh entry
+        assert bus_a.received == 0 and cache_a.l1.get("example.com") == taken
+    finally:
+        await bus_a.stop()
+        await bus_b.stop()
+
+
+@pytest.mark.asyncio
+async def test_lost_subscription_clears_l1_and_shortens_ttls():
+    server = fakeredis.FakeServer()
+    cache, bus = _worker(server)
+    bus.start()
+    try:
+        await _wait_for(lambda: bus.subscribed)
+        cache.l1.set("example.com", ANSWER, ttl=600)
+
+        server.connected = False
+        await _wait_for(lambda: not bus.subscribed)
+        assert cache.l1.get("example.com") is None
+        assert cache.l1_max_ttl == settings.CACHE_L1_MAX_TTL
+
+        server.connected = True
+        await _wait_for(lambda: bus.subscribed)
+    finally:
+        await bus.stop()
+
+
+def test_changed_answers_are_published(monkeypatch):
+    published = []
+    monkeypatch.setattr(domain_checker.invalidation_bus, "publish", published.extend)
+    clear_cache()
+
+    domain_checker.cache_availability("example.com", (True, None))
+    domain_checker.cache_availability("example.com", (True, None))
+    assert published == []
+    domain_checker.cache_availability("example.com", (False, None))
+    assert published == ["example.com"]
+    clear_cache()
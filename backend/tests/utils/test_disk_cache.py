@@ -0,0 +1,70 @@
+"""Tests for the persistent SQLite availability cache tier."""
+import time
+
+from namesearch.utils.cache import TieredCache, TTLCache
+from namesearch.utils.disk_cache import DiskCacheTier
+
+ANSWER = {"is_available": False, "whois_data": {"registrar": "Example Registrar"}, "expires_at": None, "lookup_time": 0.5}
+
+
+def _tier(path, **kwargs):
+    return DiskCacheTier(str(path), compact_interval=0, **kwargs)
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = tmp_path / "cache" / "availability.db"
+    before = _tier(path)
+    before.set("example.com", ANSWER, ttl=600)
+    before.close()
+
+    after = TieredCache(TTLCache(max_entries=100, max_bytes=10 ** 6), disk=_tier(path))
+    started = time.perf_counter()
+    assert after.get("example.com") == ANSWER
+    assert time.perf_counter() - started < 0.5
+    # Promoted to the in-process tier
+    assert after.l1.get("example.com") == ANSWER
+    after.disk.close()
+
+
+def test_expired_entries_are_skipped_and_compacted(tmp_path):
+    tier = _tier(tmp_path / "availability.db")
+    tier.set("old.com", ANSWER, ttl=0.01)
+    tier.set("new.com", ANSWER, ttl=600)
+    time.sleep(0.02)
+
+    assert tier.get("old.com") is None
+    value, ttl = tier.get("new.com")
+    assert value == ANSWER and 590 < ttl <= 600
+    assert tier.compact() == 1
+    assert tier.stats()["entries"] == 1
+    tier.close()
+
+
+def test_compaction_keeps_the_entries_expiring_last(tmp_path):
+    tier = _tier(tmp_path / "availability.db", max_entries=3)
+    for i in range(5):
+        tier.set(f"name{i}.com", ANSWER, ttl=100 + i)
+    assert tier.compact() == 2
+    assert tier.get("name0.com") is None and tier.get("name1.com") is None
+    assert tier.get("name4.com") is not None
+    tier.close()
+
+
+def test_unusable_file_fails_open(tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    tier = _tier(blocker / "availability.db")
+    tier.set("example.com", ANSWER, ttl=600)
+    assert tier.get("example.com") is None
+    assert tier.stats()["errors"] >= 1
+
+
+def test_compaction_runs_in_the_background(tmp_path):
+    tier = DiskCacheTier(str(tmp_path / "availability.db"), compact_interval=0.01)
+    tier.set("old.com", ANSWER, ttl=0.01)
+    for _ in range(100):
+        if tier.compacted:
+            break
+        time.sleep(0.01)
+    assert tier.compacted == 1
+    tier.close()
@@ -0,0 +1,70 @@
+"""Tests for stale-while-revalidate and early refreshes of cached availability."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from namesearch.utils import domain_checker
+from namesearch.utils.cache import cache_domain, clear_cache
+from namesearch.utils.revalidation import Freshness, Revalidator, xfetch_due
+
+
+def test_xfetch_refreshes_earlier_for_slow_lookups():
+    # rand=e^-1 puts the refresh lookup_time * beta seconds ahead of expiry
+    rand = 0.36787944117144233
+    assert xfetch_due(expires_at=100, lookup_time=2, beta=1, now=98.5, rand=rand)
+    assert not xfetch_due(expires_at=100, lookup_time=2, beta=1, now=97.5, rand=rand)
+    assert not xfetch_due(expires_at=100, lookup_time=0.1, beta=1, now=98.5, rand=rand)
+    assert xfetch_due(expires_at=100, lookup_time=0.1, beta=1, now=100, rand=1.0)
+
+
+def test_freshness_and_refresh_decisions():
+    now = datetime(2026, 1, 1, 12, 0)
+    revalidator = Revalidator(beta=1.0, clock=lambda: now.timestamp(), rand=lambda: 0.0)
+    fresh = {"expires_at": now + timedelta(hours=1), "lookup_time": 1.0}
+    closing = {"expires_at": now + timedelta(seconds=5), "lookup_time": 1.0}
+    stale = {"expires_at": now - timedelta(seconds=1), "lookup_time": 1.0}
+
+    assert revalidator.freshness(fresh) == Freshness.FRESH
+    assert revalidator.freshness({"pricing": {}}) == Freshness.FRESH
+    assert revalidator.freshness(stale) == Freshness.STALE
+
+    revalidator.rand = lambda: 0.999  # ln(0.001) ~ -6.9, so 6.9s ahead
+    assert revalidator.refresh_due(closing, Freshness.FRESH)
+    assert not revalidator.refresh_due(fresh, Freshness.FRESH)
+    assert revalidator.refresh_due(stale, Freshness.STALE)
+    assert not Revalidator(beta=0, clock=revalidator.clock).refresh_due(closing, Freshness.FRESH)
+    assert revalidator.stats()["stale_served"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_one_refresh_runs(monkeypatch):
+    clear_cache()
+    lookups = []
+
+    async def lookup(domain, skip_dns=False):
+        lookups.append(domain)
+        await asyncio.sleep(0.01)
+        result = (False, {"domain_name": domain})
+        domain_checker.cache_availability(domain, result, 0.01)
+        return result
+
+    monkeypatch.setattr(domain_checker, "_lookup_availability_async", lookup)
+    cache_domain(
+        "popular.com",
+        {"is_available": False, "whois_data": None, "expires_at": datetime.now() - timedelta(seconds=5)},
+        ttl=600,
+    )
+
+    answers = await asyncio.gather(
+        *(domain_checker.check_availability_async("popular.com") for _ in range(20))
+    )
+    assert {answer[2] for answer in answers} == {Freshness.STALE}
+    assert all(answer[1] is None for answer in answers)
+
+    await asyncio.sleep(0.05)
+    assert lookups == ["popular.com"]
+    is_available, whois_data, freshness = await domain_checker.check_availability_async("popular.com")
+    assert freshness == Freshness.FRESH
+    assert whois_data == {"domain_name": "popular.com"}
+    clear_cache()
@@ -0,0 +1,114 @@
+"""Tests for single-flight lookup coalescing."""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from namesearch.utils import domain_checker
+from namesearch.utils.cache import clear_cache
+from namesearch.utils.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_async_callers_share_one_lookup():
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def lookup():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return calls
+
+    results = await asyncio.gather(*(flight.do_async("example.com", lookup) for _ in range(10)))
+
+    assert results == [1] * 10
+    assert flight.stats() == {"name": "test", "executed": 1, "coalesced": 9, "in_flight": 0}
+
+    # Once landed, the next call runs a new lookup
+    assert await flight.do_async("example.com", lookup) == 2
+
+
+@pytest.mark.asyncio
+async def test_exception_reaches_every_waiter():
+    flight = SingleFlight("test")
+
+    async def lookup():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *(flight.do_async("example.com", lookup) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_fail_followers():
+    flight = SingleFlight("test")
+
+    async def lookup():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    leader = asyncio.ensure_future(flight.do_async("example.com", lookup))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flight.do_async("example.com", lookup))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "ok"
+
+
+@pytest.mark.asyncio
+async def test_sync_and_async_callers_share_one_lookup():
+    flight = SingleFlight("test")
+    calls = 0
+    started = threading.Event()
+
+    def blocking_lookup():
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.05)
+        return "sync"
+
+    async def async_lookup():
+        raise AssertionError("should have joined the sync flight")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flight.do, "example.com", blocking_lookup) for _ in range(3)]
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        async_result = await flight.do_async("example.com", async_lookup)
+        sync_results = [f.result() for f in futures]
+
+    assert calls == 1
+    assert async_result == "sync"
+    assert sync_results == ["sync"] * 3
+    assert flight.coalesced == 3
+
+
+@pytest.mark.asyncio
+async def test_is_domain_available_async_coalesces_misses():
+    clear_cache()
+    calls = 0
+
+    async def fake_whois(domain):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return True, None
+
+    with patch.object(domain_checker.settings, "DNS_PRECHECK_ENABLED", False), \
+            patch.object(domain_checker, "whois_availability", fake_whois):
+        results = await asyncio.gather(
+            *(domain_checker.is_domain_available_async("Trending.com") for _ in range(20))
+        )
+
+    clear_cache()
+    assert calls == 1
+    assert results == [(True, None)] * 20
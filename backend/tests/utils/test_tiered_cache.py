@@ -0,0 +1,121 @@
+"""Tests for the Redis-backed shared cache tier and its binary format."""
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from namesearch.utils.cache import RedisCacheTier, TieredCache, TTLCache
+from namesearch.utils.cache_codec import CacheCodecError, decode_entry, encode_entry
+
+fakeredis = pytest.importorskip("fakeredis")
+
+ENTRY = {
+    "is_available": False,
+    "whois_data": {
+        "domain_name": "example.com",
+        "registrar": "RESERVED-Internet Assigned Numbers Authority",
+        "expiration_date": datetime(2026, 8, 13, 4, 0),
+        "name_servers": ["A.IANA-SERVERS.NET", "B.IANA-SERVERS.NET"],
+        "raw": "Domain Name: EXAMPLE.COM\n" * 40,
+    },
+    "expires_at": datetime(2026, 1, 1, 12, 0),
+    "lookup_time": 0.85,
+}
+
+
+def _worker(server, **kwargs):
+    tier = RedisCacheTier(client=fakeredis.FakeRedis(server=server), prefix="test:")
+    return TieredCache(TTLCache(max_entries=100, max_bytes=10 ** 6), tier, **kwargs)
+
+
+def test_codec_round_trip_is_compact():
+    data = encode_entry(ENTRY)
+    assert decode_entry(data) == ENTRY
+    assert len(data) < len(ENTRY["whois_data"]["raw"]) // 4
+
+    available = {"is_available": True, "whois_data": None, "expires_at": None, "lookup_time": 0.0}
+    assert len(encode_entry(available)) == 8
+    assert decode_entry(encode_entry(available)) == available
+
+    pricing = {"pricing": {"registration": 12.99}, "expires_at": datetime(2026, 1, 1)}
+    assert decode_entry(encode_entry(pricing)) == pricing
+
+    with pytest.raises(CacheCodecError):
+        decode_entry(b"\x09\x00")
+
+
+def test_workers_share_entries_through_redis():
+    server = fakeredis.FakeServer()
+    a, b = _worker(server), _worker(server)
+    a.set("example.com", ENTRY, ttl=600)
+
+    assert b.l1.get("example.com") is None
+    assert b.get("example.com") == ENTRY
+    # Populated from L2, capped at the L1 TTL bound
+    assert b.l1.get("example.com") == ENTRY
+    assert b.l2.stats()["hits"] == 1
+
+    a.delete("example.com")
+    b.l1.clear()
+    assert b.get("example.com") is None
+
+
+def test_redis_outage_falls_back_to_local_cache():
+    server = fakeredis.FakeServer()
+    cache = _worker(server)
+    server.connected = False
+
+    cache.set("example.com", ENTRY, ttl=600)
+    assert cache.get("example.com") == ENTRY
+    stats = cache.l2.stats()
+    assert stats["errors"] == 1 and not stats["available"]
+
+    # Redis is skipped rather than retried on every call while it is down
+    cache.l1.clear()
+    assert cache.get("example.com") is None
+    assert cache.l2.stats()["errors"] == 1
+
+
+def test_unreadable_entries_are_dropped():
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server)
+    client.set("test:example.com", b"\xff\xff")
+    assert _worker(server).get("example.com") is None
+    assert client.get("test:example.com") is None
+
+
+@pytest.mark.asyncio
+async def test_async_reads_do_not_block_the_loop_on_redis():
+    server = fakeredis.FakeServer()
+    _worker(server).set("example.com", ENTRY, ttl=600)
+    cache = _worker(server)
+    readers = []
+    read = cache.l2.get
+
+    def slow_read(key):
+        readers.append(threading.current_thread())
+        time.sleep(0.1)  # A degraded Redis, up to its socket timeout
+        return read(key)
+
+    cache.l2.get = slow_read
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.ensure_future(tick())
+    try:
+        assert await cache.get_async("example.com") == ENTRY
+    finally:
+        ticker.cancel()
+    assert threading.main_thread() not in readers
+    assert ticks > 3
+
+    # Now an L1 hit, answered without going to Redis
+    assert await cache.get_async("example.com") == ENTRY
+    assert len(readers) == 1
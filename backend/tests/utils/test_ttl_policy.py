@@ -0,0 +1,51 @@
+"""Tests for expiry-aware availability cache TTLs."""
+from datetime import datetime, timedelta
+
+from namesearch.utils.ttl_policy import TtlPolicies, TtlPolicy
+
+NOW = datetime(2026, 1, 1)
+HOUR = 3600
+DAY = 24 * HOUR
+
+POLICY = TtlPolicy(
+    available=HOUR,
+    registered=DAY,
+    min_ttl=HOUR,
+    max_ttl=7 * DAY,
+    expiry_fraction=0.25,
+    expired=HOUR,
+    status_ttls={"pendingdelete": 300, "redemptionperiod": 900},
+)
+
+
+def _registered(**fields):
+    return POLICY.ttl(False, {"domain_name": "example.com", **fields}, now=NOW)
+
+
+def test_ttl_follows_time_to_expiry():
+    assert _registered(expiration_date=datetime(2031, 1, 1)) == 7 * DAY
+    assert _registered(expiration_date=NOW + timedelta(days=8)) == 2 * DAY
+    # Never cached past the expiry date itself
+    assert _registered(expiration_date=NOW + timedelta(minutes=30)) == HOUR
+    assert _registered(expiration_date=[(NOW + timedelta(days=8)).isoformat()]) == 2 * DAY
+    assert _registered(expiration_date=NOW - timedelta(days=3)) == HOUR
+
+
+def test_deletion_statuses_win_over_expiry():
+    whois_status = ["pendingDelete https://icann.org/epp#pendingDelete"]
+    assert _registered(status=whois_status, expiration_date=datetime(2031, 1, 1)) == 300
+    assert _registered(status=["redemption period", "pending delete"]) == 300
+    assert _registered(status=["clientTransferProhibited https://icann.org/epp#clientTransferProhibited"]) == DAY
+
+
+def test_available_and_unknown_expiry_use_flat_ttls():
+    assert POLICY.ttl(True, None, now=NOW) == HOUR
+    assert POLICY.ttl(False, None, now=NOW) == DAY
+
+
+def test_tld_overrides():
+    policies = TtlPolicies(POLICY, {"de": {"available": 600, "status_ttls": {"pendingdelete": 60}}})
+    assert policies.policy_for("frei.de").available == 600
+    assert policies.policy_for("frei.de").status_ttls == {"pendingdelete": 60, "redemptionperiod": 900}
+    assert policies.policy_for("example.com") is POLICY
+    assert policies.ttl_for("frei.de", True, None) == 600
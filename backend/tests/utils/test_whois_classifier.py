@@ -0,0 +1,44 @@
+"""Tests for the compiled WHOIS classifier."""
+import re
+from datetime import datetime, timedelta
+
+from namesearch.models.domain import DomainStatus
+from namesearch.utils.whois_classifier import TldRules, WhoisClassifier, _alternation, whois_classifier
+
+REGISTERED = {
+    "domain_name": "EXAMPLE.COM",
+    "status": ["clientTransferProhibited https://icann.org/epp#clientTransferProhibited"],
+    "expiration_date": datetime.now() - timedelta(days=1),
+}
+
+
+def test_alternation_matches_exactly_the_phrases():
+    phrases = ["no match", "no data found", "not found", "status: free"]
+    pattern = re.compile(rf"^(?:{_alternation(phrases)})$")
+    assert all(pattern.match(p) for p in phrases)
+    assert not pattern.match("no")
+    assert not pattern.match("no matches")
+
+
+def test_available_phrases():
+    assert whois_classifier.domain_status({"domain_name": "free.com", "text": "Domain not found."}) == DomainStatus.AVAILABLE
+    assert whois_classifier.raw_says_available("free.com", 'No match for "FREE.COM".\r\n')
+    assert not whois_classifier.raw_says_available("example.com", "Domain Name: EXAMPLE.COM\n")
+
+
+def test_status_prefix_marks_registered():
+    # The EPP status is followed by a URL, which the old exact match missed
+    assert whois_classifier.domain_status(REGISTERED) == DomainStatus.REGISTERED
+
+
+def test_tld_rules():
+    assert whois_classifier.domain_status({"domain_name": "taken.ng"}) == DomainStatus.REGISTERED
+    assert whois_classifier.availability("taken.ng", {"domain_name": "taken.ng"}) == (False, {"domain_name": "taken.ng"})
+    assert whois_classifier.raw_says_available("frei.de", "Domain: frei.de\nStatus: free\n")
+    assert not whois_classifier.raw_says_available("frei.com", "Domain: frei.com\nStatus: free\n")
+
+
+def test_custom_rule_table():
+    classifier = WhoisClassifier(tld_rules={"xyz": TldRules(available_phrases=("is available",))})
+    assert classifier.raw_says_available("name.xyz", "name.xyz is available for registration")
+    assert not classifier.raw_says_available("name.xyz", "No match for name.xyz")